@@ -0,0 +1,64 @@
+# bench/browser_weight.py  ---------------------------------------------
+"""
+Page weight of the full vs. the lean Chrome profile (needs Chrome).
+
+Loads the same job pages in a default and a `lean=True` driver (see
+`scraper.make_driver`) and reports requests, transferred bytes,
+blocked requests and `get()` time per profile, plus the savings.
+
+    $ python bench/browser_weight.py https://www.linkedin.com/jobs/view/4209878123/
+    $ python bench/browser_weight.py --login --headless $(head -5 jobs_to_scrape.txt)
+"""
+
+from __future__ import annotations
+import sys, json, time, argparse, statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from scraper import make_driver, maybe_login, page_weight
+
+
+def profile(urls: list[str], lean: bool, headless: bool, login: bool) -> dict:
+    driver = make_driver(headless=headless, lean=lean, net_stats=True)
+    try:
+        if login:
+            maybe_login(driver)
+        page_weight(driver)                        # drop the login traffic
+        rows = []
+        for url in urls:
+            t = time.perf_counter()
+            driver.get(url)
+            load = time.perf_counter() - t
+            rows.append({**page_weight(driver), "load_s": load})
+    finally:
+        driver.quit()
+    return {"pages":          len(rows),
+            "requests":       sum(r["requests"] for r in rows),
+            "bytes":          sum(r["bytes"] for r in rows),
+            "blocked":        sum(r["blocked"] for r in rows),
+            "load_p50_s":     round(statistics.median(r["load_s"] for r in rows), 3),
+            "load_total_s":   round(sum(r["load_s"] for r in rows), 3)}
+
+
+def saved(full: float, lean: float) -> str | None:
+    return f"{1 - lean / full:.0%}" if full else None
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("urls", nargs="+")
+    ap.add_argument("--headless", action="store_true")
+    ap.add_argument("--login", action="store_true",
+                    help="log in first (LINKEDIN_EMAIL / LINKEDIN_PASSWORD)")
+    args = ap.parse_args()
+
+    full = profile(args.urls, False, args.headless, args.login)
+    lean = profile(args.urls, True, args.headless, args.login)
+    print(json.dumps({
+        "full": full,
+        "lean": lean,
+        "savings": {"bytes":      saved(full["bytes"], lean["bytes"]),
+                    "requests":   saved(full["requests"], lean["requests"]),
+                    "load_p50":   saved(full["load_p50_s"], lean["load_p50_s"])},
+    }, indent=2))
@@ -0,0 +1,163 @@
+# bench/extract.py  ----------------------------------------------------
+"""
+Extraction benchmark: the single-pass engine vs. the original loops.
+
+Runs the old per-keyword `cheap_extract` / seniority / currency code
+and the new `extract_engine.scan` path over the description fixtures
+(plus the job-page fixtures), asserts the outputs are identical, and
+reports the timings as JSON:
+
+    $ python bench/extract.py --repeat 200
+    $ python bench/extract.py --fuzz 5000       # random-text equivalence
+"""
+
+from __future__ import annotations
+import re, sys, json, random, string, argparse, statistics, time
+from pathlib import Path
+from textwrap import shorten
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import extract_engine
+from cheap_extract import (cheap_extract, skill_fields, EMPLOY_TYPES, WORKPLACE_TYPES,
+                           DEGREE_KEYWORDS, kp_benefits)
+from post_process import CURRENCY_3LET
+
+
+# ------------------------------------------------------------------
+# reference implementation (as it was before extract_engine)
+# ------------------------------------------------------------------
+def legacy_cheap_extract(text: str) -> dict:
+    out = {}
+    for pat, val in EMPLOY_TYPES.items():
+        if re.search(rf'\b{pat}\b', text, re.I):
+            out["employment_type"] = val
+            break
+    for pat, val in WORKPLACE_TYPES.items():
+        if re.search(rf'\b{pat}\b', text, re.I):
+            out["workplace_type"] = val
+            break
+    for pat, level in DEGREE_KEYWORDS.items():
+        if re.search(rf'\b{pat}', text, re.I):
+            out["degree_required"] = level
+            break
+    benefits_found = kp_benefits.extract_keywords(text)
+    if benefits_found:
+        out["benefits"] = sorted({b.lower() for b in benefits_found})
+    out.update(skill_fields(text))                 # same taxonomy step on both sides
+    clean = re.sub(r'\s+', ' ', text).strip()
+    out["description_clean"] = shorten(clean, width=300, placeholder="…")
+    return out
+
+
+def legacy_seniority(text: str) -> str | None:
+    jd = text.lower()
+    if re.search(r'\b(senior|sr\.)\b', jd):
+        return "senior"
+    elif re.search(r'\bmid[- ]?level\b', jd):
+        return "mid"
+    elif re.search(r'\bjunior|\bentry[- ]?level', jd):
+        return "junior"
+    return None
+
+
+def legacy_currency(text: str) -> str | None:
+    if m := re.search(r'\b(' + "|".join(CURRENCY_3LET) + r')\b', text):
+        return m.group(1)
+    return None
+
+
+def legacy(text: str) -> tuple:
+    return legacy_cheap_extract(text), legacy_seniority(text), legacy_currency(text)
+
+
+def engine(text: str) -> tuple:
+    f = extract_engine.scan(text)
+    return cheap_extract(text), f.seniority_level, f.currency_code
+
+
+# ------------------------------------------------------------------
+def load_texts() -> dict[str, str]:
+    texts = {p.name: p.read_text(encoding="utf-8")
+             for p in sorted((ROOT / "fixtures" / "descriptions").glob("*.txt"))}
+    try:
+        from http_fetch import parse_job_html
+        for p in sorted((ROOT / "fixtures" / "jobs").glob("*.html")):
+            jd = parse_job_html(p.read_text(encoding="utf-8"), "").get("job_description")
+            if jd:
+                texts[p.name] = jd
+    except ImportError:                 # bs4 / lxml not installed
+        pass
+    return texts
+
+
+def check(texts: dict[str, str]) -> list[str]:
+    return [name for name, t in texts.items() if legacy(t) != engine(t)]
+
+
+def time_it(fn, texts: list[str], repeat: int) -> float:
+    runs = []
+    for _ in range(repeat):
+        extract_engine.scan.cache_clear()     # measure the scan, not the memo
+        t = time.perf_counter()
+        for text in texts:
+            fn(text)
+        runs.append(time.perf_counter() - t)
+    return statistics.median(runs)
+
+
+WORDS = ["senior", "Sr.", "mid-level", "midlevel", "junior", "entry level",
+         "full time", "Full-Time", "part-time", "contract", "contractor",
+         "intern", "internship", "temporary", "remote", "hybrid", "on-site",
+         "onsite", "PhD", "doctorate", "master's", "MSc", "bachelor", "BA ",
+         "bs ", "BSc", "CAD", "usd", "USD", "GBP", "EURO", "EUR", "AUD",
+         "NZD", "dental", "RRSP", "İstanbul", "straße", "Ünternehmen"]
+
+
+def fuzz(n: int, seed: int = 0) -> list[str]:
+    rnd, bad = random.Random(seed), []
+    alphabet = string.ascii_letters + string.digits + " \t\n.,-_/()'" + "éİßıſ\u212a"
+    for _ in range(n):
+        parts = []
+        for _ in range(rnd.randint(0, 40)):
+            if rnd.random() < 0.4:
+                parts.append(rnd.choice(WORDS))
+            else:
+                parts.append("".join(rnd.choice(alphabet)
+                                     for _ in range(rnd.randint(0, 14))))
+        sep  = rnd.choice(["", " ", "\n", "  "])
+        text = sep.join(parts)
+        if legacy(text) != engine(text):
+            bad.append(text)
+    return bad
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=50)
+    ap.add_argument("--fuzz",   type=int, default=0,
+                    help="also compare N random texts")
+    args = ap.parse_args()
+
+    texts = load_texts()
+    if mismatched := check(texts):
+        sys.exit(f"❌ engine output differs on: {', '.join(mismatched)}")
+
+    corpus = list(texts.values())
+    old = time_it(legacy, corpus, args.repeat)
+    new = time_it(engine, corpus, args.repeat)
+    result = {
+        "descriptions": len(corpus),
+        "chars":        sum(map(len, corpus)),
+        "legacy_ms":    round(old * 1000, 2),
+        "engine_ms":    round(new * 1000, 2),
+        "speedup":      round(old / new, 2),
+        "identical":    True,
+    }
+    if args.fuzz:
+        bad = fuzz(args.fuzz)
+        result["fuzz"] = {"cases": args.fuzz, "mismatches": len(bad)}
+        if bad:
+            result["fuzz"]["first"] = bad[0][:200]
+    print(json.dumps(result, indent=2))
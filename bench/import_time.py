@@ -0,0 +1,85 @@
+# bench/import_time.py  ------------------------------------------------
+"""
+Import-time benchmark for the project's entry points.
+
+Each module is imported in a fresh interpreter (so nothing is cached)
+`--repeat` times; the median wall time is reported as JSON.  Pass
+`--baseline <git-rev>` to run the same measurement against an older
+tree exported with `git archive`, e.g. to prove a startup change:
+
+    $ python bench/import_time.py --baseline HEAD~1
+"""
+
+from __future__ import annotations
+import os, sys, json, tarfile, argparse, tempfile, statistics, subprocess
+from pathlib import Path
+
+ROOT    = Path(__file__).resolve().parent.parent
+MODULES = ["site_converter", "cheap_extract", "post_process", "http_fetch",
+           "llm_extract", "db", "scraper", "main", "webhook_server"]
+
+# import must not need real services: an unroutable Mongo fails fast
+ENV = {
+    "MONGO_URI":      "mongodb://127.0.0.1:9/?serverSelectionTimeoutMS=1500",
+    "OPENAI_API_KEY": "sk-bench",
+}
+
+SNIPPET = """
+import time, sys
+t = time.perf_counter()
+try:
+    import {mod}
+    ok = True
+except BaseException:
+    ok = False
+print(time.perf_counter() - t, ok, len(sys.modules))
+"""
+
+
+def time_import(mod: str, cwd: Path, repeat: int) -> dict:
+    env = {**os.environ, **ENV, "PYTHONDONTWRITEBYTECODE": "1"}
+    runs, ok, n_mods = [], True, 0
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", SNIPPET.format(mod=mod)],
+                             cwd=cwd, env=env, capture_output=True, text=True,
+                             timeout=120)
+        last = out.stdout.strip().splitlines()[-1].split()
+        runs.append(float(last[0]))
+        ok, n_mods = last[1] == "True", int(last[2])
+    return {"median_ms": round(statistics.median(runs) * 1000, 1),
+            "min_ms":    round(min(runs) * 1000, 1),
+            "ok":        ok,
+            "modules_loaded": n_mods}
+
+
+def export_rev(rev: str) -> Path:
+    tmp = Path(tempfile.mkdtemp(prefix="bench-"))
+    tar = subprocess.run(["git", "archive", rev], cwd=ROOT,
+                         capture_output=True, check=True).stdout
+    tar_path = tmp / "tree.tar"
+    tar_path.write_bytes(tar)
+    with tarfile.open(tar_path) as tf:
+        tf.extractall(tmp / "tree")
+    return tmp / "tree"
+
+
+def run(cwd: Path, repeat: int) -> dict:
+    return {m: time_import(m, cwd, repeat) for m in MODULES
+            if (cwd / f"{m}.py").exists()}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat",   type=int, default=5)
+    ap.add_argument("--baseline", help="git revision to compare against")
+    args = ap.parse_args()
+
+    result = {"current": run(ROOT, args.repeat)}
+    if args.baseline:
+        result["baseline"] = {"rev": args.baseline,
+                              **run(export_rev(args.baseline), args.repeat)}
+        result["speedup"] = {
+            m: round(result["baseline"][m]["median_ms"] / max(r["median_ms"], 0.1), 1)
+            for m, r in result["current"].items() if m in result["baseline"]
+        }
+    print(json.dumps(result, indent=2))
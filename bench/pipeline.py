@@ -0,0 +1,288 @@
+# bench/pipeline.py  ---------------------------------------------------
+"""
+Offline benchmark of the whole extraction pipeline.
+
+No Chrome, no LinkedIn, no Mongo, no OpenAI: the corpus is the saved
+pages in fixtures/jobs/ plus the descriptions in fixtures/descriptions/,
+the network is a fake session serving those pages, the browser is a
+fake driver, Mongo is an in-memory collection and the LLM is a stub.
+
+Stages (per item: throughput, mean / p50 / p99 latency):
+    html_parse, cheap_extract, post_process, set_currency_code,
+    fetch_job_http, fetch_job_browser, upsert_job, job_writer,
+    job_writer_refresh (the same docs again: `ops_sent` should be 0)
+
+    $ python bench/pipeline.py --repeat 20 --out before.json
+    $ python bench/pipeline.py --compare before.json     # exit 1 on regression
+"""
+
+from __future__ import annotations
+import os, sys, json, time, asyncio, platform, argparse, tempfile, statistics, subprocess
+from functools import partial
+from contextlib import redirect_stdout
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")          # never used
+os.environ.setdefault("RATE_LIMIT", "off")                  # no politeness waits offline
+
+import db
+import scraper
+import http_fetch
+import extract_engine
+import fingerprint
+import snapshots
+from http_fetch import parse_job_html
+from cheap_extract import cheap_extract
+from post_process import post_process, set_currency_code
+from llm_extract import SkillStage, SkillCache
+
+
+# ------------------------------------------------------------------
+# corpus
+# ------------------------------------------------------------------
+LOCATIONS = ["Toronto, Ontario, Canada · 2 days ago · 87 applicants",
+             "Chicago, IL · 1 week ago · Over 200 applicants",
+             "London, England, United Kingdom · 3 hours ago · 12 applicants",
+             "Montreal, Quebec, Canada · 5 days ago · 40 applicants"]
+
+
+def load_corpus() -> tuple[dict[str, str], list[dict]]:
+    """({job_id: html}, [raw docs]) – one raw doc per page and description."""
+    pages = {p.stem: p.read_text(encoding="utf-8")
+             for p in sorted((ROOT / "fixtures" / "jobs").glob("*.html"))}
+    docs  = []
+    for jid, html in pages.items():
+        doc = parse_job_html(html, f"https://www.linkedin.com/jobs/view/{jid}/")
+        if not http_fetch.missing_fields(doc):
+            docs.append(doc)
+    for i, p in enumerate(sorted((ROOT / "fixtures" / "descriptions").glob("*.txt"))):
+        docs.append({
+            "linkedin_url":    f"https://www.linkedin.com/jobs/view/{9_000_000_000 + i}/",
+            "job_title":       p.stem.split("_", 1)[1].replace("_", " ").title(),
+            "company":         "Fixture Co",
+            "location":        LOCATIONS[i % len(LOCATIONS)],
+            "job_description": p.read_text(encoding="utf-8"),
+        })
+    return pages, docs
+
+
+# ------------------------------------------------------------------
+# fakes
+# ------------------------------------------------------------------
+class FakeSession:
+    """`requests.Session` stand-in serving the fixture pages."""
+
+    def __init__(self, pages: dict[str, str]):
+        self.pages = pages
+
+    def get(self, url, timeout=None, **kw):
+        jid  = url.rstrip("/").rsplit("/", 1)[-1]
+        html = self.pages.get(jid)
+        return SimpleNamespace(status_code=200 if html else 404, text=html or "", url=url)
+
+
+class FakeDriver:
+    """Just enough WebDriver for `_scrape_in_browser`'s caller."""
+    page_source = ""
+
+
+def fake_browser(pages: dict[str, str], filler: dict):
+    """
+    Replacement for `scraper._scrape_in_browser`: the page 'renders'
+    instantly, and fields an auth-walled fixture lacks come from `filler`
+    (what a logged-in browser would have seen).
+    """
+    def scrape(url, driver, logged_in=True):
+        jid  = url.rstrip("/").rsplit("/", 1)[-1]
+        html = pages[jid]
+        doc  = parse_job_html(html, url)
+        for k in http_fetch.REQUIRED_FIELDS:
+            doc[k] = doc.get(k) or filler[k]
+        return doc, html
+    return scrape
+
+
+class FakeCollection:
+    """In-memory Mongo sink for `upsert_job` / `JobWriter`."""
+
+    def __init__(self):
+        self.docs: dict[str, dict] = {}
+
+    def _apply(self, flt, update):
+        url = flt["linkedin_url"]
+        new = url not in self.docs
+        doc = self.docs.setdefault(url, {"linkedin_url": url})
+        if new:
+            doc.update(update.get("$setOnInsert", {}))
+        doc.update(update.get("$set", {}))
+        return new
+
+    def update_one(self, flt, update, upsert=False):
+        self._apply(flt, update)
+
+    def bulk_write(self, ops, ordered=True):
+        new = sum(self._apply(op._filter, op._doc) for op in ops)
+        return SimpleNamespace(upserted_count=new, modified_count=len(ops) - new)
+
+    def find(self, query=None, projection=None, **kw):
+        return _Cursor(self.docs.values())
+
+    def find_one(self, query, projection=None):
+        return self.docs.get(query.get("linkedin_url"))
+
+
+class _Cursor(list):
+    def batch_size(self, n):
+        return self
+
+
+class StubLLM:
+    """AsyncOpenAI look-alike: answers every prompt with the same skills."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.chat = self.completions = self
+
+    async def create(self, **kw):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        msg = SimpleNamespace(content='{"required_skills": ["Python", "SQL"]}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+
+# ------------------------------------------------------------------
+# timing
+# ------------------------------------------------------------------
+def pct(samples: list[float], q: float) -> float:
+    s = sorted(samples)
+    return s[min(len(s) - 1, max(0, round(q * len(s)) - 1))]
+
+
+def measure(fn, items: list, repeat: int, before=None) -> dict:
+    """Call `fn(item)` for every item, `repeat` times; per-call latencies."""
+    for item in items:                 # warm-up pass: lazy imports, engine build
+        fn(item)
+    lat = []
+    t_all = 0.0
+    for _ in range(repeat):
+        for item in items:
+            if before:
+                before()
+            t = time.perf_counter()
+            fn(item)
+            dt = time.perf_counter() - t
+            lat.append(dt)
+            t_all += dt
+    return {"n":          len(lat),
+            "ops_per_s":  round(len(lat) / t_all, 1) if t_all else None,
+            "mean_ms":    round(statistics.fmean(lat) * 1000, 3),
+            "p50_ms":     round(pct(lat, 0.50) * 1000, 3),
+            "p99_ms":     round(pct(lat, 0.99) * 1000, 3)}
+
+
+def run(repeat: int, llm_latency: float) -> dict:
+    pages, docs = load_corpus()
+    tmp = Path(tempfile.mkdtemp(prefix="bench-pipeline-"))
+
+    # wire the fakes in
+    scraper.save_snapshot   = partial(snapshots.save_snapshot, root=tmp / "snapshots")
+    scraper._scrape_in_browser = fake_browser(pages, docs[0])
+    coll = FakeCollection()
+    db._jobs = coll                                  # upsert_job → in-memory
+    with redirect_stdout(sys.stderr):                # keep stdout pure JSON
+        fingerprint.fingerprints().load()
+    session = FakeSession(pages)
+    stage   = SkillStage(llm=StubLLM(llm_latency), cache=SkillCache(tmp / "llm"))
+
+    descs    = [d["job_description"] for d in docs]
+    urls     = list(pages)
+    # cheap_extract measures a cold scan; later stages reuse its memo,
+    # exactly like process_raw does
+    cold     = extract_engine.scan.cache_clear
+    enriched = [{**d, **cheap_extract(d["job_description"])} for d in docs]
+    processed = [post_process(dict(d)) for d in enriched]
+
+    stages = {
+        "html_parse":        measure(lambda jid: parse_job_html(pages[jid], jid), urls, repeat),
+        "cheap_extract":     measure(cheap_extract, descs, repeat, before=cold),
+        "post_process":      measure(lambda d: post_process(dict(d)), enriched, repeat),
+        "set_currency_code": measure(lambda d: set_currency_code(dict(d)), processed, repeat),
+        "fetch_job_http":    measure(
+            lambda jid: scraper.fetch_job(f"https://www.linkedin.com/jobs/view/{jid}/",
+                                          None, session=session, skills_stage=stage),
+            urls, repeat, before=cold),
+        "fetch_job_browser": measure(
+            lambda jid: scraper.fetch_job(f"https://www.linkedin.com/jobs/view/{jid}/",
+                                          FakeDriver(), try_http=False, skills_stage=stage),
+            urls, repeat, before=cold),
+        "upsert_job":        measure(lambda d: db.upsert_job(dict(d)), processed, repeat),
+    }
+
+    from pymongo import UpdateOne                    # keep its import out of the flush time
+    writer = db.JobWriter(batch_size=100, flush_secs=3600, collection=coll)
+    stages["job_writer"] = measure(writer.add, processed, repeat)
+    t = time.perf_counter()
+    writer.close()
+    stages["job_writer"]["final_flush_ms"] = round((time.perf_counter() - t) * 1000, 3)
+
+    refresh = db.JobWriter(batch_size=100, flush_secs=3600, collection=coll)
+    stages["job_writer_refresh"] = measure(refresh.add, processed, repeat)
+    refresh.close()
+    stages["job_writer_refresh"]["ops_sent"] = refresh.totals["sent"]
+
+    stage.close()
+    return {
+        "meta": {
+            "rev":      _git_rev(),
+            "python":   platform.python_version(),
+            "machine":  platform.machine(),
+            "repeat":   repeat,
+            "pages":    len(pages),
+            "docs":     len(docs),
+            "llm_stub_latency_s": llm_latency,
+        },
+        "stages": stages,
+    }
+
+
+def _git_rev() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Stages whose p50 got slower than `threshold` × baseline."""
+    worse = []
+    for name, cur in current["stages"].items():
+        base = baseline.get("stages", {}).get(name)
+        if base and base["p50_ms"] and cur["p50_ms"] > threshold * base["p50_ms"]:
+            worse.append(f"{name}: p50 {base['p50_ms']}ms → {cur['p50_ms']}ms")
+    return worse
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat",  type=int, default=10)
+    ap.add_argument("--llm-latency", type=float, default=0.0,
+                    help="seconds the stub LLM takes per answer")
+    ap.add_argument("--out",     help="also write the JSON result here")
+    ap.add_argument("--compare", help="baseline JSON from an earlier run")
+    ap.add_argument("--threshold", type=float, default=1.25,
+                    help="p50 ratio counted as a regression (default 1.25)")
+    args = ap.parse_args()
+
+    result = run(args.repeat, args.llm_latency)
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        result["regressions"] = compare(result, baseline, args.threshold)
+    print(json.dumps(result, indent=2))
+    if args.out:
+        Path(args.out).write_text(json.dumps(result, indent=2))
+    if result.get("regressions"):
+        sys.exit(1)
@@ -0,0 +1,91 @@
+# bench/rollups.py  ----------------------------------------------------
+"""
+Rollups at scale: incremental write rate and /stats query latency.
+
+Backfills a throw-away `Rollups` with `--jobs` synthetic postings
+(skills, locations, seniority, a year of weeks), times `--writes`
+incremental `apply` calls (new jobs and rewrites of stored ones), then
+the dashboard queries – as JSON.  Query time should not grow with --jobs.
+
+    $ python bench/rollups.py                     # 100k jobs
+    $ python bench/rollups.py --jobs 1000000 --queries 200
+"""
+
+from __future__ import annotations
+import sys, json, time, random, argparse, datetime, tempfile, statistics
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from rollups import Rollups, since_weeks
+
+SKILLS    = [f"skill-{i}" for i in range(400)]
+CITIES    = [("Toronto", "Ontario"), ("Ottawa", "Ontario"), ("Montreal", "Quebec"),
+             ("Vancouver", "British Columbia"), ("Calgary", "Alberta"), ("Halifax", "Nova Scotia")]
+LEVELS    = ["Entry level", "Associate", "Mid-Senior level", "Director", None]
+WORKPLACE = ["On-site", "Hybrid", "Remote", None]
+TODAY     = datetime.date(2026, 10, 12)
+
+
+def job(rng: random.Random, i: int) -> dict:
+    city, province = rng.choice(CITIES)
+    return {"linkedin_url": f"https://www.linkedin.com/jobs/view/{i}/",
+            "city": city, "province": f"{province}, Canada",
+            "seniority_level": rng.choice(LEVELS), "workplace_type": rng.choice(WORKPLACE),
+            "posted_at": (TODAY - datetime.timedelta(days=rng.randrange(365))).isoformat(),
+            "required_skills": rng.sample(SKILLS[:rng.choice((40, 400))], rng.randint(2, 12))}
+
+
+def pct(xs: list[float], q: float) -> float:
+    return round(sorted(xs)[min(len(xs) - 1, int(q * len(xs)))] * 1e3, 2)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--jobs", type=int, default=100_000)
+    ap.add_argument("--writes", type=int, default=2000)
+    ap.add_argument("--queries", type=int, default=100)
+    args = ap.parse_args()
+
+    rng = random.Random(0)
+    with redirect_stdout(sys.stderr), tempfile.TemporaryDirectory() as tmp:
+        store = Rollups(Path(tmp) / "rollups.sqlite3")
+        t = time.perf_counter()
+        store.rebuild(job(rng, i) for i in range(args.jobs))
+        rebuild_s = time.perf_counter() - t
+
+        writes = []
+        for n in range(args.writes):
+            i = args.jobs + n if n % 2 else rng.randrange(args.jobs)     # new / rewrite
+            doc = job(rng, i)
+            t = time.perf_counter()
+            store.apply(doc["linkedin_url"], doc)
+            writes.append(time.perf_counter() - t)
+
+        queries = {
+            "top_skills_ontario_4w": lambda: store.top("skill", {"province": "Ontario"},
+                                                        since_weeks(4, TODAY)),
+            "top_cities_all_time":   lambda: store.top("city"),
+            "jobs_per_week_remote":  lambda: store.top("week", {"workplace_type": "Remote"}),
+        }
+        latency = {}
+        for name, q in queries.items():
+            q()
+            xs = []
+            for _ in range(args.queries):
+                t = time.perf_counter()
+                q()
+                xs.append(time.perf_counter() - t)
+            latency[name] = {"p50": pct(xs, 0.5), "p99": pct(xs, 0.99)}
+        cells = store._conn().execute("SELECT COUNT(*) FROM counts").fetchone()[0]
+
+    print(json.dumps({
+        "jobs": args.jobs,
+        "cells": cells,
+        "rebuild_s": round(rebuild_s, 2),
+        "apply_ms": {"p50": pct(writes, 0.5), "p99": pct(writes, 0.99),
+                     "mean": round(statistics.mean(writes) * 1e3, 3)},
+        "query_ms": latency,
+    }, indent=2))
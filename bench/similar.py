@@ -0,0 +1,77 @@
+# bench/similar.py  ----------------------------------------------------
+"""
+Similar-job search at scale: embed throughput and top-k query latency.
+
+Embeds the fixture descriptions (docs/s), then fills a throw-away
+`VectorIndex` with `--jobs` vectors – perturbed copies of the fixture
+vectors – and times `similar_to` / free-text `search` queries, as JSON.
+
+    $ python bench/similar.py                     # 100k jobs
+    $ python bench/similar.py --jobs 500000 --queries 200
+"""
+
+from __future__ import annotations
+import sys, json, time, argparse, tempfile, statistics
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import numpy as np
+
+from vectors import VectorIndex, embed_batch, DIM
+
+
+def pct(xs: list[float], q: float) -> float:
+    return round(sorted(xs)[min(len(xs) - 1, int(q * len(xs)))] * 1e3, 2)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--jobs", type=int, default=100_000)
+    ap.add_argument("--queries", type=int, default=100)
+    ap.add_argument("-k", type=int, default=10)
+    args = ap.parse_args()
+
+    texts = [p.read_text(encoding="utf-8")
+             for p in sorted((ROOT / "fixtures" / "descriptions").glob("*.txt"))]
+    with redirect_stdout(sys.stderr):
+        embed_batch(texts, [[]] * len(texts))                       # warm caches
+        t = time.perf_counter()
+        base = embed_batch(texts * 20, [[]] * (len(texts) * 20))
+        embed_s = time.perf_counter() - t
+
+        rng = np.random.default_rng(0)
+        with tempfile.TemporaryDirectory() as tmp:
+            idx, step = VectorIndex(tmp), 20_000
+            t = time.perf_counter()
+            for s in range(0, args.jobs, step):
+                n = min(step, args.jobs - s)
+                v = base[rng.integers(0, len(texts), n)] + \
+                    rng.normal(0, 0.05, (n, DIM)).astype(np.float32)
+                v /= np.linalg.norm(v, axis=1, keepdims=True)
+                idx.add_vectors([f"job-{i}" for i in range(s, s + n)], v)
+            fill_s = time.perf_counter() - t
+
+            idx.similar_to("job-0", args.k)                          # map the file
+            idx.search(texts[0], args.k)                             # load the skill taxonomy
+            by_url, by_text = [], []
+            for i in rng.integers(0, args.jobs, args.queries):
+                t = time.perf_counter()
+                idx.similar_to(f"job-{i}", args.k)
+                by_url.append(time.perf_counter() - t)
+            for i in range(args.queries):
+                t = time.perf_counter()
+                idx.search(texts[i % len(texts)][:400], args.k)
+                by_text.append(time.perf_counter() - t)
+
+    print(json.dumps({
+        "dim": DIM,
+        "jobs": args.jobs,
+        "embed_docs_per_s": round(len(base) / embed_s),
+        "index_fill_s": round(fill_s, 2),
+        "similar_to_ms": {"p50": pct(by_url, 0.5), "p99": pct(by_url, 0.99),
+                          "mean": round(statistics.mean(by_url) * 1e3, 2)},
+        "text_search_ms": {"p50": pct(by_text, 0.5), "p99": pct(by_text, 0.99)},
+    }, indent=2))
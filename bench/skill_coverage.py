@@ -0,0 +1,110 @@
+# bench/skill_coverage.py  ---------------------------------------------
+"""
+LLM fallback rate before / after the skill taxonomy, on the fixtures.
+
+Before: `cheap_extract` never set `required_skills` (the 10-term
+keyword set was commented out), so every description went to the LLM;
+`before.ten_terms` shows what that set would have covered with the
+same `MIN_SKILLS` rule.  After: descriptions with fewer than
+`MIN_SKILLS` confident hard skills still fall back.  Also reports the
+cold build vs. cached load of the automaton and the per-doc match time.
+
+    $ python bench/skill_coverage.py
+    $ python bench/skill_coverage.py --repeat 50 --show
+"""
+
+from __future__ import annotations
+import sys, json, time, argparse, tempfile, statistics
+from contextlib import redirect_stdout
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from flashtext import KeywordProcessor
+
+from skill_taxonomy import SkillTaxonomy, parse, MIN_SKILLS
+
+# cheap_extract.SKILLS as it was before the taxonomy
+TEN_TERMS = {"python", "sql", "excel", "bigquery", "data analytics",
+             "economic research", "presentation", "scikit-learn",
+             "pandas", "spark"}
+
+
+def load_texts() -> dict[str, str]:
+    texts = {p.name: p.read_text(encoding="utf-8")
+             for p in sorted((ROOT / "fixtures" / "descriptions").glob("*.txt"))}
+    try:
+        from http_fetch import parse_job_html
+        for p in sorted((ROOT / "fixtures" / "jobs").glob("*.html")):
+            jd = parse_job_html(p.read_text(encoding="utf-8"), "").get("job_description")
+            if jd:
+                texts[p.name] = jd
+    except ImportError:                 # bs4 / lxml not installed
+        pass
+    return texts
+
+
+def rate(n: int, total: int) -> float:
+    return round(n / total, 3) if total else 0.0
+
+
+def timings(repeat: int, texts: list[str]) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = Path(tmp) / "skills.pickle"
+        t = time.perf_counter()
+        SkillTaxonomy.load(cache=cache)                      # parse + compile + pickle
+        cold = time.perf_counter() - t
+        loads = []
+        for _ in range(max(3, repeat // 10)):
+            t = time.perf_counter()
+            tax = SkillTaxonomy.load(cache=cache)
+            loads.append(time.perf_counter() - t)
+        size = cache.stat().st_size
+    runs = []
+    for _ in range(repeat):
+        t = time.perf_counter()
+        for text in texts:
+            tax.match(text)
+        runs.append(time.perf_counter() - t)
+    return {"cold_build_ms":   round(cold * 1e3, 1),
+            "cached_load_ms":  round(statistics.median(loads) * 1e3, 1),
+            "cache_bytes":     size,
+            "match_ms_per_doc": round(statistics.median(runs) / len(texts) * 1e3, 3)}
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--show", action="store_true", help="per-description skills")
+    args = ap.parse_args()
+
+    with redirect_stdout(sys.stderr):
+        texts = load_texts()
+    entries = parse()
+    tax     = SkillTaxonomy(entries)
+    matches = {name: tax.match(t) for name, t in texts.items()}
+
+    kp = KeywordProcessor(case_sensitive=False)
+    kp.add_keywords_from_list(sorted(TEN_TERMS))
+    ten = {name: len(set(kp.extract_keywords(t))) for name, t in texts.items()}
+
+    total    = len(texts)
+    fallback = sorted(n for n, m in matches.items() if not m.covered)
+    report = {
+        "descriptions": total,
+        "taxonomy": {"skills": len(tax), "terms": len(entries)},
+        "min_skills": MIN_SKILLS,
+        "before": {"llm_fallback_rate": 1.0,
+                   "ten_terms": {"llm_fallback_rate":
+                                 rate(sum(1 for c in ten.values() if c < MIN_SKILLS), total)}},
+        "after": {"llm_fallback_rate": rate(len(fallback), total),
+                  "fallback": fallback,
+                  "by_min_skills": {k: rate(sum(1 for m in matches.values() if m.hard < k), total)
+                                    for k in range(1, 9)}},
+    }
+    with redirect_stdout(sys.stderr):                # keep stdout pure JSON
+        report["timing"] = timings(args.repeat, list(texts.values()))
+    if args.show:
+        report["skills"] = {n: {"hard": m.hard, "scores": m.scores} for n, m in matches.items()}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
@@ -0,0 +1,156 @@
+# bench/stages.py  -----------------------------------------------------
+"""
+Sequential `fetch_job` workers vs. the staged pipeline, offline.
+
+Both runs scrape the same `--jobs` URLs (the fixture pages, repeated)
+with the same number of fetchers and browsers; the fake session and browser
+sleep `--io` / `--browser-io` seconds per page, so page loads are I/O
+while parsing and extraction burn real CPU.  Sequential workers pay
+I/O + CPU per job, one after the other; the pipeline overlaps them.
+Reports jobs/s for both, as JSON.
+
+    $ python bench/stages.py
+    $ python bench/stages.py --jobs 400 --io 0.2 --workers 4 --stage-workers parse=2
+"""
+
+from __future__ import annotations
+import os, sys, json, time, asyncio, argparse, tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from functools import partial
+from pathlib import Path
+from types import SimpleNamespace
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")          # never used
+os.environ.setdefault("RATE_LIMIT", "off")                  # no politeness waits offline
+
+import scraper
+import snapshots
+import fingerprint
+import http_fetch
+from http_fetch import parse_job_html
+from llm_extract import SkillStage, SkillCache
+from pipeline import JobPipeline, stage_workers
+
+
+class SlowSession:
+    """`requests.Session` stand-in: every fixture page takes `latency` s."""
+
+    def __init__(self, pages: dict[str, str], latency: float):
+        self.pages, self.latency = pages, latency
+
+    def get(self, url, timeout=None, **kw):
+        time.sleep(self.latency)
+        html = self.pages[_page(url, self.pages)]
+        return SimpleNamespace(status_code=200, text=html, url=url)
+
+
+def slow_browser(pages: dict[str, str], latency: float):
+    """`scraper._scrape_in_browser` stand-in: a logged-in page load."""
+    filler = {"job_title": "Data Analyst", "company": "Fixture Co",
+              "location": "Toronto, Ontario, Canada · 2 days ago",
+              "job_description": "Python, SQL and Excel reporting. " * 20}
+
+    def scrape(url, driver, logged_in=True):
+        time.sleep(latency)
+        html = pages[_page(url, pages)]
+        doc  = parse_job_html(html, url)
+        for k in http_fetch.REQUIRED_FIELDS:
+            doc[k] = doc.get(k) or filler[k]
+        return doc, html
+    return scrape
+
+
+def _page(url: str, pages: dict[str, str]) -> str:
+    n = int(url.rstrip("/").rsplit("/", 1)[-1])
+    return sorted(pages)[n % len(pages)]
+
+
+class _Empty:
+    """Store with no earlier postings, for the fingerprint index."""
+
+    def find(self, *a, **kw):
+        return SimpleNamespace(batch_size=lambda n: [])
+
+    def find_one(self, *a, **kw):
+        return None
+
+
+class StubLLM:
+    """AsyncOpenAI look-alike: answers every prompt with the same skills."""
+
+    def __init__(self):
+        self.chat = self.completions = self
+
+    async def create(self, **kw):
+        await asyncio.sleep(0.05)
+        msg = SimpleNamespace(content='{"required_skills": ["Python", "SQL"]}')
+        return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+
+def sequential(urls: list[str], workers: int, session, stage) -> float:
+    """`DriverPool.map(fetch_job, lazy=True)` without the browsers."""
+    stored = []
+    fetch  = partial(scraper.fetch_job, driver=None, session=session, skills_stage=stage)
+    t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        for doc in ex.map(fetch, urls):
+            stored.append(doc["linkedin_url"])
+    return time.perf_counter() - t
+
+
+def staged(urls: list[str], workers: dict, session, stage) -> float:
+    stored = []
+    with JobPipeline(None, store=lambda url, doc: stored.append(url),
+                     skills_stage=stage, workers=workers, session=session) as pipe:
+        t = time.perf_counter()
+        for url, doc, err in pipe.map(urls):
+            if err:
+                raise err
+        elapsed = time.perf_counter() - t
+    return elapsed
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--jobs", type=int, default=200)
+    ap.add_argument("--workers", type=int, default=2, help="fetchers in both runs")
+    ap.add_argument("--io", type=float, default=0.1, help="seconds per HTTP page")
+    ap.add_argument("--browser-io", type=float, default=0.5, help="seconds per browser page")
+    ap.add_argument("--stage-workers", default="", help='e.g. "parse=2,enrich=1"')
+    args = ap.parse_args()
+
+    pages = {p.stem: p.read_text(encoding="utf-8")
+             for p in sorted((ROOT / "fixtures" / "jobs").glob("*.html"))}
+    urls  = [f"https://www.linkedin.com/jobs/view/{5_000_000_000 + i}/" for i in range(args.jobs)]
+    tmp   = Path(tempfile.mkdtemp(prefix="bench-stages-"))
+
+    scraper.save_snapshot      = partial(snapshots.save_snapshot, root=tmp / "snapshots")
+    scraper._scrape_in_browser = slow_browser(pages, args.browser_io)
+    session = SlowSession(pages, args.io)
+    workers = {**stage_workers(args.stage_workers), "fetch": args.workers,
+               "browser": args.workers}
+
+    results = {}
+    with redirect_stdout(sys.stderr):                # keep stdout pure JSON
+        for name, run in (("sequential", lambda s: sequential(urls, args.workers, session, s)),
+                          ("pipeline",   lambda s: staged(urls, workers, session, s))):
+            # fresh duplicate index and LLM cache: both runs do the same work
+            fingerprint._index = fingerprint.FingerprintIndex(collection=_Empty())
+            stage = SkillStage(llm=StubLLM(), cache=SkillCache(tmp / f"llm-{name}"))
+            secs  = run(stage)
+            stage.close()
+            results[name] = {"seconds": round(secs, 2),
+                             "jobs_per_s": round(args.jobs / secs, 1)}
+
+    print(json.dumps({
+        "jobs": args.jobs,
+        "cpus": os.cpu_count(),
+        "io_s": args.io,
+        "browser_io_s": args.browser_io,
+        "stage_workers": workers,
+        **results,
+        "speedup": round(results["sequential"]["seconds"] / results["pipeline"]["seconds"], 2),
+    }, indent=2))
@@ -1,5 +1,7 @@
 import re
 from flashtext import KeywordProcessor
+from extract_engine import scan
+from skill_taxonomy import match as match_skills
 from datetime import datetime
 from textwrap import shorten
 
@@ -26,36 +28,50 @@ BENEFITS_LIST  = ["401(k)","RRSP","health benefits",
                   "wellness","flexible vacation",
                   "remote stipend","learning budget"]
 
-SKILLS = {"python","sql","excel","bigquery","data analytics",
-          "economic research","presentation","scikit-learn",
-          "pandas","spark"}   
-
 kp_benefits = KeywordProcessor(case_sensitive=False)
 for b in BENEFITS_LIST: kp_benefits.add_keyword(b)
 
-kp_skills = KeywordProcessor(case_sensitive=False)
-for s in SKILLS: kp_skills.add_keyword(s)
-
 # main extractor ---------------------------------------------------------------
+PREVIEW_WIDTH = 300
+
+def _preview(text: str) -> str:
+    """`shorten(" ".join(text.split()), 300)` without wrapping the whole text."""
+    clean = " ".join(text.split())
+    if len(clean) > PREVIEW_WIDTH:
+        # shorten() never keeps a word that ends past `width`, so everything
+        # after the first space beyond it can be dropped before wrapping
+        cut = clean.find(" ", PREVIEW_WIDTH + 1)
+        if cut != -1:
+            clean = clean[:cut]
+    return shorten(clean, width=PREVIEW_WIDTH, placeholder="…")
+
+
+def skill_fields(text: str) -> dict:
+    """
+    Taxonomy skills (see skill_taxonomy): `skill_scores` for every match,
+    `required_skills` only when enough are found to skip the LLM.
+    """
+    m = match_skills(text)
+    out = {"skill_scores": m.scored()} if m.scores else {}
+    if m.covered:
+        out["required_skills"] = m.required()
+    return out
+
+
 def cheap_extract(text: str) -> dict:
     out = {}
+    fields = scan(text)          # one compiled pass for every keyword field
 
     # ---------- employment / workplace type ----------
-    for pat, val in EMPLOY_TYPES.items():
-        if re.search(rf'\b{pat}\b', text, re.I):
-            out["employment_type"] = val
-            break
+    if fields.employment_type:
+        out["employment_type"] = fields.employment_type
 
-    for pat, val in WORKPLACE_TYPES.items():
-        if re.search(rf'\b{pat}\b', text, re.I):
-            out["workplace_type"] = val
-            break
+    if fields.workplace_type:
+        out["workplace_type"] = fields.workplace_type
 
     # ---------- degree requirements ----------
-    for pat, level in DEGREE_KEYWORDS.items():
-        if re.search(rf'\b{pat}', text, re.I):
-            out["degree_required"] = level
-            break
+    if fields.degree_required:
+        out["degree_required"] = fields.degree_required
 
     # ---------- benefits ----------
     benefits_found = kp_benefits.extract_keywords(text)
@@ -64,11 +80,15 @@ def cheap_extract(text: str) -> dict:
 
 
     # ---------- skills ----------
-    # out["required_skills"] = sorted(set(kp_skills.extract_keywords(text)))
+    out.update(skill_fields(text))
 
     # ---------- clean description (no excess whitespace) ----------
-    clean = re.sub(r'\s+', ' ', text).strip()
     # (optional) store a truncated preview for quick display
-    out["description_clean"] = shorten(clean, width=300, placeholder="…")
+    out["description_clean"] = _preview(text)
+
+    return out
+
 
-    return out
\ No newline at end of file
+def cheap_extract_batch(texts: list[str]) -> list[dict]:
+    """`cheap_extract` for many descriptions (see extract_engine.scan_batch)."""
+    return [cheap_extract(t) for t in texts]
@@ -1,46 +1,418 @@
 # db.py
+"""
+Job storage.  Nothing touches the network at import time: the
+client, the ping and the index builds all happen on the first call
+to `get_jobs()` (or the first use of `db.jobs` / `db.client`).
+
+`JOB_STORE` picks the backend behind `get_jobs()`: "mongo" (Atlas,
+the default when `MONGO_URI` is set) or "sqlite" (`local_store.py`,
+an embedded file – the default without `MONGO_URI`; push it to Mongo
+later with `python local_store.py --sync`).  Either one is driven
+through the same Collection calls below.
+
+Writes are diffed against the stored per-field content hashes: an
+unchanged doc is not written at all (a refresh only bumps
+`last_scraped_at` once it is `TOUCH_AFTER` old), a changed one only
+`$set`s the fields that differ, and changes to `TRACKED` fields are
+appended to the doc's `history` (applicant count over time, …).
+"""
 from __future__ import annotations
-import os, datetime                       # ←  add datetime
-from pymongo import MongoClient
-from pymongo.server_api import ServerApi
-from pymongo.collection import Collection
+import os, json, time, atexit, hashlib, datetime, threading
+from typing import NamedTuple, TYPE_CHECKING
 from dotenv import load_dotenv; load_dotenv()
+from metrics import span, incr
+from relative_dates import as_utc
+
+if TYPE_CHECKING:                          # pymongo is imported lazily
+    from pymongo.collection import Collection
 
 # ------------------------------------------------------------------
 # 1) URI
 # ------------------------------------------------------------------
 MONGO_URI = os.getenv("MONGO_URI") or os.getenv("mongo_uri")
-if not MONGO_URI:
-    raise RuntimeError("Set MONGO_URI env var with your Atlas string")
+STORE     = (os.getenv("JOB_STORE") or ("mongo" if MONGO_URI else "sqlite")).lower()
 
 # ------------------------------------------------------------------
-# 2) client
+# 2) client (lazy)
 # ------------------------------------------------------------------
-client = MongoClient(MONGO_URI, server_api=ServerApi("1"))
-client.admin.command("ping")
-print("✓ MongoDB connection OK")
+_client = None
+_mongo: Collection | None = None
+_jobs = None                               # active store: Mongo collection or LocalJobs
+_connect_lock = threading.RLock()
+
+
+def get_jobs():
+    """The `jobs` store selected by `JOB_STORE`, opened on first use."""
+    global _jobs
+    if _jobs is not None:
+        return _jobs
+    with _connect_lock:
+        if _jobs is None:
+            if STORE == "sqlite":
+                from local_store import LocalJobs, LOCAL_DB
+                _jobs = LocalJobs(LOCAL_DB)
+                print(f"✓ local job store: {LOCAL_DB}")
+            elif STORE == "mongo":
+                _jobs = get_mongo_jobs()
+            else:
+                raise RuntimeError(f"JOB_STORE must be 'mongo' or 'sqlite', not {STORE!r}")
+    return _jobs
+
+
+def get_mongo_jobs() -> Collection:
+    """Connect, ping and build indexes once; return the Mongo `jobs` collection."""
+    global _client, _mongo
+    if _mongo is not None:
+        return _mongo
+    with _connect_lock:
+        if _mongo is None:
+            if not MONGO_URI:
+                raise RuntimeError("Set MONGO_URI env var with your Atlas string")
+            from pymongo import MongoClient
+            from pymongo.server_api import ServerApi
+
+            client = MongoClient(MONGO_URI, server_api=ServerApi("1"))
+            client.admin.command("ping")
+            print("✓ MongoDB connection OK")
+
+            jobs = client.get_database("jobtracker").get_collection("jobs")
+            jobs.create_index("linkedin_url", unique=True)
+            jobs.create_index("posted_at")
+            jobs.create_index("scraped_at")
+            jobs.create_index("changed_at")            # incremental export
+            jobs.create_index("city")
+            # similar-job vectors are kept locally (vectors.py)
+            _client, _mongo = client, jobs
+    return _mongo
+
+
+def __getattr__(name: str):
+    """Keep `db.client`, `db.db` and `db.jobs` working, connected on first use."""
+    if name == "jobs":
+        return get_jobs()
+    if name == "client":
+        get_mongo_jobs()
+        return _client
+    if name == "db":
+        return get_mongo_jobs().database
+    raise AttributeError(name)
+
 
 # ------------------------------------------------------------------
-db      = client.get_database("jobtracker")
-jobs: Collection = db.get_collection("jobs")
-jobs.create_index("linkedin_url", unique=True)
-jobs.create_index("posted_at")
-jobs.create_index("city")
-# (vector index commented out)
+# upsert listeners (e.g. the known-jobs and vector indexes, the rollups)
+# ------------------------------------------------------------------
+_listeners: list = []                      # (fn, wants partial updates)
+
+
+def on_upsert(fn, partial: bool = False) -> None:
+    """
+    Call `fn(url, last_scraped_at, fields)` whenever a full job doc is
+    written; with `partial=True` also for late fields such as LLM skills
+    (`last_scraped_at` is None then).
+    """
+    _listeners.append((fn, partial))
+
+
+def _notify(url: str, when, fields: dict, partial: bool = False) -> None:
+    for fn, wants_partial in _listeners:
+        if partial and not wants_partial:
+            continue
+        try:
+            fn(url, when, fields)
+        except Exception as e:
+            print(f"⚠️  upsert listener failed: {e}")
+
+
+# ------------------------------------------------------------------
+# change detection
+# ------------------------------------------------------------------
+IGNORED     = {"_id", "scraped_at", "field_hashes", "content_hash", "changed_at", "history"}
+VOLATILE    = {"last_scraped_at", "posting_age_days"}   # written with a change, never one alone
+TRACKED     = ("applicant_count", "job_title", "employment_type", "workplace_type")
+HISTORY     = int(os.getenv("JOB_HISTORY", 50))         # history entries kept per job
+TOUCH_AFTER = float(os.getenv("TOUCH_AFTER_HOURS", 24)) * 3600
+_STORED     = {"_id": 0, "linkedin_url": 1, "field_hashes": 1, "last_scraped_at": 1}
+
+
+def _plain(v):
+    if isinstance(v, (datetime.datetime, datetime.date)):
+        return v.isoformat()
+    if isinstance(v, (set, frozenset)):
+        return sorted(v)
+    return str(v)
+
+
+def field_hash(name: str, value) -> str:
+    """Stable 64-bit hash of one field's normalized value."""
+    if name == "posted_at" and isinstance(value, datetime.datetime):
+        value = as_utc(value).date()        # "2 days ago" lands on a new second every scrape
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=_plain)
+    return hashlib.blake2b(raw.encode(), digest_size=8).hexdigest()
+
+
+def field_hashes(doc: dict) -> dict[str, str]:
+    return {k: field_hash(k, v) for k, v in doc.items()
+            if k not in IGNORED and k not in VOLATILE}
+
+
+def content_hash(hashes: dict[str, str]) -> str:
+    """Hash of the whole doc, from its field hashes."""
+    raw = "\n".join(f"{k}={h}" for k, h in sorted(hashes.items()))
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def _stored(coll, urls: list[str]) -> dict[str, dict]:
+    """url → stored `field_hashes` / `last_scraped_at` (projection only)."""
+    if len(urls) == 1:
+        d = coll.find_one({"linkedin_url": urls[0]}, _STORED)
+        return {urls[0]: d} if d else {}
+    return {d["linkedin_url"]: d
+            for d in coll.find({"linkedin_url": {"$in": urls}}, _STORED)}
+
+
+def _diff(fields: dict, on_insert: dict, stored: dict | None, now) -> dict | None:
+    """The update for one job against what is stored; None → nothing to write."""
+    new = field_hashes(fields)
+    old = (stored or {}).get("field_hashes") or {}
+    changed = [k for k, h in new.items() if old.get(k) != h]
+
+    if stored is not None and not changed:
+        seen, last = stored.get("last_scraped_at"), fields.get("last_scraped_at")
+        if last and (seen is None or (as_utc(last) - as_utc(seen)).total_seconds() >= TOUCH_AFTER):
+            return {"$set": {"last_scraped_at": last}}
+        return None
+
+    hashes = {**old, **new}
+    s = {k: fields[k] for k in changed}
+    s.update((k, fields[k]) for k in VOLATILE if k in fields)
+    s.update(field_hashes=hashes, content_hash=content_hash(hashes), changed_at=now)
+    update = {"$set": s, "$setOnInsert": on_insert}
+    point = {k: fields[k] for k in TRACKED if k in changed}
+    if point:
+        update["$push"] = {"history": {"$each": [{"at": now, **point}], "$slice": -HISTORY}}
+    return update
+
+
+def _write_one(url: str, fields: dict, on_insert: dict) -> bool:
+    """Diffed upsert of one job; False when it was unchanged."""
+    coll   = get_jobs()
+    now    = datetime.datetime.now(datetime.timezone.utc)
+    update = _diff(fields, on_insert, _stored(coll, [url]).get(url), now)
+    if update is None:
+        incr("db.unchanged")
+        return False
+    coll.update_one({"linkedin_url": url}, update, upsert=True)
+    return True
+
 
 # ------------------------------------------------------------------
+def _split_first_seen(doc: dict) -> tuple[dict, dict]:
+    """Return (filter, update) for one job upsert."""
+    now        = datetime.datetime.now(datetime.timezone.utc)
+    first_seen = doc.pop("scraped_at", None) or now
+    doc.setdefault("last_scraped_at", now)
+    return ({"linkedin_url": doc["linkedin_url"]},
+            {"$set": doc,
+             "$setOnInsert": {"scraped_at": first_seen}})
+
+
 def upsert_job(doc: dict) -> None:
     """
     Insert or update one job.
     - keeps the *first* scraped_at timestamp
     - never writes scraped_at twice (no path-conflict)
+    - stamps last_scraped_at on every write
+    - skips unchanged jobs, `$set`s only the fields that differ
+    """
+    flt, update = _split_first_seen(doc)
+    with span("db.upsert_one"):
+        _write_one(flt["linkedin_url"], update["$set"], update["$setOnInsert"])
+    _notify(flt["linkedin_url"], update["$set"]["last_scraped_at"], update["$set"])
+
+
+def merge_job_fields(url: str, fields: dict) -> None:
+    """
+    $set a few late-arriving fields (e.g. LLM skills) on one job.
+    Upserts, so it is safe to run before the main doc lands.
+    """
+    _write_one(url, fields, {"scraped_at": datetime.datetime.now(datetime.timezone.utc)})
+    _notify(url, None, fields, partial=True)
+
+
+# ------------------------------------------------------------------
+# 3) buffered writer
+# ------------------------------------------------------------------
+class FlushResult(NamedTuple):
+    sent:     int
+    upserted: int
+    modified: int
+    errors:   list          # raw `writeErrors` entries from the server
+
+
+class JobWriter:
     """
-    first_seen = doc.pop("scraped_at", None) \
-        or datetime.datetime.now(datetime.timezone.utc)
+    Collect upserts and send them with one `bulk_write(ordered=False)`
+    once `batch_size` URLs are buffered or the oldest one is
+    `flush_secs` old.  Same semantics as `upsert_job` – first-seen
+    `scraped_at` via $setOnInsert, one doc per `linkedin_url`, only
+    changed fields – and several writes to one URL inside a batch
+    collapse into one op.  A batch costs one projection-only read of
+    the stored hashes; unchanged docs are left out of the bulk write.
+
+        with JobWriter() as w:
+            w.add(doc)
+            w.add_fields(url, {"required_skills": [...]})
+
+    `on_flush(written, failed)` is called with the URLs of every batch
+    once the store has answered (e.g. to mark them done in a journal);
+    `on_upsert` listeners hear about a doc at the same point, not when
+    it is queued.
+    """
+
+    def __init__(self,
+                 batch_size: int = 500,
+                 flush_secs: float = 5.0,
+                 collection: Collection | None = None,
+                 on_flush=None):
+        self.batch_size = batch_size
+        self.flush_secs = flush_secs
+        self.collection = collection
+        self.on_flush   = on_flush
+        self.totals     = {"sent": 0, "upserted": 0, "modified": 0,
+                           "unchanged": 0, "errors": 0, "batches": 0}
+        self._buf: dict[str, list] = {}           # url → [$set, $setOnInsert, full doc?]
+        self._oldest: float | None = None
+        self._lock   = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop   = threading.Event()
+        self._timer  = threading.Thread(target=self._tick, name="job-writer",
+                                        daemon=True)
+        self._timer.start()
+        atexit.register(self.close)
+
+    # ---------- buffering ----------
+    def _put(self, url: str, fields: dict, first_seen, full_doc: bool) -> None:
+        with self._lock:
+            entry = self._buf.get(url)
+            if entry is None:
+                self._buf[url] = [dict(fields), {"scraped_at": first_seen}, full_doc]
+                self._oldest = self._oldest or time.monotonic()
+            else:
+                entry[0].update(fields)
+                entry[1]["scraped_at"] = min(entry[1]["scraped_at"], first_seen)
+                entry[2] = entry[2] or full_doc
+            full = len(self._buf) >= self.batch_size
+        if full:
+            self.flush()
+
+    def add(self, doc: dict) -> None:
+        """Queue a full job doc (like `upsert_job`)."""
+        flt, update = _split_first_seen(dict(doc))
+        self._put(flt["linkedin_url"], update["$set"],
+                  update["$setOnInsert"]["scraped_at"], True)
+
+    def add_fields(self, url: str, fields: dict) -> None:
+        """Queue a partial update (like `merge_job_fields`)."""
+        self._put(url, fields, datetime.datetime.now(datetime.timezone.utc), False)
+
+    # ---------- flushing ----------
+    def flush(self) -> FlushResult:
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+
+        with self._flush_lock:
+            with self._lock:
+                buf, self._buf, self._oldest = self._buf, {}, None
+            if not buf:
+                return FlushResult(0, 0, 0, [])
+
+            coll = self.collection if self.collection is not None else get_jobs()
+            now  = datetime.datetime.now(datetime.timezone.utc)
+            try:
+                with span("db.read_hashes"):
+                    stored = _stored(coll, list(buf))
+                ops, op_urls = [], []
+                for url, (s, soi, _) in buf.items():
+                    update = _diff(s, soi, stored.get(url), now)
+                    if update is not None:
+                        ops.append(UpdateOne({"linkedin_url": url}, update, upsert=True))
+                        op_urls.append(url)
+                unchanged = len(buf) - len(ops)
+                if ops:
+                    with span("db.bulk_write"):
+                        res = coll.bulk_write(ops, ordered=False)
+                    out = FlushResult(len(ops), res.upserted_count,
+                                      res.modified_count, [])
+                else:
+                    out = FlushResult(0, 0, 0, [])
+            except BulkWriteError as e:
+                d   = e.details
+                out = FlushResult(len(ops), d.get("nUpserted", 0),
+                                  d.get("nModified", 0), d.get("writeErrors", []))
+                print(f"⚠️  bulk write: {len(out.errors)}/{len(ops)} ops failed "
+                      f"(first: {out.errors[0].get('errmsg') if out.errors else '?'})")
+            except Exception:
+                # AutoReconnect, timeouts, …: nothing is known to be stored
+                self._requeue(buf)
+                incr("db.flush_failures")
+                raise
+
+            for k, v in zip(("sent", "upserted", "modified"), out[:3]):
+                self.totals[k] += v
+            self.totals["unchanged"] += unchanged
+            self.totals["errors"]    += len(out.errors)
+            self.totals["batches"]   += 1
+            incr("db.ops", len(ops))
+            incr("db.unchanged", unchanged)
+            incr("db.write_errors", len(out.errors))
+
+            bad     = {op_urls[e["index"]] for e in out.errors if "index" in e}
+            written = [u for u in buf if u not in bad]
+            for url in written:                     # unchanged docs count as stored
+                s, _, full_doc = buf[url]
+                if full_doc:
+                    _notify(url, s["last_scraped_at"], s)
+                else:
+                    _notify(url, None, s, partial=True)
+            if self.on_flush is not None:
+                try:
+                    self.on_flush(written, sorted(bad))
+                except Exception as e:
+                    print(f"⚠️  on_flush callback failed: {e}")
+            return out
+
+    def _requeue(self, buf: dict[str, list[dict]]) -> None:
+        """Put a failed batch back; anything added since wins per field."""
+        with self._lock:
+            for url, (s, soi, full_doc) in buf.items():
+                newer = self._buf.get(url)
+                if newer is not None:
+                    s = {**s, **newer[0]}
+                    soi = {"scraped_at": min(soi["scraped_at"], newer[1]["scraped_at"])}
+                    full_doc = full_doc or newer[2]
+                self._buf[url] = [s, soi, full_doc]
+            self._oldest = time.monotonic()
+
+    def _tick(self) -> None:
+        while not self._stop.wait(min(self.flush_secs, 1.0)):
+            with self._lock:
+                due = (self._oldest is not None
+                       and time.monotonic() - self._oldest >= self.flush_secs)
+            if due:
+                try:
+                    self.flush()
+                except Exception as e:
+                    print(f"⚠️  background flush failed: {e}")
+
+    def close(self) -> None:
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self.flush()
+
+    def __enter__(self) -> "JobWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
 
-    jobs.update_one(
-        {"linkedin_url": doc["linkedin_url"]},
-        {"$set": doc,
-         "$setOnInsert": {"scraped_at": first_seen}},
-        upsert=True,
-    )
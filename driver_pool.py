@@ -0,0 +1,197 @@
+# driver_pool.py  --------------------------------------------------------
+"""
+Pool of warm, logged-in Chrome drivers.
+
+Every slot owns one browser that is logged in once, handed to a single
+job at a time, and recycled after a crash or after `max_pages` loads.
+Page loads are paced by the account's shared, adaptive rate limiter
+(see rate_limit.py) instead of a fixed sleep per driver: all browsers
+draw from one budget that grows while pages come back healthy.
+
+    with DriverPool(size=3) as pool:
+        for url, doc, err in pool.map(fetch_job, urls, lazy=True):
+            ...
+"""
+
+from __future__ import annotations
+import os, queue, threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Any, Callable, Iterable, Iterator, Tuple
+
+from scraper import make_driver, maybe_login
+from metrics import span
+from rate_limit import RateLimiter, limiter
+
+
+DEFAULT_SIZE = int(os.getenv("SCRAPER_WORKERS", "2"))
+
+
+class _Slot:
+    """One browser plus its bookkeeping."""
+
+    def __init__(self, idx: int):
+        self.idx      = idx
+        self.driver   = None
+        self.pages    = 0        # page loads since the browser was (re)started
+
+
+class DriverPool:
+    """Fixed-size pool of Chrome drivers, checked out one job at a time."""
+
+    def __init__(self,
+                 size: int = DEFAULT_SIZE,
+                 headless: bool = False,
+                 login: bool = True,
+                 max_pages: int = 150,
+                 limiter: RateLimiter | None = None,
+                 lean: bool | None = None):
+        self.size      = max(1, size)
+        self.headless  = headless
+        self.lean      = lean              # None → $SCRAPER_LEAN (see make_driver)
+        self.login     = login
+        self.max_pages = max_pages
+        self._limiter  = limiter           # None → the account's shared bucket
+        self._slots    = [_Slot(i) for i in range(self.size)]
+        self._idle: queue.Queue[_Slot] = queue.Queue()
+        self._started  = False
+        self._lock     = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # lifecycle
+    # ------------------------------------------------------------------
+    def start(self) -> "DriverPool":
+        """Launch (and log in) every browser in parallel."""
+        with self._lock:
+            if self._started:
+                return self
+            self._started = True
+
+        def warm(slot: _Slot) -> _Slot:
+            try:
+                self._spawn(slot)
+            except Exception as e:
+                # keep the slot – the next checkout will try again
+                print(f"⚠️  driver #{slot.idx} failed to start: {e}")
+            return slot
+
+        with ThreadPoolExecutor(max_workers=self.size) as ex:
+            for slot in ex.map(warm, self._slots):
+                self._idle.put(slot)
+        return self
+
+    def close(self) -> None:
+        for slot in self._slots:
+            self._retire(slot)
+
+    def __enter__(self) -> "DriverPool":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------
+    # slot helpers
+    # ------------------------------------------------------------------
+    def _spawn(self, slot: _Slot) -> None:
+        with span("driver.start"):
+            driver = make_driver(headless=self.headless, lean=self.lean)
+        try:
+            if self.login:
+                with span("driver.login"):
+                    maybe_login(driver)
+        except Exception:
+            driver.quit()
+            raise
+        slot.driver, slot.pages = driver, 0
+
+    @staticmethod
+    def _retire(slot: _Slot) -> None:
+        if slot.driver is not None:
+            try:
+                slot.driver.quit()
+            except Exception:
+                pass
+        slot.driver = None
+
+    @staticmethod
+    def _healthy(slot: _Slot) -> bool:
+        """Cheap liveness probe – any WebDriver round-trip will do."""
+        if slot.driver is None:
+            return False
+        try:
+            slot.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    # ------------------------------------------------------------------
+    # checkout
+    # ------------------------------------------------------------------
+    @contextmanager
+    def driver(self, timeout: float | None = None):
+        """Check out a ready driver; it goes back to the pool on exit."""
+        if not self._started:
+            self.start()
+        with span("driver.checkout"):          # time spent waiting for a free browser
+            slot = self._idle.get(timeout=timeout)
+        try:
+            if slot.pages >= self.max_pages or not self._healthy(slot):
+                self._retire(slot)
+                self._spawn(slot)
+
+            with span("driver.polite_wait"):
+                (self._limiter or limiter("browser")).acquire()
+
+            try:
+                yield slot.driver
+            except Exception:
+                # a crashed browser is replaced on its next checkout
+                if not self._healthy(slot):
+                    self._retire(slot)
+                raise
+            finally:
+                slot.pages += 1
+        finally:
+            self._idle.put(slot)
+
+    # ------------------------------------------------------------------
+    # fan-out helper
+    # ------------------------------------------------------------------
+    def map(self,
+            fn: Callable[[Any, Any], Any],
+            items: Iterable[Any],
+            lazy: bool = False) -> Iterator[Tuple[Any, Any, Exception | None]]:
+        """
+        Run `fn(item, driver)` for every item on the pool.
+
+        With `lazy=True` the pool itself is passed instead of a driver, so
+        `fn` can skip the browser entirely (see `scraper.fetch_job`).
+        Yields `(item, result, error)` in completion order.  At most
+        2 × size items are in flight, so `items` may be a lazy generator.
+        """
+        def run(item):
+            if lazy:
+                return fn(item, self)
+            with self.driver() as d:
+                return fn(item, d)
+
+        it = iter(items)
+        with ThreadPoolExecutor(max_workers=self.size) as ex:
+            inflight = {}
+            for item in it:
+                inflight[ex.submit(run, item)] = item
+                if len(inflight) >= 2 * self.size:
+                    break
+            while inflight:
+                done, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    item = inflight.pop(fut)
+                    err  = fut.exception()
+                    yield item, (None if err else fut.result()), err
+                    nxt = next(it, _END)
+                    if nxt is not _END:
+                        inflight[ex.submit(run, nxt)] = nxt
+
+
+_END = object()
@@ -0,0 +1,264 @@
+# export.py  -----------------------------------------------------------
+"""
+Stream the `jobs` collection to NDJSON or Parquet for analysis.
+
+The cursor is batched and projected, rows are written as they arrive
+(Parquet: one row group per `ROW_GROUP` docs), so memory stays flat
+however big the collection gets.  Files are written under a temporary
+name and renamed when complete.
+
+With `--incremental` only docs written since the previous export of
+the same format are exported.  That is keyed on `changed_at`, which
+db.py stamps whenever a doc's content is stored (first insert, a
+changed re-scrape, late LLM skills, a re-parse) – not on `scraped_at`
+(first seen, so an updated doc would never be exported again) nor
+`posted_at` (LinkedIn's date, which new scrapes land far behind).
+Each run exports `{changed_at: {$gt: watermark, $lte: now -
+EXPORT_LAG}}` sorted on that indexed field and stores the upper bound
+as the next watermark (per format, in `<out dir>/.export_state.json`).
+The lag covers a batch whose `changed_at` was taken just before it
+became visible, so it is picked up by a later run instead of falling
+behind the watermark.
+
+    $ python export.py                                   # exports/jobs-<stamp>.ndjson
+    $ python export.py --format parquet --incremental    # nightly snapshot
+    $ python export.py --out jobs.ndjson.gz --since 2025-01-01
+
+Parquet needs `pyarrow` (optional – see requirements.txt).
+"""
+
+from __future__ import annotations
+import os, json, gzip, datetime, tempfile
+from pathlib import Path
+from typing import Iterator, Optional
+
+EXPORT_DIR = Path(os.getenv("EXPORT_DIR", "exports"))
+STATE_FILE = ".export_state.json"
+BATCH      = 2000          # docs per cursor round-trip
+ROW_GROUP  = 5000          # Parquet rows buffered before each write
+KEYS       = ("scraped_at", "posted_at", "changed_at")   # indexed in db.get_jobs()
+INCREMENTAL_KEY = "changed_at"              # the only write-time key
+EXPORT_LAG = datetime.timedelta(minutes=float(os.getenv("EXPORT_LAG_MINUTES", 15)))
+
+# exported fields and their column types (Parquet needs a fixed schema;
+# anything else on the doc is dropped, a wrong-typed value becomes null)
+COLUMNS = {
+    "linkedin_url":      "str",
+    "job_title":         "str",
+    "company":           "str",
+    "city":              "str",
+    "province":          "str",
+    "posted_at":         "ts",
+    "applicant_count":   "int",
+    "employment_type":   "str",
+    "workplace_type":    "str",
+    "seniority_level":   "str",
+    "degree_required":   "str",
+    "currency":          "str",
+    "currency_code":     "str",
+    "benefits":          "list",
+    "required_skills":   "list",
+    "description_clean": "str",
+    "job_description":   "str",
+    "posting_age_days":  "int",
+    "scraped_at":        "ts",
+    "last_scraped_at":   "ts",
+    "changed_at":        "ts",
+}
+
+
+# ------------------------------------------------------------------
+# reading
+# ------------------------------------------------------------------
+def iter_jobs(key: str = "scraped_at",
+              since: datetime.datetime | None = None,
+              fields: list[str] | None = None,
+              batch_size: int = BATCH,
+              collection=None,
+              until: datetime.datetime | None = None) -> Iterator[dict]:
+    """Docs in ascending `key` order (`since < key <= until` where given), projected."""
+    if key not in KEYS:
+        raise ValueError(f"key must be one of {KEYS}")
+    if collection is None:
+        from db import get_jobs
+        collection = get_jobs()
+
+    rng   = {**({"$gt": since} if since else {}), **({"$lte": until} if until else {})}
+    query = {key: rng} if rng else {}
+    proj  = {f: 1 for f in (fields or COLUMNS)} | {"_id": 0}
+    cur   = collection.find(query, proj, batch_size=batch_size).sort(key, 1)
+    try:
+        yield from cur
+    finally:
+        cur.close()
+
+
+# ------------------------------------------------------------------
+# writers
+# ------------------------------------------------------------------
+def _jsonable(v):
+    if isinstance(v, (datetime.datetime, datetime.date)):
+        return v.isoformat()
+    return str(v)                                   # ObjectId, Decimal128 …
+
+
+def _write_ndjson(docs: Iterator[dict], path: Path) -> int:
+    opener = gzip.open if path.suffix == ".gz" else open
+    n = 0
+    with opener(path, "wt", encoding="utf-8") as fh:
+        for d in docs:
+            fh.write(json.dumps(d, default=_jsonable, ensure_ascii=False))
+            fh.write("\n")
+            n += 1
+    return n
+
+
+def _coerce(kind: str, v):
+    if v is None:
+        return None
+    if kind == "ts":
+        if isinstance(v, datetime.datetime):
+            return v if v.tzinfo else v.replace(tzinfo=datetime.timezone.utc)
+        return None
+    if kind == "int":
+        return v if isinstance(v, int) and not isinstance(v, bool) else None
+    if kind == "float":
+        return float(v) if isinstance(v, (int, float)) and not isinstance(v, bool) else None
+    if kind == "list":
+        return [str(x) for x in v] if isinstance(v, (list, tuple)) else None
+    return v if isinstance(v, str) else str(v)
+
+
+def _write_parquet(docs: Iterator[dict], path: Path, fields: list[str]) -> int:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export needs pyarrow:  pip install pyarrow")
+
+    types  = {"str": pa.string(), "int": pa.int64(), "float": pa.float64(),
+              "ts": pa.timestamp("ms", tz="UTC"), "list": pa.list_(pa.string())}
+    kinds  = {f: COLUMNS.get(f, "str") for f in fields}
+    schema = pa.schema([(f, types[k]) for f, k in kinds.items()])
+
+    n = 0
+    cols: dict[str, list] = {f: [] for f in fields}
+    with pq.ParquetWriter(path, schema, compression="zstd") as w:
+        def flush():
+            w.write_table(pa.table({f: pa.array(v, type=schema.field(f).type)
+                                    for f, v in cols.items()}, schema=schema))
+            for v in cols.values():
+                v.clear()
+
+        for d in docs:
+            for f, k in kinds.items():
+                cols[f].append(_coerce(k, d.get(f)))
+            n += 1
+            if n % ROW_GROUP == 0:
+                flush()
+        if n % ROW_GROUP or n == 0:
+            flush()
+    return n
+
+
+# ------------------------------------------------------------------
+# incremental state
+# ------------------------------------------------------------------
+def load_watermark(state_dir: Path, key: str, fmt: str = "ndjson") -> Optional[datetime.datetime]:
+    p = Path(state_dir) / STATE_FILE
+    if not p.exists():
+        return None
+    state = json.loads(p.read_text())
+    iso = state.get(f"{fmt}:{key}") or (state.get(key) if fmt == "ndjson" else None)
+    return datetime.datetime.fromisoformat(iso) if iso else None
+
+
+def save_watermark(state_dir: Path, key: str, when: datetime.datetime,
+                   fmt: str = "ndjson") -> None:
+    p = Path(state_dir) / STATE_FILE
+    state = json.loads(p.read_text()) if p.exists() else {}
+    state.pop(key, None)                            # pre-format state file
+    state[f"{fmt}:{key}"] = when.isoformat()
+    p.write_text(json.dumps(state, indent=1))
+
+
+# ------------------------------------------------------------------
+# the export
+# ------------------------------------------------------------------
+def export(out: Path | str | None = None,
+           fmt: str = "ndjson",
+           key: str | None = None,
+           since: datetime.datetime | None = None,
+           incremental: bool = False,
+           fields: list[str] | None = None,
+           collection=None) -> tuple[Path | None, int]:
+    """
+    Write one export file; returns (path, rows).  `out` may be a file or
+    a directory (default `EXPORT_DIR`, file named `jobs-<UTC stamp>`).
+    `key` defaults to `scraped_at`, or `changed_at` when incremental
+    (the only key an incremental run accepts).  An incremental run with
+    nothing new writes no file.
+    """
+    if fmt not in ("ndjson", "parquet"):
+        raise ValueError("fmt must be 'ndjson' or 'parquet'")
+    key = key or (INCREMENTAL_KEY if incremental else "scraped_at")
+    if incremental and key != INCREMENTAL_KEY:
+        raise ValueError(f"incremental exports are keyed on {INCREMENTAL_KEY!r}, not {key!r}: "
+                         "only it moves when a stored doc is written")
+    out = Path(out or EXPORT_DIR)
+    if out.suffix:                                  # explicit file name
+        path, state_dir = out, out.parent
+    else:
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        path, state_dir = out / f"jobs-{stamp}.{fmt}", out
+    state_dir.mkdir(parents=True, exist_ok=True)
+
+    until = None
+    if incremental:
+        if since is None:
+            since = load_watermark(state_dir, key, fmt)
+        until = datetime.datetime.now(datetime.timezone.utc) - EXPORT_LAG
+    fields = list(fields or COLUMNS)
+
+    docs = iter_jobs(key, since, fields, collection=collection, until=until)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=path.suffix)
+    os.close(fd)
+    tmp = Path(tmp)
+    try:
+        n = (_write_parquet(docs, tmp, fields) if fmt == "parquet"
+             else _write_ndjson(docs, tmp))
+        if n == 0 and incremental:
+            tmp.unlink()
+            save_watermark(state_dir, key, until, fmt)
+            print(f"↷ nothing between {since} and {until} – no export written")
+            return None, 0
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    if incremental:
+        save_watermark(state_dir, key, until, fmt)
+    print(f"✓ exported {n} job(s) → {path}")
+    return path, n
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Export the jobs collection.")
+    ap.add_argument("--out", help=f"file or directory (default {EXPORT_DIR}/)")
+    ap.add_argument("--format", choices=("ndjson", "parquet"), default="ndjson")
+    ap.add_argument("--key", choices=KEYS,
+                    help="timestamp that orders / filters the export "
+                         f"(default scraped_at; {INCREMENTAL_KEY} with --incremental)")
+    ap.add_argument("--since", type=datetime.datetime.fromisoformat,
+                    help="only docs with key > this ISO date")
+    ap.add_argument("--incremental", action="store_true",
+                    help="docs written since the previous export "
+                         "(same format; stops EXPORT_LAG_MINUTES before now)")
+    ap.add_argument("--fields", help="comma-separated subset of columns")
+    args = ap.parse_args()
+
+    export(args.out, args.format, args.key, args.since, args.incremental,
+           args.fields.split(",") if args.fields else None)
@@ -0,0 +1,115 @@
+# extract_engine.py  ---------------------------------------------------
+"""
+Compiled, single-pass keyword scanner shared by `cheap_extract`,
+`post_process` and `set_currency_code`.
+
+All keyword inventories (employment / workplace type, degree,
+seniority, explicit currency codes) are folded into ONE candidate
+regex, built once.  `scan(text)` walks the description a single time and returns
+every field; results are memoised, so the three callers that look at
+the same description during one `fetch_job` share a single scan.
+
+The answers are exactly those of the original per-keyword loops:
+for the prioritised inventories the earliest-listed keyword that
+appears *anywhere* wins, for currency the left-most code wins.
+"""
+
+from __future__ import annotations
+import re
+from functools import lru_cache
+from typing import NamedTuple, Optional
+
+
+class Fields(NamedTuple):
+    employment_type: Optional[str]
+    workplace_type:  Optional[str]
+    degree_required: Optional[str]
+    seniority_level: Optional[str]
+    currency_code:   Optional[str]
+
+
+# category → ([(pattern, value), …] in priority order, case-insensitive?)
+def _inventories() -> dict:
+    from cheap_extract import EMPLOY_TYPES, WORKPLACE_TYPES, DEGREE_KEYWORDS
+    from post_process import SENIORITY_PATTERNS, CURRENCY_3LET
+    return {
+        "employment_type": ([(rf'\b{p}\b', v) for p, v in EMPLOY_TYPES.items()], True),
+        "workplace_type":  ([(rf'\b{p}\b', v) for p, v in WORKPLACE_TYPES.items()], True),
+        "degree_required": ([(rf'\b{p}', v) for p, v in DEGREE_KEYWORDS.items()], True),
+        "seniority_level": ([(p, v) for v, p in SENIORITY_PATTERNS], True),
+        "currency_code":   ([(rf'\b{c}\b', c) for c in sorted(CURRENCY_3LET)], False),
+    }
+
+
+# the only non-ASCII characters for which re.I and `str.lower()` give
+# different answers against ASCII keywords (İ ı ſ and the Kelvin sign)
+_FOLD_TRAPS = frozenset("\u0130\u0131\u017f\u212a")
+
+
+class _Engine:
+    def __init__(self):
+        inv = _inventories()
+        self.fields = list(inv)
+        self.matchers, self.values = {}, {}
+        alts = []
+        for field, (pairs, icase) in inv.items():
+            flag = "i" if icase else "-i"
+            # one anchored matcher per field; alternation order == priority,
+            # and the outer named group tells us which keyword matched
+            self.matchers[field] = re.compile("|".join(
+                f"(?P<_{i}>(?{flag}:{p}))" for i, (p, _) in enumerate(pairs)))
+            self.values[field] = [v for _, v in pairs]
+            alts += [p.replace(r"\b", "") for p, _ in pairs]
+        # candidate finder: every keyword starts on a word boundary, so one
+        # case-insensitive `\b(?:a|b|…)` over the bare words finds a superset
+        # of the start positions; the matchers above then confirm each one
+        assert all(p.startswith(r"\b") for pairs, _ in inv.values() for p, _ in pairs)
+        self.probe = re.compile(r"\b(?:" + "|".join(alts) + r")", re.I)
+
+    def scan(self, text: str) -> Fields:
+        best: dict[str, int] = {}                  # field → best priority
+
+        pos = 0
+        while (m := self.probe.search(text, pos)) is not None:
+            pos = m.start()
+            for field, rx in self.matchers.items():
+                hit = rx.match(text, pos)
+                if hit is None:
+                    continue
+                prio = int(hit.lastgroup[1:])
+                if field == "currency_code":
+                    best.setdefault(field, prio)        # left-most wins
+                elif prio < best.get(field, len(self.values[field])):
+                    best[field] = prio                  # earliest-listed wins
+            pos += 1                                    # candidates may overlap
+
+        out = {f: self.values[f][p] for f, p in best.items()}
+        if not text.isascii() and not _FOLD_TRAPS.isdisjoint(text):
+            # `str.lower()` and re.I disagree on these letters, so keep
+            # post_process's lowercase-then-search semantics for them
+            out["seniority_level"] = self._seniority_lowered(text.lower())
+        return Fields(*(out.get(f) for f in self.fields))
+
+    def _seniority_lowered(self, jd: str) -> Optional[str]:
+        from post_process import SENIORITY_PATTERNS
+        for value, pat in SENIORITY_PATTERNS:
+            if re.search(pat, jd):
+                return value
+        return None
+
+
+@lru_cache(maxsize=1)
+def _engine() -> _Engine:
+    return _Engine()
+
+
+@lru_cache(maxsize=64)
+def scan(text: str) -> Fields:
+    """Every keyword-derived field of one description, in one pass."""
+    return _engine().scan(text)
+
+
+def scan_batch(texts: list[str]) -> list[Fields]:
+    """`scan` over many descriptions (engine built once, no memo churn)."""
+    eng = _engine()
+    return [eng.scan(t) for t in texts]
@@ -0,0 +1,238 @@
+# fingerprint.py  ------------------------------------------------------
+"""
+Near-duplicate detection for reposted / syndicated job descriptions.
+
+Every description gets a MinHash signature (`PERMS` 32-bit minima over
+word 3-shingles of its case- and punctuation-folded text); the share
+of equal positions in two signatures estimates the Jaccard similarity
+of their shingle sets, and postings at or above `MIN_SIMILARITY` are
+treated as the same role.  Lookups go through an LSH index of `BANDS`
+bands × `ROWS` rows, so only postings that share a whole band are ever
+compared (≈99% recall at 0.7 similarity, ~none for unrelated text).
+
+    sig = signature(doc["job_description"])
+    canonical = fingerprints().match(sig)     # earliest posting, or None
+
+`link_duplicate(doc)` is the pipeline stage: it stores `fingerprint`
+(the signature, base64) on the doc and, for a near-duplicate,
+`duplicate_of` plus the canonical posting's `required_skills`, so the
+LLM is not asked again.
+"""
+
+from __future__ import annotations
+import re, base64, hashlib, threading
+from typing import Optional, TYPE_CHECKING
+
+from metrics import incr
+
+if TYPE_CHECKING:                   # numpy is imported on first use
+    import numpy as np
+
+PERMS          = 64
+BANDS, ROWS    = 16, 4             # BANDS × ROWS == PERMS
+MIN_SIMILARITY = 0.7
+SHINGLE        = 3                 # words per shingle
+MIN_WORDS      = 40                # shorter texts are too generic to fingerprint
+SEED           = 0x5EED_F1A6
+
+_WORD  = re.compile(r"[a-z0-9]+(?:[+#][+#]?)?")          # keeps c++, c#
+_MASKS = None
+
+
+# ------------------------------------------------------------------
+# signatures
+# ------------------------------------------------------------------
+def _h64(s: str) -> int:
+    return int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "little")
+
+
+def _masks():
+    global _MASKS
+    if _MASKS is None:
+        import numpy as np
+        _MASKS = np.random.default_rng(SEED).integers(
+            0, 2 ** 64, size=(PERMS, 1), dtype=np.uint64, endpoint=False)
+    return _MASKS
+
+
+def signature(text: str | None) -> Optional[np.ndarray]:
+    """MinHash signature (uint32[PERMS]), or None for short texts."""
+    words = _WORD.findall((text or "").lower())
+    if len(words) < MIN_WORDS:
+        return None
+    import numpy as np
+    grams = {" ".join(words[i:i + SHINGLE]) for i in range(len(words) - SHINGLE + 1)}
+    h = np.fromiter((_h64(g) for g in grams), dtype=np.uint64, count=len(grams))
+    # one permutation per mask: splitmix64(h ^ mask), minimum of the top 32 bits
+    z = h[None, :] ^ _masks()
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    z ^= z >> np.uint64(31)
+    return (z.min(axis=1) >> np.uint64(32)).astype("<u4")
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two shingle sets."""
+    return float((a == b).mean())
+
+
+def encode(sig: np.ndarray) -> str:
+    return base64.b64encode(sig.astype("<u4").tobytes()).decode()
+
+
+def decode(text: str) -> np.ndarray:
+    import numpy as np
+    return np.frombuffer(base64.b64decode(text), dtype="<u4")
+
+
+def _bands(sig: np.ndarray) -> list[tuple[int, bytes]]:
+    raw = sig.tobytes()
+    return [(i, raw[i * ROWS * 4:(i + 1) * ROWS * 4]) for i in range(BANDS)]
+
+
+# ------------------------------------------------------------------
+# LSH index
+# ------------------------------------------------------------------
+class FingerprintIndex:
+    """url → signature, banded for lookup; loaded once from the store."""
+
+    def __init__(self, collection=None):
+        self.collection = collection
+        self._sig:    dict[str, np.ndarray] = {}
+        self._canon:  dict[str, str] = {}            # duplicate url → canonical url
+        self._skills: dict[str, list[str]] = {}      # canonical url → skills seen
+        self._bands:  dict[tuple[int, bytes], list[str]] = {}
+        self._lock   = threading.Lock()
+        self._loaded = False
+
+    def _coll(self):
+        if self.collection is None:
+            import db
+            self.collection = db.get_jobs()
+        return self.collection
+
+    def load(self) -> "FingerprintIndex":
+        """Read every stored fingerprint once; later calls are no-ops."""
+        if self._loaded:
+            return self
+        with self._lock:
+            if self._loaded:
+                return self
+            try:
+                cur = self._coll().find({}, {"_id": 0, "linkedin_url": 1,
+                                             "fingerprint": 1, "duplicate_of": 1})
+                for d in cur.batch_size(5000):
+                    if d.get("fingerprint") and d.get("linkedin_url"):
+                        self._add(d["linkedin_url"], decode(d["fingerprint"]),
+                                  d.get("duplicate_of"))
+            except Exception as e:               # store down: dedupe this run only
+                print(f"⚠️  fingerprint index not loaded: {e}")
+            self._loaded = True
+        print(f"✓ fingerprint index: {len(self._sig)} postings")
+        return self
+
+    def _add(self, url: str, sig: np.ndarray, canonical: str | None) -> None:
+        if url in self._sig:
+            return
+        self._sig[url] = sig
+        if canonical:
+            self._canon[url] = canonical
+        for band in _bands(sig):
+            self._bands.setdefault(band, []).append(url)
+
+    def add(self, url: str, sig: np.ndarray, canonical: str | None = None) -> None:
+        self.load()
+        with self._lock:
+            self._add(url, sig, canonical)
+
+    def match(self, sig: np.ndarray, exclude: str | None = None) -> Optional[str]:
+        """Canonical URL of the most similar earlier posting, if similar enough."""
+        self.load()
+        best, seen = None, {exclude}
+        with self._lock:
+            for band in _bands(sig):
+                for url in self._bands.get(band, ()):
+                    if url in seen or self._canon.get(url) == exclude:
+                        continue                # itself, or a copy of itself
+                    seen.add(url)
+                    sim = similarity(sig, self._sig[url])
+                    if sim >= MIN_SIMILARITY and (best is None or sim > best[0]):
+                        best = (sim, url)
+            if best is None:
+                return None
+            return self._canon.get(best[1], best[1])
+
+    # ---------- enrichment of canonical postings ----------
+    def remember_skills(self, url: str, skills: list[str]) -> None:
+        with self._lock:
+            self._skills[url] = skills
+
+    def skills(self, url: str) -> Optional[list[str]]:
+        with self._lock:
+            if url in self._skills:
+                return self._skills[url]
+        d = self._coll().find_one({"linkedin_url": url}, {"_id": 0, "required_skills": 1})
+        found = (d or {}).get("required_skills")
+        if found:
+            self.remember_skills(url, found)
+        return found
+
+    def __len__(self) -> int:
+        return len(self.load()._sig)
+
+
+_index: FingerprintIndex | None = None
+_index_lock = threading.Lock()
+
+
+def fingerprints() -> FingerprintIndex:
+    """Process-wide index of stored fingerprints."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = FingerprintIndex()
+        return _index
+
+
+# ------------------------------------------------------------------
+# pipeline stage
+# ------------------------------------------------------------------
+def link_duplicate(doc: dict, index: FingerprintIndex | None = None) -> Optional[str]:
+    """
+    Fingerprint `doc`; if it repeats an earlier posting, link it
+    (`duplicate_of`) and copy that posting's skills.  Returns the
+    canonical URL or None.
+    """
+    sig = signature(doc.get("job_description"))
+    if sig is None:
+        return None
+    if index is None:
+        index = fingerprints()
+    url   = doc["linkedin_url"]
+    doc["fingerprint"] = encode(sig)
+
+    canonical = index.match(sig, exclude=url)
+    index.add(url, sig, canonical)
+    if canonical is None:
+        return None
+
+    doc["duplicate_of"] = canonical
+    incr("dedupe.duplicates")
+    if not doc.get("required_skills") and (skills := index.skills(canonical)):
+        doc["required_skills"] = skills
+        incr("dedupe.skills_reused")
+    return canonical
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":               # python fingerprint.py a.txt b.txt …
+    import sys
+    from pathlib import Path
+    sigs  = {p: signature(Path(p).read_text(encoding="utf-8")) for p in sys.argv[1:]}
+    paths = [p for p, s in sigs.items() if s is not None]
+    for p in sigs.keys() - set(paths):
+        print(f"(too short)  {p}")
+    for i, a in enumerate(paths):
+        for b in paths[i + 1:]:
+            sim = similarity(sigs[a], sigs[b])
+            print(f"{sim:.2f}  {a} ↔ {b}" + ("   ← near-duplicate" if sim >= MIN_SIMILARITY else ""))
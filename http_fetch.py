@@ -0,0 +1,193 @@
+# http_fetch.py  -------------------------------------------------------
+"""
+Browser-free fetch path for public LinkedIn job pages.
+
+`fetch_job_http(url)` downloads the guest `/jobs/view/<id>/` page with a
+pooled keep-alive `requests.Session` and parses it with BeautifulSoup
+(lxml).  It returns the same dict shape as
+`linkedin_scraper.Job.to_dict()`, so everything downstream of the
+scrape (cheap pass, post-processing, DB) works unchanged.
+
+`parse_job_html(html, url)` is the pure parser – use it on saved pages:
+    $ python http_fetch.py fixtures/jobs/4209878123.html
+"""
+
+from __future__ import annotations
+import re, threading
+from typing import Dict, Optional, TYPE_CHECKING
+
+if TYPE_CHECKING:                  # requests / bs4 are imported on first use
+    import requests
+
+
+HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                   "AppleWebKit/537.36 (KHTML, like Gecko) "
+                   "Chrome/124.0 Safari/537.36"),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+TIMEOUT      = 10        # seconds
+THROTTLED    = (429, 999)    # 999 is LinkedIn's own "slow down"
+
+# fields that must be present for the HTTP result to replace the browser
+REQUIRED_FIELDS = ("job_title", "company", "location", "job_description")
+
+# ------------------------------------------------------------------
+# session (one per process, keep-alive, shared by all threads)
+# ------------------------------------------------------------------
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+
+            s = requests.Session()
+            s.headers.update(HEADERS)
+            retry = Retry(total=2, backoff_factor=0.5,
+                          status_forcelist=(502, 503, 504),
+                          allowed_methods=("GET",))
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                                  max_retries=retry)
+            s.mount("https://", adapter)
+            s.mount("http://",  adapter)
+            _session = s
+        return _session
+
+
+def _polite_wait() -> None:
+    """Wait for the shared, adaptive HTTP budget (see rate_limit.py)."""
+    from rate_limit import limiter
+    limiter("http").acquire()
+
+
+def _retry_after(resp) -> float | None:
+    try:
+        return float(resp.headers.get("Retry-After"))
+    except (TypeError, ValueError):
+        return None
+
+
+# ------------------------------------------------------------------
+# parsing
+# ------------------------------------------------------------------
+def _text(node) -> Optional[str]:
+    if node is None:
+        return None
+    txt = node.get_text(" ", strip=True)
+    return txt or None
+
+
+def _first(soup, *selectors):
+    for sel in selectors:
+        node = soup.select_one(sel)
+        if node is not None:
+            return node
+    return None
+
+
+def _applicants(caption: Optional[str]) -> Optional[int]:
+    """'Over 200 applicants' → 200, as post_process does for the browser."""
+    m = re.search(r"(\d[\d,]*)", caption or "")
+    return int(m.group(1).replace(",", "")) if m else None
+
+
+def parse_job_html(html: str, url: str) -> Dict:
+    """Parse a public job page into the `Job.to_dict()` shape."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, "lxml")
+
+    title   = _first(soup, "h1.top-card-layout__title", "h1.topcard__title")
+    org     = _first(soup, "a.topcard__org-name-link",
+                     "span.topcard__flavor a", "span.topcard__flavor")
+    loc     = _first(soup, "span.topcard__flavor--bullet")
+    posted  = _first(soup, "span.posted-time-ago__text",
+                     "span.topcard__flavor--metadata")
+    appl    = _first(soup, "figcaption.num-applicants__caption",
+                     "span.num-applicants__caption")
+    desc    = _first(soup, "div.show-more-less-html__markup",
+                     "div.description__text")
+
+    company_url = None
+    if org is not None and org.name == "a" and org.get("href"):
+        company_url = org["href"].split("?")[0]
+
+    job_description = None
+    if desc is not None:
+        # keep block structure like the browser's innerText does
+        lines = (ln.strip() for ln in desc.get_text("\n").splitlines())
+        job_description = "\n".join(ln for ln in lines if ln) or None
+
+    doc = {
+        "linkedin_url":         url,
+        "job_title":            _text(title),
+        "company":              _text(org),
+        "company_linkedin_url": company_url,
+        "location":             _text(loc),
+        "posted_date":          _text(posted),
+        "job_description":      job_description,
+    }
+    # no caption → leave it unset, like the browser path (not a false 0)
+    if (applicants := _applicants(_text(appl))) is not None:
+        doc["applicant_count"] = applicants
+    return doc
+
+
+def missing_fields(doc: Dict) -> list[str]:
+    """Names of required fields the HTTP parse could not fill."""
+    return [f for f in REQUIRED_FIELDS if not doc.get(f)]
+
+
+# ------------------------------------------------------------------
+# fetch
+# ------------------------------------------------------------------
+def fetch_job_html(url: str, session: requests.Session | None = None) -> str:
+    """
+    Download one public job page (raises on non-200 / auth wall).
+    Throttling and auth walls make the HTTP rate limiter back off.
+    """
+    from requests import HTTPError
+    from rate_limit import limiter
+    session = session or get_session()
+    _polite_wait()
+    resp = session.get(url, timeout=TIMEOUT)
+    if resp.status_code in THROTTLED:
+        limiter("http").backoff(str(resp.status_code), _retry_after(resp))
+    if resp.status_code != 200:
+        raise HTTPError(f"HTTP {resp.status_code} for {url}",
+                                 response=resp)
+    if "authwall" in resp.url or "/login" in resp.url:
+        limiter("http").backoff("authwall")
+        raise HTTPError(f"auth wall for {url}", response=resp)
+    return resp.text
+
+
+def fetch_job_http(url: str, session: requests.Session | None = None) -> Dict:
+    """Fetch + parse one public job page without a browser."""
+    return parse_job_html(fetch_job_html(url, session), url)
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":       # python http_fetch.py <saved.html | job-url>
+    import sys
+    from pathlib import Path
+    from pprint import pprint
+
+    if len(sys.argv) != 2:
+        print("usage: python http_fetch.py <saved-page.html | job-url>")
+        sys.exit(1)
+    arg = sys.argv[1]
+    if Path(arg).exists():
+        job_id = Path(arg).stem
+        doc = parse_job_html(Path(arg).read_text(encoding="utf-8"),
+                             f"https://www.linkedin.com/jobs/view/{job_id}/")
+    else:
+        doc = fetch_job_http(arg)
+    pprint(doc, width=120)
+    if missing_fields(doc):
+        print("missing:", ", ".join(missing_fields(doc)))
@@ -0,0 +1,353 @@
+# job_queue.py  --------------------------------------------------------
+"""
+Durable, priority-aware work queue for job URLs (SQLite, stdlib only).
+
+    q = JobQueue()
+    q.put(url, priority=PRIORITY["click"])    # False if already known
+    lease = q.get("worker-0", timeout=5)      # highest priority first
+    ...
+    q.hold(lease)                             # renew it while the scrape runs
+    q.ack(lease)                              # or q.nack(lease, err)
+
+* one row per canonical LinkedIn job ID – the same posting sent twice
+  is only scraped once (re-posting a queued job can raise its priority)
+* `get` leases a row for `lease_secs`; a lease that is neither acked
+  nor renewed becomes visible again, so a crashed worker's job is
+  retried – up to `max_attempts`, after which the row is `failed`
+* `ack` / `nack` / `extend` only touch the lease they were given: a
+  worker whose lease expired and was handed to someone else is told
+  (False) and changes nothing
+* `hold(lease)` renews a lease in the background until it is acked
+  or nacked, so slow (rate-limited) scrapes are not leased twice
+* `recover()` hands back leases held by dead processes on this host
+  straight away instead of waiting for them to expire
+"""
+
+from __future__ import annotations
+import os, time, socket, sqlite3, threading
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from site_converter import extract_job_id
+
+
+QUEUE_DB = Path(os.getenv("QUEUE_DB", "job_queue.sqlite3"))
+
+# higher runs first
+PRIORITY = {"click": 10, "alert": 5, "bulk": 0}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id       TEXT PRIMARY KEY,
+    url          TEXT    NOT NULL,
+    priority     INTEGER NOT NULL DEFAULT 0,
+    state        TEXT    NOT NULL DEFAULT 'queued',  -- queued|leased|done|failed
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    owner        TEXT,
+    lease_until  REAL,
+    available_at REAL    NOT NULL,
+    enqueued_at  REAL    NOT NULL,
+    finished_at  REAL,
+    last_error   TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_ready ON jobs (state, priority DESC, enqueued_at);
+"""
+
+
+class Lease(NamedTuple):
+    job_id:   str
+    url:      str
+    priority: int
+    attempts: int              # including this one
+    owner:    str              # the claim; with `attempts` it identifies this lease
+
+
+def _canonical(url: str) -> tuple[str, str] | None:
+    job_id = extract_job_id(url)
+    if not job_id:
+        return None
+    return job_id, f"https://www.linkedin.com/jobs/view/{job_id}/"
+
+
+class JobQueue:
+    def __init__(self,
+                 path: Path | str = QUEUE_DB,
+                 lease_secs: float = 300,
+                 max_attempts: int = 5,
+                 retry_delay: float = 30):
+        self.path         = Path(path)
+        self.lease_secs   = lease_secs
+        self.max_attempts = max_attempts
+        self.retry_delay  = retry_delay
+        self.owner_prefix = f"{socket.gethostname()}:{os.getpid()}"
+        self._local  = threading.local()
+        self._wakeup = threading.Condition()
+        self._held: dict[str, Lease] = {}
+        self._held_lock = threading.Lock()
+        self._renewer: threading.Thread | None = None
+        self._conn().executescript(SCHEMA)
+
+    # ---------- connection (one per thread) ----------
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _tx(self):
+        """`with self._tx() as c:` – BEGIN IMMEDIATE … COMMIT / ROLLBACK."""
+        return _Immediate(self._conn())
+
+    # ---------- producer side ----------
+    def put(self, url: str, priority: int = 0, requeue_done: bool = False) -> bool:
+        """
+        Queue one URL; returns True if it was new (or a failed job was
+        re-queued).  A queued duplicate only has its priority raised;
+        leased and finished jobs are left alone – `requeue_done=True`
+        deliberately schedules a finished job again.
+        """
+        canon = _canonical(url)
+        if canon is None:
+            raise ValueError(f"no LinkedIn job ID in {url!r}")
+        with self._tx() as c:
+            added = self._insert(c, *canon, priority, requeue_done)
+        if added:
+            with self._wakeup:
+                self._wakeup.notify_all()
+        return added
+
+    def put_many(self, urls: list[str], priority: int = 0,
+                 requeue_done: bool = False) -> list[bool | None]:
+        """
+        `put` for many URLs in ONE transaction (fast bulk imports).
+        Returns one flag per URL: True new, False duplicate, None bad URL.
+        """
+        out, now_ready = [], False
+        with self._tx() as c:
+            for url in urls:
+                canon = _canonical(url)
+                if canon is None:
+                    out.append(None)
+                    continue
+                out.append(self._insert(c, *canon, priority, requeue_done))
+                now_ready |= out[-1]
+        if now_ready:
+            with self._wakeup:
+                self._wakeup.notify_all()
+        return out
+
+    def _insert(self, c: sqlite3.Connection, job_id: str, view_url: str,
+                priority: int, requeue_done: bool) -> bool:
+        now = time.time()
+        row = c.execute("SELECT state FROM jobs WHERE job_id=?", (job_id,)).fetchone()
+        if row is None:
+            c.execute("INSERT INTO jobs (job_id, url, priority, available_at, enqueued_at)"
+                      " VALUES (?,?,?,?,?)", (job_id, view_url, priority, now, now))
+            return True
+        if row["state"] == "failed" or (requeue_done and row["state"] == "done"):
+            c.execute("UPDATE jobs SET state='queued', attempts=0, priority=?,"
+                      " available_at=?, last_error=NULL WHERE job_id=?",
+                      (priority, now, job_id))
+            return True
+        c.execute("UPDATE jobs SET priority=MAX(priority, ?)"
+                  " WHERE job_id=? AND state='queued'", (priority, job_id))
+        return False
+
+    # ---------- consumer side ----------
+    def get(self, worker: str,
+            timeout: float | None = None,
+            poll: float = 1.0) -> Optional[Lease]:
+        """Lease the best ready job; blocks up to `timeout` (None = forever)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            lease = self._claim(f"{self.owner_prefix}:{worker}")
+            if lease is not None:
+                return lease
+            left = None if deadline is None else deadline - time.monotonic()
+            if left is not None and left <= 0:
+                return None
+            # woken early by a local put(); poll for other processes' puts
+            with self._wakeup:
+                self._wakeup.wait(poll if left is None else min(poll, left))
+
+    def _claim(self, owner: str) -> Optional[Lease]:
+        now = time.time()
+        with self._tx() as c:
+            # expired leases whose retries are used up are dead
+            c.execute("UPDATE jobs SET state='failed', finished_at=?, owner=NULL,"
+                      " last_error=COALESCE(last_error, 'lease expired')"
+                      " WHERE state='leased' AND lease_until<? AND attempts>=?",
+                      (now, now, self.max_attempts))
+            row = c.execute(
+                "SELECT job_id, url, priority, attempts FROM jobs"
+                " WHERE (state='queued' AND available_at<=?)"
+                "    OR (state='leased' AND lease_until<?)"
+                " ORDER BY priority DESC, enqueued_at LIMIT 1", (now, now)).fetchone()
+            if row is None:
+                return None
+            c.execute("UPDATE jobs SET state='leased', owner=?, lease_until=?,"
+                      " attempts=attempts+1 WHERE job_id=?",
+                      (owner, now + self.lease_secs, row["job_id"]))
+        return Lease(row["job_id"], row["url"], row["priority"], row["attempts"] + 1, owner)
+
+    # a lease is only ours while nobody has re-leased the row since
+    _OURS = " WHERE job_id=? AND state='leased' AND owner=? AND attempts=?"
+
+    def extend(self, lease: Lease, secs: float | None = None) -> bool:
+        """Renew a lease (for scrapes that run longer than `lease_secs`)."""
+        with self._tx() as c:
+            cur = c.execute("UPDATE jobs SET lease_until=?" + self._OURS,
+                            (time.time() + (secs or self.lease_secs), *_key(lease)))
+        return cur.rowcount == 1
+
+    def ack(self, lease: Lease) -> bool:
+        """Mark a job done; False if the lease was lost to another worker."""
+        self.release(lease)
+        with self._tx() as c:
+            cur = c.execute("UPDATE jobs SET state='done', owner=NULL, lease_until=NULL,"
+                            " finished_at=?, last_error=NULL" + self._OURS,
+                            (time.time(), *_key(lease)))
+        return cur.rowcount == 1
+
+    def nack(self, lease: Lease, error: str = "", delay: float | None = None) -> bool:
+        """
+        Give a job back after a failure; returns False once it is
+        `failed` (or if the lease was lost to another worker).
+        """
+        self.release(lease)
+        now = time.time()
+        with self._tx() as c:
+            row = c.execute("SELECT attempts FROM jobs" + self._OURS,
+                            _key(lease)).fetchone()
+            if row is None:
+                return False
+            if row["attempts"] >= self.max_attempts:
+                c.execute("UPDATE jobs SET state='failed', owner=NULL, lease_until=NULL,"
+                          " finished_at=?, last_error=? WHERE job_id=?",
+                          (now, error[:500], lease.job_id))
+                return False
+            backoff = self.retry_delay * 2 ** (row["attempts"] - 1) if delay is None else delay
+            c.execute("UPDATE jobs SET state='queued', owner=NULL, lease_until=NULL,"
+                      " available_at=?, last_error=? WHERE job_id=?",
+                      (now + backoff, error[:500], lease.job_id))
+        return True
+
+    # ---------- lease renewal ----------
+    def hold(self, lease: Lease) -> None:
+        """Renew `lease` every `lease_secs / 3` until it is acked, nacked or released."""
+        with self._held_lock:
+            self._held[lease.job_id] = lease
+            if self._renewer is None:
+                self._renewer = threading.Thread(target=self._renew, name="lease-renewer",
+                                                 daemon=True)
+                self._renewer.start()
+
+    def release(self, lease: Lease) -> None:
+        with self._held_lock:
+            if self._held.get(lease.job_id) == lease:
+                del self._held[lease.job_id]
+
+    def _renew(self) -> None:
+        while True:
+            time.sleep(self.lease_secs / 3)
+            with self._held_lock:
+                held = list(self._held.values())
+            for lease in held:
+                try:
+                    if not self.extend(lease):
+                        print(f"⚠️  lease on {lease.url} was lost")
+                        self.release(lease)
+                except sqlite3.Error as e:
+                    print(f"⚠️  could not renew lease on {lease.url}: {e}")
+
+    # ---------- maintenance / stats ----------
+    def recover(self) -> int:
+        """
+        Re-queue leases held by processes on this host that no longer
+        exist (or by this PID – containers restart as the same PID).
+        Call once at startup, before this process leases anything.
+        """
+        host = socket.gethostname()
+        dead = []
+        with self._tx() as c:
+            for row in c.execute("SELECT job_id, owner FROM jobs"
+                                 " WHERE state='leased' AND owner LIKE ?", (host + ":%",)):
+                pid = int(row["owner"].split(":")[1])
+                if pid == os.getpid() or not _alive(pid):
+                    dead.append(row["job_id"])
+            c.executemany("UPDATE jobs SET state='queued', owner=NULL, lease_until=NULL,"
+                          " available_at=? WHERE job_id=?",
+                          [(time.time(), j) for j in dead])
+        if dead:
+            print(f"✓ re-queued {len(dead)} job(s) left running by a previous run")
+        return len(dead)
+
+    def status(self, job_id: str) -> Optional[dict]:
+        """One job's row plus how many queued jobs will run before it."""
+        conn = self._conn()
+        row  = conn.execute("SELECT job_id, url, priority, state, attempts, enqueued_at,"
+                            " finished_at, last_error FROM jobs WHERE job_id=?",
+                            (job_id,)).fetchone()
+        if row is None:
+            return None
+        out = dict(row)
+        if row["state"] == "queued":
+            out["ahead"] = conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE state='queued' AND"
+                " (priority>? OR (priority=? AND enqueued_at<?))",
+                (row["priority"], row["priority"], row["enqueued_at"])).fetchone()[0]
+        return out
+
+    def counts(self) -> dict[str, int]:
+        out = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+        for row in self._conn().execute("SELECT state, COUNT(*) n FROM jobs GROUP BY state"):
+            out[row["state"]] = row["n"]
+        return out
+
+    def __len__(self) -> int:
+        """Jobs not finished yet (queued + leased)."""
+        c = self.counts()
+        return c["queued"] + c["leased"]
+
+
+class _Immediate:
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+    def __enter__(self) -> sqlite3.Connection:
+        self.conn.execute("BEGIN IMMEDIATE")
+        return self.conn
+
+    def __exit__(self, exc_type, *_) -> None:
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+def _key(lease: Lease) -> tuple:
+    return lease.job_id, lease.owner, lease.attempts
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":     # python job_queue.py [urls.txt]  → enqueue / show counts
+    import sys
+    q = JobQueue()
+    if len(sys.argv) == 2:
+        urls  = [l.strip() for l in open(sys.argv[1]) if l.strip()]
+        flags = q.put_many(urls, PRIORITY["bulk"])
+        print(f"✓ queued {sum(f is True for f in flags)}/{len(urls)} new URLs "
+              f"({flags.count(None)} without a job ID)")
+    print(q.counts())
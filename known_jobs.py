@@ -0,0 +1,107 @@
+# known_jobs.py  -------------------------------------------------------
+"""
+In-memory index of the job IDs already in the `jobs` collection.
+
+Loaded once with a projection-only query (just the URL and the last
+scrape time – a few bytes per job), then kept current through the
+`db.on_upsert` hook, so every write this process makes is reflected
+without re-reading Mongo.  URLs are filtered before they ever reach a
+browser:
+
+    todo, skipped = known_jobs().filter(urls)                 # new only
+    todo, skipped = known_jobs().filter(urls, older_than=7 * 86400)
+"""
+
+from __future__ import annotations
+import time, datetime, threading
+from typing import Iterable, Optional
+
+import db
+from site_converter import extract_job_id
+
+
+def _epoch(value) -> float:
+    if isinstance(value, datetime.datetime):
+        if value.tzinfo is None:                 # pymongo hands back naive UTC
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        return value.timestamp()
+    return 0.0
+
+
+class KnownJobs:
+    """job ID (int) → epoch seconds of its last scrape."""
+
+    def __init__(self, collection=None):
+        self.collection = collection
+        self._seen: dict[int, float] = {}
+        self._lock   = threading.Lock()
+        self._loaded = False
+
+    # ---------- loading ----------
+    def load(self) -> "KnownJobs":
+        """Read every stored job ID once; later calls are no-ops."""
+        if self._loaded:
+            return self
+        with self._lock:
+            if self._loaded:
+                return self
+            coll = self.collection if self.collection is not None else db.get_jobs()
+            t0   = time.perf_counter()
+            cur  = coll.find({}, {"_id": 0, "linkedin_url": 1,
+                                  "last_scraped_at": 1, "scraped_at": 1})
+            for d in cur.batch_size(5000):
+                jid = extract_job_id(d.get("linkedin_url") or "")
+                if jid:
+                    when = _epoch(d.get("last_scraped_at") or d.get("scraped_at"))
+                    self._seen[int(jid)] = max(when, self._seen.get(int(jid), 0.0))
+            self._loaded = True
+        print(f"✓ known-jobs index: {len(self._seen)} IDs "
+              f"in {time.perf_counter() - t0:.2f}s")
+        return self
+
+    # ---------- updates (registered with db.on_upsert) ----------
+    def mark(self, url: str, when: Optional[datetime.datetime] = None) -> None:
+        jid = extract_job_id(url)
+        if jid:
+            ts = _epoch(when) or time.time()
+            with self._lock:
+                self._seen[int(jid)] = max(ts, self._seen.get(int(jid), 0.0))
+
+    # ---------- queries ----------
+    def last_scraped(self, url: str) -> Optional[float]:
+        jid = extract_job_id(url)
+        return self.load()._seen.get(int(jid)) if jid else None
+
+    def is_fresh(self, url: str, older_than: float | None = None) -> bool:
+        """Known, and (with `older_than` seconds) scraped more recently than that."""
+        when = self.last_scraped(url)
+        if when is None:
+            return False
+        return older_than is None or time.time() - when < older_than
+
+    __contains__ = is_fresh
+
+    def filter(self, urls: Iterable[str],
+               older_than: float | None = None) -> tuple[list[str], list[str]]:
+        """Split `urls` into (to scrape, skipped because already stored)."""
+        todo, skipped = [], []
+        for u in urls:
+            (skipped if self.is_fresh(u, older_than) else todo).append(u)
+        return todo, skipped
+
+    def __len__(self) -> int:
+        return len(self.load()._seen)
+
+
+_index: KnownJobs | None = None
+_index_lock = threading.Lock()
+
+
+def known_jobs() -> KnownJobs:
+    """Process-wide index, hooked into every upsert made through `db`."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = KnownJobs()
+            db.on_upsert(lambda url, when, _fields: _index.mark(url, when))
+        return _index
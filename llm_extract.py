@@ -1,9 +1,43 @@
 # llm_extract.py  –  works with openai>=1.0
-import os, json, asyncio
-from openai import AsyncOpenAI, APITimeoutError
+"""
+LLM skill extraction as a background stage.
+
+`SkillStage` runs one asyncio loop on a daemon thread with a bounded
+number of concurrent OpenAI calls, retries timeouts / rate limits with
+exponential backoff, and caches every answer on disk keyed by a hash
+of the normalised description – reposts cost zero tokens.
+
+    stage = SkillStage(sink=lambda url, skills: ...)   # called on arrival
+    fut   = stage.submit(description, key=url)         # never blocks
+    ...
+    stage.close()                                      # drain + stop
+"""
+import os, json, asyncio, hashlib, random, threading, tempfile
+from pathlib import Path
+from concurrent.futures import Future
+from typing import Callable, Optional
 from dotenv import load_dotenv; load_dotenv()
+from metrics import span, incr
+from skill_taxonomy import canonicalize
+
+MODEL          = "gpt-4.1-nano"
+MAX_CHARS      = 12_000
+CACHE_DIR      = Path(os.getenv("LLM_CACHE_DIR", ".llm_cache"))
 
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+_client = None                     # openai is slow to import – build on first call
+
+
+def get_client():
+    global _client
+    if _client is None:
+        from openai import AsyncOpenAI
+        _client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _client
+
+
+def _retryable() -> tuple:
+    from openai import APITimeoutError, APIConnectionError, RateLimitError
+    return (APITimeoutError, APIConnectionError, RateLimitError)
 
 SYSTEM_PROMPT = """
 You are a data-mining assistant. Extract up to 12 REQUIRED skills from
@@ -20,20 +54,240 @@ Assume skills are single concepts (e.g., "Python", "A/B testing",
 "SQL", "Snowflake"). Do not invent skills that aren't in the text.
 """
 
+async def _ask_llm(text: str, llm=None) -> list[str] | None:
+    """One raw chat-completion round-trip (exceptions propagate)."""
+    response = await (llm or get_client()).chat.completions.create(
+        model=MODEL,
+        temperature=0.2,
+        response_format={"type": "json_object"},
+        messages=[
+            {"role": "system", "content": SYSTEM_PROMPT.strip()},
+            {"role": "user",   "content": text[:MAX_CHARS]}
+        ],
+        timeout=30  # seconds
+    )
+    data = json.loads(response.choices[0].message.content)
+    return data.get("required_skills")
+
+
 async def extract_required_skills(text: str) -> list[str] | None:
     try:
-        response = await client.chat.completions.create(
-            model="gpt-4.1-nano",
-            temperature=0.2,
-            response_format={"type": "json_object"},
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT.strip()},
-                {"role": "user",   "content": text[:12_000]}
-            ],
-            timeout=30  # seconds
-        )
-        data = json.loads(response.choices[0].message.content)
-        return data.get("required_skills")
-    except (APITimeoutError, Exception) as e:
+        return await _ask_llm(text)
+    except Exception as e:
         print("⚠️ LLM extract failed:", e)
         return None
+
+
+# ------------------------------------------------------------------
+# on-disk cache
+# ------------------------------------------------------------------
+def description_key(text: str) -> str:
+    """sha256 of the text the model would see, case/whitespace-folded."""
+    norm = " ".join(text[:MAX_CHARS].split()).lower()
+    return hashlib.sha256(norm.encode()).hexdigest()
+
+
+class SkillCache:
+    """One small JSON file per description hash, sharded by prefix."""
+
+    def __init__(self, root: Path | str = CACHE_DIR):
+        self.root = Path(root)
+        self._mem: dict[str, list[str]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> list[str] | None:
+        with self._lock:
+            if key in self._mem:
+                return self._mem[key]
+        p = self._path(key)
+        if not p.exists():
+            return None
+        skills = json.loads(p.read_text())["required_skills"]
+        with self._lock:
+            self._mem[key] = skills
+        return skills
+
+    def put(self, key: str, skills: list[str]) -> None:
+        with self._lock:
+            self._mem[key] = skills
+        p = self._path(key)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w") as fh:
+            json.dump({"required_skills": skills}, fh)
+        os.replace(tmp, p)
+
+
+# ------------------------------------------------------------------
+# the stage
+# ------------------------------------------------------------------
+class SkillStage:
+    """Async queue + bounded workers + retry/backoff + persistent cache."""
+
+    def __init__(self,
+                 sink: Optional[Callable[[str, list[str]], None]] = None,
+                 concurrency: int = 4,
+                 retries: int = 3,
+                 backoff: float = 1.0,
+                 llm=None,
+                 cache: SkillCache | None = None):
+        self.sink        = sink
+        self.concurrency = concurrency
+        self.retries     = retries
+        self.backoff     = backoff
+        self.llm         = llm
+        self.cache       = cache or SkillCache()
+        self._inflight: dict[str, Future] = {}
+        self._lock   = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._thread: threading.Thread | None = None
+        self._ready  = threading.Event()
+
+    # ---------- lifecycle ----------
+    def start(self) -> "SkillStage":
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="llm-stage",
+                                                daemon=True)
+                self._thread.start()
+        self._ready.wait()
+        return self
+
+    def _run(self) -> None:
+        self._loop  = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        for _ in range(self.concurrency):
+            self._loop.create_task(self._worker())
+        self._ready.set()
+        self._loop.run_forever()
+
+        # close() stopped us – cancel idle workers and release the loop
+        tasks = asyncio.all_tasks(self._loop)
+        for t in tasks:
+            t.cancel()
+        self._loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        self._loop.close()
+
+    def join(self, timeout: float | None = None) -> None:
+        """Block until every submitted description has been answered."""
+        with self._lock:
+            pending = list(self._inflight.values())
+        for fut in pending:
+            try:
+                fut.result(timeout=timeout)
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        self.join()
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._thread, self._loop = None, None
+            self._ready.clear()
+
+    # ---------- public API ----------
+    def cached(self, text: str) -> list[str] | None:
+        return self.cache.get(description_key(text))
+
+    def submit(self, text: str, key: str | None = None) -> Future:
+        """
+        Queue one description; returns a Future of the skill list.
+
+        Cache hits come back already resolved and do NOT call the sink –
+        the caller can merge them straight into its doc.
+        """
+        h = description_key(text)
+        hit = self.cache.get(h)
+        if hit is not None:
+            fut: Future = Future()
+            fut.set_result(hit)
+            return fut
+
+        self.start()
+        with self._lock:
+            fut = self._inflight.get(h)
+            if fut is None:
+                fut = Future()
+                self._inflight[h] = fut
+                self._loop.call_soon_threadsafe(self._queue.put_nowait, (h, text, fut))
+        if key is not None and self.sink is not None:
+            fut.add_done_callback(lambda f: self._deliver(key, f))
+        return fut
+
+    def extract(self, text: str) -> list[str] | None:
+        """Blocking convenience wrapper (cache → queue → wait)."""
+        return self.submit(text).result()
+
+    # ---------- internals ----------
+    def _deliver(self, key: str, fut: Future) -> None:
+        skills = fut.result() if not fut.exception() else None
+        if not skills:
+            return
+        try:
+            self.sink(key, skills)
+        except Exception as e:
+            print(f"⚠️ could not store skills for {key}: {e}")
+
+    async def _worker(self) -> None:
+        while True:
+            h, text, fut = await self._queue.get()
+            try:
+                skills = await self._ask_with_retry(text)
+                if skills is not None:
+                    skills = canonicalize(skills)       # "sklearn" → "Scikit-learn"
+                    self._remember(h, skills)
+                done, value = fut.set_result, skills
+            except Exception as e:
+                done, value = fut.set_exception, e
+            try:
+                # sink callbacks may hit the DB – keep them off the event loop
+                await self._loop.run_in_executor(None, done, value)
+            finally:
+                with self._lock:
+                    self._inflight.pop(h, None)
+                self._queue.task_done()
+
+    def _remember(self, h: str, skills: list[str]) -> None:
+        """Cache an answer; a failed write (disk full, …) only costs a re-ask later."""
+        try:
+            self.cache.put(h, skills)
+        except OSError as e:
+            print(f"⚠️ could not cache skills: {e}")
+            incr("llm.cache_errors")
+
+    async def _ask_with_retry(self, text: str) -> list[str] | None:
+        retryable = _retryable()
+        for attempt in range(self.retries + 1):
+            try:
+                with span("llm.call"):
+                    return await _ask_llm(text, self.llm)
+            except retryable as e:
+                if attempt == self.retries:
+                    print("⚠️ LLM extract gave up:", e)
+                    incr("llm.gave_up")
+                    return None
+                incr("llm.retries")
+                await asyncio.sleep(self.backoff * 2 ** attempt + random.random())
+            except Exception as e:
+                print("⚠️ LLM extract failed:", e)
+                return None
+
+
+_default_stage: SkillStage | None = None
+_default_lock  = threading.Lock()
+
+
+def default_stage() -> SkillStage:
+    """Process-wide stage without a sink (for blocking `extract` calls)."""
+    global _default_stage
+    with _default_lock:
+        if _default_stage is None:
+            _default_stage = SkillStage()
+        return _default_stage
+
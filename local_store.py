@@ -0,0 +1,317 @@
+# local_store.py  ------------------------------------------------------
+"""
+Embedded SQLite stand-in for the Mongo `jobs` collection.
+
+`LocalJobs` answers the part of the pymongo Collection API the scraper
+uses – `update_one` / `bulk_write` upserts with `$set` + `$setOnInsert`
+(+ a capped `$push` for the change history), and `find()` with a
+projection, `$in` or a range on `scraped_at` / `posted_at` / `changed_at` and a sort – so `upsert_job`, `JobWriter`, `known_jobs` and `export`
+run unchanged against it.  Select it with `JOB_STORE=sqlite` (the
+default when `MONGO_URI` is unset).
+
+* one row per `linkedin_url` (primary key); the doc is a JSON column,
+  `scraped_at` / `posted_at` / `city` / `changed_at` are indexed
+  columns beside it
+* the first-seen `scraped_at` is only written on insert
+* a `bulk_write` is one transaction (WAL mode, one connection per thread)
+* every write bumps the row's `rev`; `sync()` pushes rows whose `rev`
+  is ahead of `synced_rev` to Mongo with the same upsert semantics
+
+    $ JOB_STORE=sqlite python main.py ...        # scrape without Atlas
+    $ python local_store.py --sync               # later, push to MONGO_URI
+"""
+
+from __future__ import annotations
+import os, json, sqlite3, datetime, threading
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple
+
+from job_queue import _Immediate
+
+LOCAL_DB = Path(os.getenv("LOCAL_DB", "jobs.sqlite3"))
+UTC      = datetime.timezone.utc
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    linkedin_url TEXT PRIMARY KEY,
+    doc          TEXT    NOT NULL,             -- JSON, datetimes as {"$date": iso}
+    scraped_at   TEXT,                         -- first seen, UTC ISO (sortable)
+    posted_at    TEXT,
+    city         TEXT,
+    changed_at   TEXT,                         -- last content change (db._diff)
+    rev          INTEGER NOT NULL DEFAULT 1,
+    synced_rev   INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS jobs_scraped_at ON jobs (scraped_at);
+CREATE INDEX IF NOT EXISTS jobs_posted_at  ON jobs (posted_at);
+CREATE INDEX IF NOT EXISTS jobs_city       ON jobs (city);
+CREATE INDEX IF NOT EXISTS jobs_dirty      ON jobs (rev) WHERE rev > synced_rev;
+"""
+_COLUMNS = ("scraped_at", "posted_at", "city", "changed_at")   # queryable besides the URL
+
+
+# ------------------------------------------------------------------
+# (de)serialisation – datetimes round-trip as naive UTC, like pymongo
+# ------------------------------------------------------------------
+def _utc_iso(dt: datetime.datetime) -> str:
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(UTC).replace(tzinfo=None)
+    return dt.isoformat(timespec="microseconds")
+
+
+def _default(v):
+    if isinstance(v, datetime.datetime):
+        return {"$date": _utc_iso(v)}
+    if isinstance(v, datetime.date):
+        return v.isoformat()
+    return str(v)
+
+
+def _hook(d: dict):
+    if len(d) == 1 and "$date" in d:
+        return datetime.datetime.fromisoformat(d["$date"])
+    return d
+
+
+def _dumps(doc: dict) -> str:
+    return json.dumps(doc, default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def _loads(text: str) -> dict:
+    return json.loads(text, object_hook=_hook)
+
+
+def _col(v) -> str | None:
+    if isinstance(v, datetime.datetime):
+        return _utc_iso(v)
+    return None if v is None else str(v)
+
+
+class BulkResult(NamedTuple):
+    upserted_count: int
+    modified_count: int
+
+
+def _migrate(conn: sqlite3.Connection) -> None:
+    """Add `changed_at` to a store created before it was a column."""
+    if "changed_at" not in {r[1] for r in conn.execute("PRAGMA table_info(jobs)")}:
+        conn.execute("ALTER TABLE jobs ADD COLUMN changed_at TEXT")
+        conn.execute("UPDATE jobs SET changed_at = json_extract(doc, '$.changed_at.\"$date\"')")
+    conn.execute("CREATE INDEX IF NOT EXISTS jobs_changed_at ON jobs (changed_at)")
+
+
+# ------------------------------------------------------------------
+# the store
+# ------------------------------------------------------------------
+class LocalJobs:
+    def __init__(self, path: Path | str = LOCAL_DB):
+        self.path   = Path(path)
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        _migrate(conn)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---------- writes ----------
+    def _upsert(self, c: sqlite3.Connection,
+                ops: list[tuple[str, dict]]) -> BulkResult:
+        """ops: (url, update); later ops on a URL win."""
+        old: dict[str, dict] = {}
+        urls = list(dict.fromkeys(u for u, _ in ops))
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            rows  = c.execute("SELECT linkedin_url, doc FROM jobs WHERE linkedin_url IN "
+                              f"({','.join('?' * len(chunk))})", chunk)
+            old.update((u, _loads(d)) for u, d in rows)
+
+        new = 0
+        for url, update in ops:
+            doc = old.get(url)
+            if doc is None:
+                doc = old[url] = {"linkedin_url": url, **update.get("$setOnInsert", {})}
+                new += 1
+            doc.update(update.get("$set", {}))
+            for field, push in update.get("$push", {}).items():
+                items = push["$each"] if isinstance(push, dict) else [push]
+                doc[field] = (doc.get(field) or []) + list(items)
+                if isinstance(push, dict) and "$slice" in push:
+                    n = push["$slice"]
+                    doc[field] = doc[field][n:] if n < 0 else doc[field][:n]
+
+        c.executemany(
+            "INSERT INTO jobs (linkedin_url, doc, scraped_at, posted_at, city, changed_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)"
+            " ON CONFLICT (linkedin_url) DO UPDATE SET"
+            "   doc = excluded.doc, scraped_at = excluded.scraped_at,"
+            "   posted_at = excluded.posted_at, city = excluded.city,"
+            "   changed_at = excluded.changed_at, rev = rev + 1",
+            [(u, _dumps(d), *(_col(d.get(k)) for k in _COLUMNS))
+             for u, d in ((u, old[u]) for u in urls)])
+        return BulkResult(new, len(urls) - new)
+
+    def update_one(self, flt: dict, update: dict, upsert: bool = False) -> BulkResult:
+        if not upsert or set(flt) != {"linkedin_url"}:
+            raise NotImplementedError("LocalJobs only supports upserts by linkedin_url")
+        with _Immediate(self._conn()) as c:
+            return self._upsert(c, [(flt["linkedin_url"], update)])
+
+    def bulk_write(self, ops: Iterable, ordered: bool = True) -> BulkResult:
+        """pymongo `UpdateOne(..., upsert=True)` ops, all in one transaction."""
+        batch = []
+        for op in ops:
+            flt, update = op._filter, op._doc
+            if not op._upsert or set(flt) != {"linkedin_url"}:
+                raise NotImplementedError("LocalJobs only supports upserts by linkedin_url")
+            batch.append((flt["linkedin_url"], update))
+        with _Immediate(self._conn()) as c:
+            return self._upsert(c, batch)
+
+    # ---------- reads ----------
+    def find(self, query: dict | None = None, projection: dict | None = None,
+             batch_size: int = 1000) -> "_Cursor":
+        return _Cursor(self._conn(), query or {}, projection, batch_size)
+
+    def find_one(self, query: dict, projection: dict | None = None) -> dict | None:
+        return next(iter(self.find(query, projection)), None)
+
+    def count_documents(self, query: dict | None = None) -> int:
+        where, args = _where(query or {})
+        return self._conn().execute(f"SELECT COUNT(*) FROM jobs{where}", args).fetchone()[0]
+
+    # ---------- sync ----------
+    def sync(self, collection=None, batch: int = 500) -> tuple[int, int]:
+        """
+        Push rows changed since the last sync to Mongo; returns
+        (pushed, failed).  Failed rows stay dirty for the next run.
+        """
+        from pymongo import UpdateOne
+        from pymongo.errors import BulkWriteError
+        if collection is None:
+            from db import get_mongo_jobs
+            collection = get_mongo_jobs()
+
+        conn   = self._conn()
+        pushed = failed = 0
+        after  = 0
+        while True:
+            rows = conn.execute(
+                "SELECT rowid, linkedin_url, doc, rev FROM jobs"
+                " WHERE rev > synced_rev AND rowid > ? ORDER BY rowid LIMIT ?",
+                (after, batch)).fetchall()
+            if not rows:
+                break
+            after = rows[-1][0]
+
+            ops = []
+            for _, url, doc, _ in rows:
+                d  = _loads(doc)
+                fs = d.pop("scraped_at", None)
+                ops.append(UpdateOne({"linkedin_url": url},
+                                     {"$set": d, "$setOnInsert": {"scraped_at": fs}},
+                                     upsert=True))
+            bad: set[int] = set()
+            try:
+                collection.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                bad = {err["index"] for err in e.details.get("writeErrors", [])}
+
+            # a row rewritten meanwhile keeps its newer rev → stays dirty
+            with _Immediate(conn) as c:
+                c.executemany("UPDATE jobs SET synced_rev = ? WHERE linkedin_url = ? AND rev = ?",
+                              [(rev, url, rev) for i, (_, url, _, rev) in enumerate(rows)
+                               if i not in bad])
+            pushed += len(rows) - len(bad)
+            failed += len(bad)
+            print(f"… synced {pushed} job(s)" + (f", {failed} failed" if failed else ""))
+        return pushed, failed
+
+    def pending_sync(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM jobs WHERE rev > synced_rev").fetchone()[0]
+
+
+# ------------------------------------------------------------------
+# queries – equality / $in on the URL or indexed columns, ranges on dates
+# ------------------------------------------------------------------
+_OPS = {"$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<=", "$eq": "=", "$in": "IN"}
+
+
+def _where(query: dict) -> tuple[str, list]:
+    sql, args = [], []
+    for field, cond in query.items():
+        if field not in ("linkedin_url", *_COLUMNS):
+            raise NotImplementedError(f"LocalJobs can't filter on {field!r}")
+        conds = cond.items() if isinstance(cond, dict) else [("$eq", cond)]
+        for op, v in conds:
+            if op not in _OPS:
+                raise NotImplementedError(f"LocalJobs doesn't support {op}")
+            if op == "$in":
+                v = list(v)
+                sql.append(f"{field} IN ({','.join('?' * len(v))})" if v else "0")
+                args.extend(_col(x) for x in v)
+                continue
+            sql.append(f"{field} {_OPS[op]} ?")
+            args.append(_col(v))
+    return (" WHERE " + " AND ".join(sql) if sql else ""), args
+
+
+class _Cursor:
+    """Lazy result set; `sort` / `batch_size` chain like pymongo's."""
+
+    def __init__(self, conn, query, projection, batch_size):
+        self._conn, self._query, self._proj = conn, query, projection
+        self._batch = batch_size
+        self._order = ""
+        self._cur   = None
+
+    def sort(self, key: str, direction: int = 1) -> "_Cursor":
+        if key not in ("linkedin_url", *_COLUMNS):
+            raise NotImplementedError(f"LocalJobs can't sort on {key!r}")
+        self._order = f" ORDER BY {key} {'ASC' if direction > 0 else 'DESC'}"
+        return self
+
+    def batch_size(self, n: int) -> "_Cursor":
+        self._batch = n
+        return self
+
+    def __iter__(self) -> Iterator[dict]:
+        where, args = _where(self._query)
+        keep = {k for k, v in (self._proj or {}).items() if v and k != "_id"}
+        self._cur = self._conn.execute(f"SELECT doc FROM jobs{where}{self._order}", args)
+        try:
+            while rows := self._cur.fetchmany(self._batch):
+                for (doc,) in rows:
+                    d = _loads(doc)
+                    yield {k: v for k, v in d.items() if k in keep} if keep else d
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self._cur is not None:
+            self._cur.close()
+            self._cur = None
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Local SQLite job store.")
+    ap.add_argument("--db", default=str(LOCAL_DB))
+    ap.add_argument("--sync", action="store_true", help="push unsynced jobs to MONGO_URI")
+    args = ap.parse_args()
+
+    store = LocalJobs(args.db)
+    if args.sync:
+        pushed, failed = store.sync()
+        print(f"✓ pushed {pushed} job(s) to Mongo" + (f" ({failed} failed)" if failed else ""))
+    else:
+        print(f"{store.count_documents()} job(s), {store.pending_sync()} not yet synced")
@@ -10,14 +10,38 @@ Usage
 2) Or just copy-paste links into jobs_to_scrape.txt
    then run:
    $ python main.py
+3) Scrape with more browsers in parallel (default: $SCRAPER_WORKERS or 2):
+   $ python main.py --workers 4
+4) Re-run extraction over every stored page snapshot (no browser/network):
+   $ python main.py --reparse
+5) Jobs already in Mongo are skipped; re-scrape ones older than 7 days:
+   $ python main.py --refresh-older-than 7
+6) Harvest URLs from a search (only pages newer than the last run):
+   $ python main.py --search "data scientist" --location Canada
+7) Continue the last run after a crash (see run_journal.py):
+   $ python main.py --resume
+8) Overlap page loads with parsing (staged pipeline, see pipeline.py):
+   $ python main.py --pipeline --stage-workers fetch=4,parse=2
 """
 
 from __future__ import annotations
-import sys, time, random
+import sys, time, argparse
+from contextlib import nullcontext
+from itertools import chain
 from pathlib import Path
-from typing import List
-from scraper import make_driver, fetch_job, search_to_view
-from db import upsert_job
+from typing import Iterable, Iterator, List
+from functools import partial
+from scraper import fetch_job
+from site_converter import search_to_view
+from driver_pool import DriverPool, DEFAULT_SIZE
+from llm_extract import SkillStage
+from pipeline import JobPipeline
+from db import JobWriter
+from known_jobs import known_jobs
+from vectors import vectors
+from rollups import rollups
+from run_journal import RunJournal
+from metrics import metrics
 from pprint import pprint
 
 
@@ -32,8 +56,6 @@ def collect_urls(cli_args: List[str]) -> List[str]:
     urls = [u.strip() for u in cli_args if u.strip()]
     if PASTE_FILE.exists():
         urls += [ln.strip() for ln in PASTE_FILE.read_text().splitlines() if ln.strip()]
-        # clear the file so we don't double-scrape next run
-        PASTE_FILE.write_text("")
     # simple de-dupe while preserving order
     seen, clean = set(), []
     for u in urls:
@@ -43,43 +65,189 @@ def collect_urls(cli_args: List[str]) -> List[str]:
     return clean
 
 
-# --------------------------------------------------------------------- #
-#  main                                                                 #
-# --------------------------------------------------------------------- #
-def main(raw_urls: List[str]):
-    urls_view = []
+def new_jobs(raw_urls: Iterable[str], older_than: float | None = None) -> Iterator[str]:
+    """
+    View URLs from `raw_urls` (a list or a lazy crawl) that are not
+    stored yet, or were last scraped at least `older_than` seconds ago.
+    """
+    index, skipped = known_jobs(), 0
     for u in raw_urls:
         job_link = u if "/jobs/view/" in u else search_to_view(u)
-        if job_link:
-            urls_view.append(job_link)
-        else:
+        if not job_link:
             print(f"⚠️  skipped (no jobId found): {u}")
+        elif index.is_fresh(job_link, older_than):
+            skipped += 1                # already in the DB – no page load
+        else:
+            yield job_link
+    if skipped:
+        print(f"↷ skipped {skipped} already-scraped job(s)")
 
-    if not urls_view:
-        print("No new URLs found. Exiting.")
-        return
 
-    driver = make_driver(headless=False)
-    ok, failed = 0, 0
+def clear_paste_file() -> None:
+    """Empty the paste file so we don't double-scrape next run."""
+    if PASTE_FILE.exists():
+        PASTE_FILE.write_text("")
+
+
+# --------------------------------------------------------------------- #
+#  main                                                                 #
+# --------------------------------------------------------------------- #
+def main(raw_urls: Iterable[str], workers: int = DEFAULT_SIZE, headless: bool = False,
+         refresh_older_than: float | None = None, journal: RunJournal | None = None,
+         lean: bool | None = None, pipeline: bool = False,
+         stage_workers: str | None = None):
+    """
+    `raw_urls` may be lazy (e.g. a search crawl): each URL is journaled
+    and scraped as it is yielded, and the paste file is cleared once the
+    stream is exhausted.
+    `refresh_older_than` (days): re-scrape stored jobs at least that old.
+    `journal`: continue an interrupted run instead of starting a new one.
+    `lean`: browsers skip images, fonts and trackers (see `make_driver`).
+    `pipeline`: run fetch / parse / enrich / store as overlapping stages
+    (`stage_workers` like "fetch=4,parse=2", see pipeline.py).
+    """
+    stream = None
+    if journal is None:
+        # drop postings already in the DB before they cost a page load
+        max_age = None if refresh_older_than is None else refresh_older_than * 86400
+        fresh   = new_jobs(raw_urls, older_than=max_age)
+        first   = next(fresh, None)
+        if first is None:
+            clear_paste_file()
+            print("No new URLs found. Exiting.")
+            return
 
-    for url in urls_view:
-        try:
-            doc = fetch_job(url, driver)
-            upsert_job(doc)
-            ok += 1
-            print(f"✓ stored {doc['job_title'][:40]} > {doc['company']}")
-        except Exception as e:
-            failed += 1
-            print(f"❌ {url}   reason: {e}")
-        # polite delay
-        time.sleep(random.uniform(1.5, 3.0))
+        journal = RunJournal.create([])
+        print(f"✓ run journal: {journal.path}")
 
-    driver.quit()
-    print(f"\nDone. Success: {ok}  |  Failed: {failed}")
+        def journaled(urls):
+            # record each URL before it is scraped, so --resume finds it
+            for u in urls:
+                if u not in journal.state:
+                    journal.add([u])
+                    yield u
+            clear_paste_file()          # safe now: every URL is in the journal
+
+        stream = journaled(chain([first], fresh))
+
+    scraped: dict[str, str] = {}        # stored linkedin_url → journal URL
+
+    def flushed(written, failed):
+        journal.done([scraped.pop(u, u) for u in written])   # only once it is stored
+        for u in failed:
+            journal.failed(scraped.pop(u, u), "db write error")
+
+    writer = JobWriter(batch_size=100, on_flush=flushed)
+    vectors()                           # every stored doc is indexed for similar-job search
+    rollups()                           # … and counted into the /stats rollups
+
+    # LLM skills are fetched in the background and merged in on arrival
+    stage = SkillStage(sink=lambda url, skills:
+                       writer.add_fields(url, {"required_skills": skills}))
+    fetch = partial(fetch_job, skills_stage=stage)
+
+    def store(url, doc):
+        scraped[doc["linkedin_url"]] = url
+        writer.add(doc)
+
+    # page loads are paced by the shared rate_limit.limiter("browser") bucket
+    try:
+        with DriverPool(size=workers, headless=headless, lean=lean) as pool, \
+             (JobPipeline(pool, store=store, skills_stage=stage, workers=stage_workers)
+              if pipeline else nullcontext()) as pipe:
+            while True:
+                if stream is not None:
+                    todo, stream = stream, None     # first pass: URLs as they arrive
+                else:
+                    todo = journal.ready()
+                if not todo:
+                    retry_at = journal.next_retry()
+                    if retry_at is None:
+                        break
+                    wait = max(0.0, retry_at - time.time())
+                    print(f"↻ retrying failed URL(s) in {wait:.0f}s")
+                    time.sleep(wait)
+                    continue
+
+                done = pipe.map(todo) if pipe else pool.map(fetch, todo, lazy=True)
+                for url, doc, err in done:
+                    if err:
+                        journal.failed(url, err)
+                        print(f"❌ {url}   reason: {err}")
+                        continue
+                    if pipe is None:
+                        store(url, doc)     # the pipeline's store stage did this
+                    print(f"✓ scraped {doc['job_title'][:40]} > {doc['company']}")
+                writer.flush()          # settle this pass in the journal
+                for url in list(scraped.values()):
+                    journal.failed(url, "scraped but not stored")
+                scraped.clear()
+    except KeyboardInterrupt:
+        print("\n⚠️  interrupted – continue with:  python main.py --resume")
+        raise
+    finally:
+        stage.close()
+        writer.close()                  # final flush
+        journal.close()
+
+    counts = journal.counts()
+    print(f"\nDone. Success: {counts['done']}  |  Failed: {counts['failed']}  "
+          f"|  DB batches: {writer.totals['batches']}  "
+          f"unchanged: {writer.totals['unchanged']}  "
+          f"write errors: {writer.totals['errors']}")
+    print("\nWhere the time went:")
+    print(metrics.summary())
 
 
 # --------------------------------------------------------------------- #
 if __name__ == "__main__":
-    # sys.argv[1:] are any URLs passed on the command line
-    raw_urls = collect_urls(sys.argv[1:])
-    main(raw_urls)
+    ap = argparse.ArgumentParser(description="Scrape LinkedIn job postings.")
+    ap.add_argument("urls", nargs="*", help="job or search URLs")
+    ap.add_argument("--workers", type=int, default=DEFAULT_SIZE,
+                    help="number of parallel browsers")
+    ap.add_argument("--headless", action="store_true")
+    ap.add_argument("--lean", action="store_true", default=None,
+                    help="block images, fonts and trackers in the browsers "
+                         "(default: $SCRAPER_LEAN)")
+    ap.add_argument("--reparse", action="store_true",
+                    help="re-extract all stored snapshots, then exit")
+    ap.add_argument("--search", metavar="KEYWORDS",
+                    help="also crawl this job search for new postings")
+    ap.add_argument("--location", default="", help="location for --search")
+    ap.add_argument("--pages", type=int, default=10,
+                    help="max result pages to crawl for --search")
+    ap.add_argument("--refresh-older-than", type=float, metavar="DAYS",
+                    help="re-scrape stored jobs last scraped at least DAYS ago "
+                         "(default: never re-scrape; 0 = re-scrape all)")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue the last run: scrape what is still queued or failed")
+    ap.add_argument("--pipeline", action="store_true",
+                    help="overlap page loads, parsing and storing in staged workers")
+    ap.add_argument("--stage-workers", metavar="SPEC",
+                    help='workers per pipeline stage, e.g. "fetch=4,parse=2" '
+                         "(default: $PIPELINE_WORKERS)")
+    args = ap.parse_args()
+
+    if args.resume:
+        journal = RunJournal.latest()
+        if journal is None:
+            print("No run journal to resume.")
+            sys.exit(1)
+        print(f"↻ resuming {journal.path}: {journal.counts()}")
+        main([], workers=args.workers, headless=args.headless, journal=journal,
+             lean=args.lean, pipeline=args.pipeline, stage_workers=args.stage_workers)
+        sys.exit(0)
+
+    if args.reparse:
+        from reparse import reparse_all
+        reparse_all()
+        sys.exit(0)
+
+    raw_urls = collect_urls(args.urls)
+    if args.search:                     # crawled lazily, scraped as it is harvested
+        from search_crawler import SearchQuery, crawl
+        raw_urls = chain(raw_urls, crawl(SearchQuery(args.search, args.location),
+                                         max_pages=args.pages))
+    main(raw_urls, workers=args.workers, headless=args.headless,
+         refresh_older_than=args.refresh_older_than, lean=args.lean,
+         pipeline=args.pipeline, stage_workers=args.stage_workers)
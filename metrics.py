@@ -0,0 +1,174 @@
+# metrics.py  ----------------------------------------------------------
+"""
+In-process timing spans, counters and latency histograms.
+
+    from metrics import span, incr
+
+    with span("cheap_extract"):          # latency histogram + error count
+        ...
+    incr("llm.fallback")                 # plain counter
+
+`render_prometheus()` feeds `/metrics` on the webhook server and
+`summary()` is printed at the end of `main.main`.  Everything is one
+lock and a `perf_counter()` per span – cheap enough to leave on.
+"""
+
+from __future__ import annotations
+import time, bisect, threading
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from functools import wraps
+from typing import Iterator
+
+# histogram bucket upper bounds, seconds
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+           1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SAMPLES = 1024           # recent samples kept per stage for percentiles
+
+
+class _Hist:
+    __slots__ = ("count", "total", "buckets", "recent", "max")
+
+    def __init__(self):
+        self.count   = 0
+        self.total   = 0.0
+        self.max     = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)      # last one is +Inf
+        self.recent: deque[float] = deque(maxlen=SAMPLES)
+
+    def add(self, secs: float) -> None:
+        self.count += 1
+        self.total += secs
+        self.max    = max(self.max, secs)
+        self.buckets[bisect.bisect_left(BUCKETS, secs)] += 1
+        self.recent.append(secs)
+
+    def pct(self, q: float) -> float:
+        if not self.recent:
+            return 0.0
+        s = sorted(self.recent)
+        return s[min(len(s) - 1, int(q * len(s)))]
+
+
+class Metrics:
+    def __init__(self):
+        self._lock     = threading.Lock()
+        self.counters: dict[str, int]   = defaultdict(int)
+        self.hists:    dict[str, _Hist] = defaultdict(_Hist)
+        self.started   = time.time()
+
+    # ---------- recording ----------
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def observe(self, name: str, secs: float) -> None:
+        with self._lock:
+            self.hists[name].add(secs)
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        """Time the block into histogram `name`; exceptions bump `name.errors`."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.incr(f"{name}.errors")
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - t0)
+
+    def timed(self, name: str):
+        """Decorator form of `span`."""
+        def deco(fn):
+            @wraps(fn)
+            def wrapper(*a, **kw):
+                with self.span(name):
+                    return fn(*a, **kw)
+            return wrapper
+        return deco
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.hists.clear()
+            self.started = time.time()
+
+    # ---------- reading ----------
+    def rates(self) -> dict[str, float]:
+        """Derived ratios over all `fetch_job` calls so far."""
+        with self._lock:
+            h = self.hists.get("fetch_job")
+            c = dict(self.counters)
+        n = h.count if h else 0
+        if not n:
+            return {}
+        get = lambda k: c.get(k, 0)
+        return {
+            "success_rate":       round(1 - get("fetch_job.errors") / n, 3),
+            "http_only_rate":     round(get("fetch.http") / n, 3),
+            "browser_rate":       round(get("fetch.browser") / n, 3),
+            "llm_fallback_rate":  round(get("llm.fallback") / n, 3),
+            "llm_cache_hit_rate": round(get("llm.cache_hit") / max(get("llm.fallback"), 1), 3),
+        }
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            stages = {
+                name: {"count": h.count,
+                       "total_s": round(h.total, 3),
+                       "mean_ms": round(h.total / h.count * 1000, 1) if h.count else 0,
+                       "p50_ms":  round(h.pct(0.50) * 1000, 1),
+                       "p95_ms":  round(h.pct(0.95) * 1000, 1),
+                       "max_ms":  round(h.max * 1000, 1)}
+                for name, h in sorted(self.hists.items())
+            }
+            counters = dict(sorted(self.counters.items()))
+        return {"uptime_s": round(time.time() - self.started, 1),
+                "counters": counters, "stages": stages, "rates": self.rates()}
+
+    def render_prometheus(self, prefix: str = "jobscraper") -> str:
+        """Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, v in sorted(self.counters.items()):
+                metric = f"{prefix}_{_clean(name)}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {v}"]
+            for name, h in sorted(self.hists.items()):
+                metric = f"{prefix}_{_clean(name)}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                cum = 0
+                for le, n in zip((*BUCKETS, "+Inf"), h.buckets):
+                    cum += n
+                    lines.append(f'{metric}_bucket{{le="{le}"}} {cum}')
+                lines += [f"{metric}_sum {h.total:.6f}", f"{metric}_count {h.count}"]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Human-readable table of where the time went."""
+        snap = self.snapshot()
+        if not snap["stages"]:
+            return "(no timings recorded)"
+        rows = [f"{'stage':<24}{'n':>6}{'total s':>10}{'mean ms':>10}"
+                f"{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+        for name, s in sorted(snap["stages"].items(), key=lambda kv: -kv[1]["total_s"]):
+            rows.append(f"{name:<24}{s['count']:>6}{s['total_s']:>10.2f}{s['mean_ms']:>10.1f}"
+                        f"{s['p50_ms']:>9.1f}{s['p95_ms']:>9.1f}{s['max_ms']:>9.1f}")
+        if snap["rates"]:
+            rows.append("  ".join(f"{k}={v:.0%}" for k, v in snap["rates"].items()))
+        errs = {k: v for k, v in snap["counters"].items() if k.endswith(".errors")}
+        if errs:
+            rows.append("errors: " + ", ".join(f"{k[:-7]}={v}" for k, v in errs.items()))
+        return "\n".join(rows)
+
+
+def _clean(name: str) -> str:
+    return "".join(ch if ch.isalnum() else "_" for ch in name)
+
+
+# process-wide registry ----------------------------------------------
+metrics = Metrics()
+span    = metrics.span
+incr    = metrics.incr
+observe = metrics.observe
+timed   = metrics.timed
@@ -0,0 +1,324 @@
+# pipeline.py  ---------------------------------------------------------
+"""
+Staged scrape pipeline: fetch → parse → enrich → store.
+
+`fetch_job` runs every step of a job in order on one thread, so each
+worker alternates between waiting on a page and burning CPU on the
+extraction.  Here every step is a stage with its own workers, joined to
+the next one by a bounded queue: while one page loads, earlier pages are
+parsed, enriched and written, and throughput is set by the slowest stage
+instead of the sum of all of them.  A full queue blocks the stage in
+front of it (back-pressure), so a fast fetcher never runs more than
+`DEPTH` jobs ahead of the parser, and `submit` blocks once
+`MAX_INFLIGHT` jobs are anywhere in the pipeline – pages HTTP fails on
+pile up in front of the (rate-limited) browser stage, not in a backlog
+the caller keeps feeding.
+
+    fetch    threads    public page over HTTP
+    browser  threads    pages HTTP came up short on (from the DriverPool)
+    parse    processes  parse_job_html + process_raw – the CPU-bound part
+    enrich   threads    snapshot, near-duplicate link, LLM hand-off
+    store    thread     the caller's `store(item, doc)`, e.g. JobWriter.add
+
+    with JobPipeline(pool, store=lambda url, doc: writer.add(doc),
+                     skills_stage=stage) as pipe:
+        for url, doc, err in pipe.map(urls):
+            ...
+
+Worker counts come from `workers=` or $PIPELINE_WORKERS
+("fetch=4,parse=2"); `parse=0` parses in-process on one thread.
+"""
+
+from __future__ import annotations
+import os, queue, threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Tuple
+
+import scraper
+from http_fetch import fetch_job_html, parse_job_html, missing_fields
+from llm_extract import SkillStage
+from metrics import metrics, span, incr
+
+DEPTH    = int(os.getenv("PIPELINE_DEPTH", 8))      # jobs queued between two stages
+MAX_INFLIGHT = int(os.getenv("PIPELINE_INFLIGHT", 0)) or None   # None → 4 × depth
+WORKERS  = {"fetch": 4, "browser": None, "parse": os.cpu_count() or 1,
+            "enrich": 2, "store": 1}                # browser: None → DriverPool size
+STAGES   = ("fetch", "browser", "parse", "enrich", "store")
+
+_STOP = object()
+
+
+def stage_workers(spec: str | None = None) -> Dict[str, Optional[int]]:
+    """WORKERS with the overrides of a "fetch=4,parse=2" spec (default $PIPELINE_WORKERS)."""
+    out = dict(WORKERS)
+    for part in (spec if spec is not None else os.getenv("PIPELINE_WORKERS", "")).split(","):
+        if not part.strip():
+            continue
+        name, _, n = part.partition("=")
+        name = name.strip()
+        if name not in out:
+            raise ValueError(f"unknown pipeline stage {name!r} (one of {', '.join(STAGES)})")
+        out[name] = int(n)
+    return out
+
+
+# ------------------------------------------------------------------
+# parse stage (runs in the worker processes)
+# ------------------------------------------------------------------
+def _child_init() -> None:
+    # a fork copies the parent's counters (and maybe a held lock): start clean
+    metrics.__init__()
+    from skill_taxonomy import taxonomy
+    taxonomy()                          # load the automaton before the first job
+
+
+def parse_page(url: str, html: str, raw: Optional[Dict],
+               run_cheap_pass: bool = True) -> Tuple[Dict, Optional[Dict]]:
+    """
+    (raw doc, extracted doc) for one page.  `raw` is the browser's doc;
+    without one the HTML is parsed, and the extracted doc is None when
+    that page lacks a required field (→ browser).
+    """
+    if raw is None:
+        raw = parse_job_html(html, url)
+        if missing_fields(raw):
+            return raw, None
+    return raw, scraper.process_raw(dict(raw), run_cheap_pass)
+
+
+class _Job:
+    __slots__ = ("item", "url", "html", "raw", "source", "doc")
+
+    def __init__(self, item: Any, url: str):
+        self.item, self.url = item, url
+        self.html, self.raw, self.source, self.doc = "", None, "http", None
+
+
+# ------------------------------------------------------------------
+# pipeline
+# ------------------------------------------------------------------
+class JobPipeline:
+    """fetch → parse → enrich → store, one bounded queue between stages."""
+
+    def __init__(self,
+                 pool=None,
+                 store: Callable[[Any, Dict], None] | None = None,
+                 done: Callable[[Any, Optional[Dict], Optional[Exception]], None] | None = None,
+                 skills_stage: SkillStage | None = None,
+                 workers: Dict[str, Optional[int]] | str | None = None,
+                 depth: int = DEPTH,
+                 max_inflight: int | None = MAX_INFLIGHT,
+                 session=None,
+                 try_http: bool = True,
+                 logged_in: bool = True,
+                 run_cheap_pass: bool = True,
+                 snapshot: bool = True):
+        """
+        `pool` is a DriverPool (or None for HTTP-only runs), `store` is
+        called on the store thread in arrival order, and `skills_stage`
+        takes the LLM calls (without one the enrich workers wait for them).
+        `done(item, doc, error)` is called for every finished job instead
+        of queuing it for `get()` / `map()`.  At most `max_inflight`
+        jobs (default 4 × `depth`) are between `submit` and `done`.
+        """
+        self.pool, self.store, self.done = pool, store, done
+        self.skills_stage = skills_stage
+        self.session, self.try_http, self.logged_in = session, try_http, logged_in
+        self.run_cheap_pass, self.snapshot = run_cheap_pass, snapshot
+
+        self.workers = {**WORKERS, **workers} if isinstance(workers, dict) \
+            else stage_workers(workers)
+        if self.workers["browser"] is None:
+            self.workers["browser"] = getattr(pool, "size", 1)
+
+        self.max_inflight = max(1, max_inflight or 4 * max(1, depth))
+        self._slots = threading.BoundedSemaphore(self.max_inflight)
+        self._q = {name: queue.Queue(maxsize=max(1, depth)) for name in STAGES}
+        # parse re-routes to the browser and the browser feeds parse: a bound
+        # below max_inflight could close that cycle, this one never fills up
+        self._q["browser"] = queue.Queue(maxsize=self.max_inflight)
+        self._out: queue.Queue = queue.Queue()
+        self._threads: list[threading.Thread] = []
+        self._procs: ProcessPoolExecutor | None = None
+        self._inflight = 0
+        self._idle     = threading.Condition()
+        self._started  = False
+
+    # ---------- lifecycle ----------
+    def start(self) -> "JobPipeline":
+        if self._started:
+            return self
+        self._started = True
+        procs = self.workers["parse"]
+        if procs:
+            self._procs = ProcessPoolExecutor(max_workers=procs, initializer=_child_init)
+            # fork the workers now, before the stage threads exist
+            for f in [self._procs.submit(int) for _ in range(procs)]:
+                f.result()
+        run = {"fetch": self._fetch, "browser": self._browser, "parse": self._parse,
+               "enrich": self._enrich, "store": self._store}
+        for name in STAGES:
+            for i in range(max(1, self.workers[name] or 0)):
+                t = threading.Thread(target=self._loop, args=(name, run[name]),
+                                     name=f"pipe-{name}-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        print("✓ pipeline: " + ", ".join(f"{n}×{max(1, self.workers[n] or 0)}"
+                                          + (" procs" if n == "parse" and procs else "")
+                                          for n in STAGES))
+        return self
+
+    def close(self, wait: bool = True) -> None:
+        """Finish every submitted job, then stop the workers.
+
+        `wait=False` (an exception or Ctrl-C) drops what is still queued;
+        the stage threads are daemons and die with the process.
+        """
+        if not self._started:
+            return
+        self._started = False
+        if not wait:
+            if self._procs:
+                self._procs.shutdown(wait=False, cancel_futures=True)
+            return
+        self.join()
+        for name in STAGES:
+            for _ in range(max(1, self.workers[name] or 0)):
+                self._q[name].put(_STOP)
+        for t in self._threads:
+            t.join()
+        if self._procs:
+            self._procs.shutdown()
+        self._threads = []
+
+    def __enter__(self) -> "JobPipeline":
+        return self.start()
+
+    def __exit__(self, exc_type, *exc) -> None:
+        self.close(wait=exc_type is None)
+
+    # ---------- feeding / draining ----------
+    def submit(self, item: Any, url: str | None = None) -> None:
+        """Queue one job; blocks while `max_inflight` jobs are in the pipeline."""
+        if not self._started:
+            self.start()
+        self._slots.acquire()
+        with self._idle:
+            self._inflight += 1
+        self._q["fetch"].put(_Job(item, url or item))
+
+    def get(self, timeout: float | None = None) -> Tuple[Any, Optional[Dict], Optional[Exception]]:
+        """Next finished `(item, doc, error)`, in completion order."""
+        return self._out.get(timeout=timeout)
+
+    def join(self) -> None:
+        """Wait until every submitted job has left the store stage."""
+        with self._idle:
+            self._idle.wait_for(lambda: self._inflight == 0)
+
+    def map(self, items: Iterable[Any]) -> Iterator[Tuple[Any, Optional[Dict], Optional[Exception]]]:
+        """
+        Submit `items` (URLs, possibly a lazy generator) from a feeder
+        thread and yield `(item, doc, error)` as they finish – the
+        `DriverPool.map` shape.  One consumer at a time; an error raised
+        by `items` itself is re-raised once the submitted jobs are out.
+        """
+        sent, failed = [0], []
+        fed = threading.Event()
+
+        def feed():
+            try:
+                for item in items:
+                    self.submit(item)
+                    sent[0] += 1
+            except BaseException as e:
+                failed.append(e)
+            finally:
+                fed.set()
+
+        feeder = threading.Thread(target=feed, name="pipe-feed", daemon=True)
+        feeder.start()
+        got = 0
+        while not (fed.is_set() and got == sent[0]):
+            try:
+                out = self.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            got += 1
+            yield out
+        feeder.join()
+        if failed:
+            raise failed[0]
+
+    def depth(self) -> Dict[str, int]:
+        """Jobs waiting in front of each stage (for /status)."""
+        return {name: q.qsize() for name, q in self._q.items()}
+
+    # ---------- stages ----------
+    def _loop(self, name: str, fn: Callable[[_Job], None]) -> None:
+        q = self._q[name]
+        while True:
+            job = q.get()
+            if job is _STOP:
+                return
+            try:
+                with span(f"pipeline.{name}"):
+                    fn(job)
+            except Exception as e:
+                self._finish(job, None, e)
+
+    def _finish(self, job: _Job, doc: Optional[Dict], err: Optional[Exception]) -> None:
+        try:
+            if self.done:
+                self.done(job.item, doc, err)
+            else:
+                self._out.put((job.item, doc, err))
+        except Exception as e:
+            print(f"❌ pipeline done() failed for {job.url}: {e}")
+        with self._idle:
+            self._inflight -= 1
+            if self._inflight == 0:
+                self._idle.notify_all()
+        self._slots.release()
+
+    def _fetch(self, job: _Job) -> None:
+        if self.try_http:
+            try:
+                job.html = fetch_job_html(job.url, session=self.session)
+                self._q["parse"].put(job)
+                return
+            except Exception as e:
+                print(f"⚠️  HTTP fetch failed for {job.url}: {e}")
+        self._q["browser"].put(job)
+
+    def _browser(self, job: _Job) -> None:
+        job.raw, job.html = scraper._scrape_in_browser(job.url, self.pool, self.logged_in)
+        job.source = "browser"
+        self._q["parse"].put(job)
+
+    def _parse(self, job: _Job) -> None:
+        args = (job.url, "" if job.raw else job.html, job.raw, self.run_cheap_pass)
+        if self._procs:
+            raw, doc = self._procs.submit(parse_page, *args).result()
+        else:
+            raw, doc = parse_page(*args)
+        if job.raw is None:
+            scraper._report_http(raw)
+        if doc is None:
+            job.html = ""                       # the browser loads its own copy
+            self._q["browser"].put(job)         # HTTP page came up short
+            return
+        job.raw, job.doc = raw, doc
+        incr(f"fetch.{job.source}")
+        self._q["enrich"].put(job)
+
+    def _enrich(self, job: _Job) -> None:
+        if self.snapshot:
+            scraper._snapshot(job.url, job.raw, job.html, job.source)
+        job.doc = scraper.enrich_job(job.doc, self.skills_stage)
+        self._q["store"].put(job)
+
+    def _store(self, job: _Job) -> None:
+        if self.store:
+            self.store(job.item, job.doc)
+        self._finish(job, job.doc, None)
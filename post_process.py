@@ -1,14 +1,33 @@
 
 
-import re, dateparser
-def post_process(doc):
-    """Clean location string, posted date, applicant count, etc."""
+import re, datetime
+from extract_engine import scan
+from relative_dates import parse_posted, as_utc
+
+# (value, pattern) in priority order – searched on the lower-cased description
+SENIORITY_PATTERNS = [
+    ("senior", r'\b(senior|sr\.)\b'),
+    ("mid",    r'\bmid[- ]?level\b'),
+    ("junior", r'\bjunior|\bentry[- ]?level'),
+]
+
+def post_process(doc, now=None):
+    """
+    Clean location string, posted date, applicant count, etc.
+
+    "… ago" phrases are anchored to `now` (the fetch time; defaults to
+    the doc's `scraped_at`, else the current time).
+    """
+    anchor  = as_utc(now or doc.get("scraped_at") or datetime.datetime.now(datetime.timezone.utc))
     loc_raw = doc.get("location", "")
     parts   = [p.strip() for p in loc_raw.split("·")]
     if len(parts) >= 1 and "," in parts[0]:
-        doc["city"], doc["province"] = map(str.strip, parts[0].split(",", 1))
-    if len(parts) >= 2:
-        doc["posted_at"] = dateparser.parse(parts[1])  # → datetime
+        # "Toronto, Ontario, Canada" → the country is not part of the province
+        doc["city"], doc["province"] = [p.strip() for p in parts[0].split(",")][:2]
+    # "Toronto, ON · 2 days ago · …" – the HTTP parser keeps it separate
+    posted = parts[1] if len(parts) >= 2 else doc.get("posted_date")
+    if posted and (when := parse_posted(posted, now=anchor)):
+        doc["posted_at"] = when                         # aware UTC datetime
     if len(parts) >= 3:
         m = re.search(r'(\d+)', parts[2])
         if m: doc["applicant_count"] = int(m.group(1))
@@ -16,19 +35,15 @@ def post_process(doc):
     doc.pop("location", None)     # optional: drop raw field
     doc.pop("posted_date", None)  # we now have posted_at
 
-    # ---------- seniority level ----------
-    jd = doc["job_description"].lower()
-    if re.search(r'\b(senior|sr\.)\b', jd):
-        doc["seniority_level"] = "senior"
-    elif re.search(r'\bmid[- ]?level\b', jd):
-        doc["seniority_level"] = "mid"
-    elif re.search(r'\bjunior|\bentry[- ]?level', jd):
-        doc["seniority_level"] = "junior"
+    # ---------- seniority level (shared single-pass scan) ----------
+    level = scan(doc["job_description"]).seniority_level
+    if level:
+        doc["seniority_level"] = level
 
     # ---------- posting age ----------
-    if "scraped_at" in doc and "posted_at" in doc:
-        delta = doc["scraped_at"] - doc["posted_at"]
-        doc["posting_age_days"] = delta.days
+    if "posted_at" in doc:
+        delta = anchor - as_utc(doc["posted_at"])
+        doc["posting_age_days"] = max(delta.days, 0)
 
     return doc
 
@@ -60,9 +75,9 @@ def set_currency_code(doc: dict) -> None:
 
     salary_text = doc.get("job_description", "")
 
-    # 1️⃣ explicit 3-letter code
-    if m := re.search(r'\b(' + "|".join(CURRENCY_3LET) + r')\b', salary_text):
-        doc["currency_code"] = m.group(1)
+    # 1️⃣ explicit 3-letter code (left-most, from the shared scan)
+    if code := scan(salary_text).currency_code:
+        doc["currency_code"] = code
         return
 
     # 2️⃣ symbol-based inference
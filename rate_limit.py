@@ -0,0 +1,176 @@
+# rate_limit.py  -------------------------------------------------------
+"""
+Adaptive token buckets shared by every thread and process on the host.
+
+    limiter("http").acquire()           # before each guest HTTP fetch
+    ...
+    limiter("http").ok()                # healthy answer → speed up a bit
+    limiter("http").backoff("429")      # throttled → halve the rate, pause
+
+One bucket per kind of traffic – "http" (the guest pages, i.e. this
+IP) and "browser" (the logged-in account, shared by all drivers).  A
+bucket refills at `rate` tokens/s up to `burst`; `ok()` adds `step`
+to the rate, `backoff()` halves it and blocks the bucket for
+`BASE_PENALTY * 2**strikes` seconds (auth walls, 429 / 999 answers,
+pages without a job description).  State lives in SQLite
+(`RATE_DB`), so concurrent scrapers share one budget.
+`RATE_LIMIT=off` disables waiting (benchmarks, offline tests).
+"""
+
+from __future__ import annotations
+import os, time, random, sqlite3, threading
+from pathlib import Path
+from typing import Optional
+
+from job_queue import _Immediate
+from metrics import observe, incr
+
+RATE_DB      = Path(os.getenv("RATE_DB", "rate_limit.sqlite3"))
+BASE_PENALTY = 5.0         # seconds blocked after the first strike, doubling
+MAX_PENALTY  = 600.0
+JITTER       = 0.2         # up to this share of one interval added to waits
+
+# starting rate, bounds and additive step (tokens / second)
+LIMITS = {
+    "http":    {"rate": 1.0, "min_rate": 0.05,   "max_rate": 4.0, "burst": 3, "step": 0.05},
+    "browser": {"rate": 0.5, "min_rate": 1 / 60, "max_rate": 1.5, "burst": 2, "step": 0.02},
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name          TEXT PRIMARY KEY,
+    tokens        REAL    NOT NULL,
+    rate          REAL    NOT NULL,
+    updated       REAL    NOT NULL,
+    blocked_until REAL    NOT NULL DEFAULT 0,
+    strikes       INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class RateLimiter:
+    def __init__(self, name: str, rate: float, min_rate: float, max_rate: float,
+                 burst: float, step: float, path: Path | str = RATE_DB):
+        self.name     = name
+        self.kind     = name.split(":", 1)[0]       # metric names carry no account
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst    = burst
+        self.step     = step
+        self.path     = Path(path)
+        self.enabled  = os.getenv("RATE_LIMIT", "on").lower() not in ("off", "0")
+        self._local   = threading.local()
+        if self.enabled:
+            c = self._conn()
+            c.executescript(SCHEMA)
+            c.execute("INSERT OR IGNORE INTO buckets (name, tokens, rate, updated)"
+                      " VALUES (?, ?, ?, ?)", (name, burst, rate, time.time()))
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _row(self, c) -> tuple[float, float, float, float, int]:
+        return c.execute("SELECT tokens, rate, updated, blocked_until, strikes"
+                         " FROM buckets WHERE name = ?", (self.name,)).fetchone()
+
+    # ---------- taking ----------
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is ours; returns the wait."""
+        if not self.enabled:
+            return 0.0
+        with _Immediate(self._conn()) as c:
+            tokens, rate, updated, blocked_until, _ = self._row(c)
+            now    = time.time()
+            tokens = min(self.burst, tokens + (now - updated) * rate)
+            start  = max(now, blocked_until)
+            if start > now:                      # no refill while blocked
+                tokens = min(tokens, 0.0)
+            tokens -= 1                          # reserve; debt is paid by waiting
+            wait    = max(start - now, 0.0) + max(-tokens, 0.0) / rate
+            c.execute("UPDATE buckets SET tokens = ?, updated = ? WHERE name = ?",
+                      (tokens, now, self.name))
+        if wait > 0:
+            wait += random.uniform(0, JITTER / rate)
+            time.sleep(wait)
+        observe(f"ratelimit.{self.kind}.wait", wait)
+        return wait
+
+    # ---------- feedback ----------
+    def ok(self) -> None:
+        """A healthy response: additive increase, strikes forgotten."""
+        if not self.enabled:
+            return
+        with _Immediate(self._conn()) as c:
+            c.execute("UPDATE buckets SET rate = MIN(?, rate + ?), strikes = 0"
+                      " WHERE name = ? AND blocked_until <= ?",
+                      (self.max_rate, self.step, self.name, time.time()))
+
+    def backoff(self, reason: str, retry_after: float | None = None) -> float:
+        """
+        Throttled / walled / empty page: halve the rate and block the
+        bucket for an exponentially growing penalty.  Returns it.
+        """
+        incr(f"ratelimit.{self.kind}.backoff")
+        incr(f"ratelimit.{self.kind}.{reason}")
+        if not self.enabled:
+            return 0.0
+        with _Immediate(self._conn()) as c:
+            _, rate, _, blocked_until, strikes = self._row(c)
+            now     = time.time()
+            if blocked_until > now:              # another worker already reacted
+                return blocked_until - now
+            penalty = min(MAX_PENALTY, BASE_PENALTY * 2 ** strikes)
+            penalty = max(penalty, retry_after or 0.0)
+            rate    = max(self.min_rate, rate / 2)
+            c.execute("UPDATE buckets SET rate = ?, strikes = strikes + 1,"
+                      " blocked_until = ?, tokens = MIN(tokens, 0) WHERE name = ?",
+                      (rate, now + penalty, self.name))
+        print(f"⚠️  {self.name}: {reason} – pausing {penalty:.0f}s, "
+              f"then {rate * 60:.1f} req/min")
+        return penalty
+
+    def state(self) -> dict:
+        if not self.enabled:
+            return {"name": self.name, "enabled": False}
+        tokens, rate, _, blocked_until, strikes = self._row(self._conn())
+        return {"name": self.name, "rate_per_min": round(rate * 60, 2),
+                "tokens": round(tokens, 2), "strikes": strikes,
+                "blocked_for_s": round(max(0.0, blocked_until - time.time()), 1)}
+
+
+# process-wide registry ----------------------------------------------
+_limiters: dict[str, RateLimiter] = {}
+_lock = threading.Lock()
+
+
+def limiter(kind: str, account: Optional[str] = None) -> RateLimiter:
+    """
+    The shared bucket for `kind` ("http" or "browser").  Browser buckets
+    are per LinkedIn account (default $LINKEDIN_EMAIL).
+    """
+    name = kind
+    if kind == "browser":
+        name = f"browser:{account or os.getenv('LINKEDIN_EMAIL') or 'anonymous'}"
+    with _lock:
+        if name not in _limiters:
+            _limiters[name] = RateLimiter(name, **LIMITS[kind])
+        return _limiters[name]
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":               # python rate_limit.py  → current buckets
+    from pprint import pprint
+    if RATE_DB.exists():
+        conn = sqlite3.connect(RATE_DB)
+        for (name,) in conn.execute("SELECT name FROM buckets ORDER BY name"):
+            kind = name.split(":", 1)[0]
+            pprint(RateLimiter(name, **LIMITS[kind]).state())
+    else:
+        print(f"no buckets yet ({RATE_DB})")
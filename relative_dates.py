@@ -0,0 +1,126 @@
+# relative_dates.py  ---------------------------------------------------
+"""
+Fast parser for LinkedIn's "posted" phrases → absolute UTC datetimes.
+
+LinkedIn only ever says a handful of things ("2 days ago", "1 week
+ago", "Reposted 3 hours ago", "30+ days ago", "Just now" …), so those
+are matched by one regex and turned into an offset from the scrape
+time.  Offsets are memoised per normalised phrase in a bounded LRU,
+and dateparser – slow to import and tens of ms per call – is only used
+for phrasings we don't know, restricted to `DATE_LANGUAGES`.
+
+    parse_posted("Reposted 2 days ago", now=scraped_at)
+"""
+
+from __future__ import annotations
+import os, re, datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+UTC = datetime.timezone.utc
+
+# languages dateparser may try for unknown phrasings (e.g. "en,fr")
+DATE_LANGUAGES = [l.strip() for l in os.getenv("DATE_LANGUAGES", "en").split(",") if l.strip()]
+
+_UNIT_SECS = {
+    "second": 1, "sec": 1, "s": 1,
+    "minute": 60, "min": 60, "m": 60,
+    "hour": 3600, "hr": 3600, "h": 3600,
+    "day": 86400, "d": 86400,
+    "week": 7 * 86400, "wk": 7 * 86400, "w": 7 * 86400,
+    "month": 30 * 86400, "mo": 30 * 86400,          # LinkedIn rounds anyway
+    "year": 365 * 86400, "yr": 365 * 86400, "y": 365 * 86400,
+}
+_WORDS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5,
+          "six": 6, "seven": 7, "eight": 8, "nine": 9, "ten": 10}
+
+_NOISE = re.compile(r"^(?:re-?posted|posted|listed|active)\s+(?:on\s+)?|^(?:about|over|around)\s+")
+_AGO   = re.compile(r"^(\d+|an?|one|two|three|four|five|six|seven|eight|nine|ten)\+?\s*"
+                    r"(second|sec|minute|min|hour|hr|day|week|wk|month|mo|year|yr|[smhdwy])s?"
+                    r"\.?\s+ago$")
+_FIXED = {"just now": 0, "now": 0, "today": 0, "moments ago": 0,
+          "yesterday": 86400, "last week": 7 * 86400, "last month": 30 * 86400}
+_ABSOLUTE = re.compile(r"\b(?:19|20)\d\d\b|\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b")
+_YEAR     = re.compile(r"\b(?:19|20)\d\d\b")
+
+
+def normalize(text: str) -> str:
+    """'  Reposted  2 Days ago ' → '2 days ago'."""
+    t = " ".join(text.lower().split()).strip(" .·")
+    prev = None
+    while prev != t:                     # "Reposted about 2 hours ago"
+        prev, t = t, _NOISE.sub("", t)
+    return t
+
+
+def _known_offset(phrase: str) -> Optional[int]:
+    """Seconds before the scrape time, for LinkedIn's own phrasings."""
+    if phrase in _FIXED:
+        return _FIXED[phrase]
+    m = _AGO.match(phrase)
+    if m is None:
+        return None
+    n = _WORDS.get(m.group(1)) or int(m.group(1))
+    return n * _UNIT_SECS[m.group(2)]
+
+
+@lru_cache(maxsize=512)
+def _resolve(phrase: str) -> Optional[Tuple[str, object]]:
+    """
+    ("rel", seconds), ("abs", datetime) or – for a date without a year
+    such as "Oct 5" – ("day", datetime in 2000) for one normalised
+    phrase, or None if even dateparser can't read it.  Cached – the
+    result never depends on the anchor.
+    """
+    secs = _known_offset(phrase)
+    if secs is not None:
+        return ("rel", secs)
+
+    import dateparser                          # slow import – unknown formats only
+    base = datetime.datetime(2000, 1, 1)       # fixed anchor → cacheable offset
+    dt = dateparser.parse(phrase, languages=DATE_LANGUAGES,
+                          settings={"RELATIVE_BASE": base,
+                                    "TIMEZONE": "UTC", "TO_TIMEZONE": "UTC",
+                                    "RETURN_AS_TIMEZONE_AWARE": False})
+    if dt is None:
+        return None
+    if _ABSOLUTE.search(phrase):
+        return ("abs" if _YEAR.search(phrase) else "day", dt.replace(tzinfo=UTC))
+    return ("rel", int((base - dt).total_seconds()))
+
+
+def as_utc(dt: datetime.datetime) -> datetime.datetime:
+    """Naive datetimes (pymongo, utcnow) are UTC."""
+    return dt.replace(tzinfo=UTC) if dt.tzinfo is None else dt.astimezone(UTC)
+
+
+def parse_posted(text: str | None,
+                 now: datetime.datetime | None = None) -> Optional[datetime.datetime]:
+    """Absolute, timezone-aware UTC time a "… ago" phrase refers to."""
+    if not text:
+        return None
+    hit = _resolve(normalize(text))
+    if hit is None:
+        return None
+    kind, value = hit
+    if kind == "abs":
+        return value
+    anchor = as_utc(now) if now else datetime.datetime.now(UTC)
+    if kind == "day":
+        return _latest_before(value, anchor)
+    return anchor - datetime.timedelta(seconds=value)
+
+
+def _latest_before(day: datetime.datetime, anchor: datetime.datetime) -> datetime.datetime:
+    """The most recent `day` (month, day, time – year ignored) not after `anchor`."""
+    for year in range(anchor.year, anchor.year - 8, -1):   # Feb 29 → last leap year
+        try:
+            when = day.replace(year=year)
+        except ValueError:
+            continue
+        if when <= anchor:
+            return when
+    return day
+
+
+cache_info = _resolve.cache_info
@@ -0,0 +1,74 @@
+# reparse.py  ----------------------------------------------------------
+"""
+Offline re-parse / backfill from the snapshot store.
+
+Streams every stored page through the current extraction pipeline
+(HTML parse → cheap_extract → post_process → set_currency_code) in a
+process pool and bulk-upserts the results.  No browser, no network,
+no LLM – `required_skills` is only rewritten where the skill taxonomy
+covers the description; other docs keep their stored (LLM) list.
+
+    $ python main.py --reparse            # or: python reparse.py
+"""
+
+from __future__ import annotations
+import os, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from snapshots import load_snapshot, iter_job_ids, SNAPSHOT_DIR
+
+
+BATCH = 500            # docs per bulk_write
+
+
+def reparse_one(job_id: str, root=SNAPSHOT_DIR) -> Optional[Dict]:
+    """Rebuild the stored doc for one job from its snapshot."""
+    from http_fetch import parse_job_html, missing_fields
+    from scraper import process_raw
+
+    snap = load_snapshot(job_id, root)
+    if snap is None:
+        return None
+
+    raw = snap["raw"]
+    if snap["source"] == "http" and snap["html"]:
+        # re-run the HTML parser too, so parser fixes apply to old pages
+        parsed = parse_job_html(snap["html"], snap["url"])
+        if not missing_fields(parsed):
+            raw = parsed
+    if not raw.get("job_description"):
+        return None
+    doc = process_raw(dict(raw), now=snap["fetched_at"])
+    doc["last_scraped_at"] = snap["fetched_at"]     # a re-parse is not a new scrape
+    return doc
+
+
+def reparse_all(workers: int | None = None, root=SNAPSHOT_DIR) -> tuple[int, int]:
+    """Re-extract every snapshot; returns (stored, skipped)."""
+    from db import JobWriter
+    from rollups import rollups
+
+    workers = workers or os.cpu_count() or 2
+    rollups()                           # re-extracted skills move the rollups too
+    stored, skipped = 0, 0
+    t0 = time.perf_counter()
+
+    with JobWriter(batch_size=BATCH, flush_secs=30) as writer, \
+         ProcessPoolExecutor(max_workers=workers) as ex:
+        for doc in ex.map(reparse_one, iter_job_ids(root), chunksize=64):
+            if doc is None:
+                skipped += 1
+                continue
+            writer.add(doc)
+            stored += 1
+            if stored % BATCH == 0:
+                print(f"… {stored} re-parsed ({stored / (time.perf_counter() - t0):.0f}/s)")
+
+    print(f"\nRe-parse done. Stored: {stored}  |  Skipped: {skipped}  "
+          f"|  {time.perf_counter() - t0:.1f}s")
+    return stored, skipped
+
+
+if __name__ == "__main__":
+    reparse_all()
@@ -0,0 +1,269 @@
+# rollups.py  ----------------------------------------------------------
+"""
+Job-market rollups kept up to date on every write (no collection scans).
+
+Each stored job counts once in a few cells of a small cube,
+
+    (dim, value, week, scope) → n
+
+`dim` is "skill", "city", "province", "seniority_level",
+"workplace_type" or "jobs" (value "all"); `week` is the Monday of
+`posted_at`'s week ("" if unknown); `scope` is "" or one filter such
+as "province=Ontario".  "Top skills in Ontario this month" sums one
+dim / scope over four weeks – a few hundred rows, however many jobs
+are stored.  Near-duplicates (`duplicate_of`) are not counted again.
+
+`rollups()` hooks into `db.on_upsert` (late LLM skills included): the
+job's previous cells are kept per URL, so a rewrite only moves the
+counts that changed.  Everything lives in one SQLite file
+(`ROLLUP_DB`), safe to share between the CLI and the webhook server.
+
+    rollups().top("skill", {"province": "Ontario"}, since="2026-09-28")
+    $ python rollups.py --rebuild                   # backfill from the store
+    $ python rollups.py skill --province Ontario --weeks 4
+"""
+
+from __future__ import annotations
+import os, json, sqlite3, datetime, threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+from job_queue import _Immediate
+from metrics import incr, span
+from relative_dates import as_utc
+
+ROLLUP_DB = Path(os.getenv("ROLLUP_DB", ".rollups.sqlite3"))
+FIELDS    = ("city", "province", "seniority_level", "workplace_type")
+DIMS      = ("skill", *FIELDS)
+SCOPES    = ("province", "seniority_level", "workplace_type")    # filters for any dim
+BATCH     = 5000               # docs read per batch by --rebuild
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counts (
+    dim   TEXT    NOT NULL,
+    scope TEXT    NOT NULL,
+    week  TEXT    NOT NULL,
+    value TEXT    NOT NULL,
+    n     INTEGER NOT NULL,
+    PRIMARY KEY (dim, scope, week, value)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS members (
+    url  TEXT PRIMARY KEY,
+    dims TEXT NOT NULL                         -- JSON: the job's rolled-up fields
+);
+"""
+_PROJECTION = {"_id": 0, "linkedin_url": 1, "posted_at": 1, "required_skills": 1,
+               "duplicate_of": 1, **{f: 1 for f in FIELDS}}
+
+
+# ------------------------------------------------------------------
+# cells of one job
+# ------------------------------------------------------------------
+def week_of(value) -> str:
+    """Monday of the week `value` falls in (ISO date), "" if it is not a date."""
+    if isinstance(value, str):
+        try:
+            value = datetime.datetime.fromisoformat(value)
+        except ValueError:
+            return ""
+    if isinstance(value, datetime.datetime):
+        value = as_utc(value).date()
+    if not isinstance(value, datetime.date):
+        return ""
+    return (value - datetime.timedelta(days=value.weekday())).isoformat()
+
+
+def _region(value) -> Optional[str]:
+    """"Ontario, Canada" → "Ontario"."""
+    return (str(value).split(",")[0].strip() or None) if value else None
+
+
+def _merge(prev: dict, fields: dict) -> dict:
+    """The job's rolled-up fields after a write of `fields` ($set semantics)."""
+    m = dict(prev)
+    for f in ("city", "seniority_level", "workplace_type"):
+        if f in fields:
+            m[f] = fields[f] or None
+    if "province" in fields:
+        m["province"] = _region(fields["province"])
+    if "posted_at" in fields:
+        m["week"] = week_of(fields["posted_at"])
+    if "required_skills" in fields:
+        m["skills"] = sorted(set(fields["required_skills"] or ()))
+    if "duplicate_of" in fields:
+        m["dup"] = bool(fields["duplicate_of"])
+    return m
+
+
+def _cells(m: dict | None) -> set[tuple[str, str, str, str]]:
+    """(dim, scope, week, value) cells one job counts in (None: not stored)."""
+    if m is None or m.get("dup"):
+        return set()
+    values = [("jobs", "all")] + [(f, m[f]) for f in FIELDS if m.get(f)] \
+           + [("skill", s) for s in m.get("skills") or ()]
+    scopes = [""] + [f"{f}={m[f]}" for f in SCOPES if m.get(f)]
+    week   = m.get("week") or ""
+    return {(d, sc, week, v) for d, v in values for sc in scopes}
+
+
+def scope_of(where: dict | None) -> str:
+    """{"province": "Ontario"} → "province=Ontario" (at most one filter)."""
+    where = {k: v for k, v in (where or {}).items() if v}
+    if not where:
+        return ""
+    if len(where) > 1 or not set(where) <= set(SCOPES):
+        raise ValueError(f"filter on at most one of {', '.join(SCOPES)}")
+    (field, value), = where.items()
+    return f"{field}={_region(value) if field == 'province' else value}"
+
+
+# ------------------------------------------------------------------
+# store
+# ------------------------------------------------------------------
+class Rollups:
+    def __init__(self, path: Path | str = ROLLUP_DB):
+        self.path   = Path(path)
+        self._local = threading.local()
+        self._conn()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ---------- writing ----------
+    def apply(self, url: str, fields: dict) -> int:
+        """Move `url`'s counts to match a write of `fields`; returns cells touched."""
+        with span("rollups.apply"), _Immediate(self._conn()) as c:
+            row  = c.execute("SELECT dims FROM members WHERE url = ?", (url,)).fetchone()
+            prev = json.loads(row[0]) if row else None
+            new  = _merge(prev or {}, fields)
+            if new == prev:
+                return 0
+            old_cells, new_cells = _cells(prev), _cells(new)
+            delta = [(1, *k) for k in new_cells - old_cells] + \
+                    [(-1, *k) for k in old_cells - new_cells]
+            self._add(c, delta)
+            c.execute("INSERT INTO members VALUES (?, ?) ON CONFLICT (url) DO UPDATE"
+                      " SET dims = excluded.dims", (url, json.dumps(new, sort_keys=True)))
+        incr("rollups.cells", len(delta))
+        return len(delta)
+
+    @staticmethod
+    def _add(c: sqlite3.Connection, delta: Iterable[tuple[int, str, str, str, str]]) -> None:
+        delta = list(delta)
+        c.executemany("INSERT INTO counts (n, dim, scope, week, value) VALUES (?, ?, ?, ?, ?)"
+                      " ON CONFLICT (dim, scope, week, value) DO UPDATE SET n = n + excluded.n",
+                      delta)
+        c.executemany("DELETE FROM counts WHERE dim = ? AND scope = ? AND week = ? AND value = ?"
+                      " AND n <= 0", [k for n, *k in delta if n < 0])
+
+    def on_upsert(self, url: str, when, fields: dict) -> None:
+        """`db.on_upsert` listener (full docs and late fields)."""
+        self.apply(url, fields)
+
+    def rebuild(self, docs: Iterable[dict]) -> int:
+        """Replace every count with the rollup of `docs`; returns jobs read."""
+        counts: dict[tuple, int] = {}
+        members, n = [], 0
+        for d in docs:
+            m = _merge({}, d)
+            for k in _cells(m):
+                counts[k] = counts.get(k, 0) + 1
+            members.append((d["linkedin_url"], json.dumps(m, sort_keys=True)))
+            n += 1
+            if n % BATCH == 0:
+                print(f"… {n} jobs rolled up")
+        with _Immediate(self._conn()) as c:      # swap in one short transaction
+            c.execute("DELETE FROM counts")
+            c.execute("DELETE FROM members")
+            self._add(c, ((v, *k) for k, v in counts.items()))
+            c.executemany("INSERT OR REPLACE INTO members VALUES (?, ?)", members)
+        return n
+
+    # ---------- reading ----------
+    def top(self, by: str = "skill", where: dict | None = None,
+            since: str | None = None, limit: int = 20) -> list[tuple[str, int]]:
+        """Most frequent values of `by` (or jobs per week for "week"), best first."""
+        scope = scope_of(where)
+        week  = since or ""
+        with span("rollups.query"):
+            if by == "week":
+                return self._conn().execute(
+                    "SELECT week, SUM(n) FROM counts WHERE dim = 'jobs' AND scope = ?"
+                    " AND week >= ? GROUP BY week ORDER BY week", (scope, week)).fetchall()
+            if by not in DIMS:
+                raise ValueError(f"by must be one of week, {', '.join(DIMS)}")
+            return self._conn().execute(
+                "SELECT value, SUM(n) AS total FROM counts WHERE dim = ? AND scope = ?"
+                " AND week >= ? GROUP BY value ORDER BY total DESC, value LIMIT ?",
+                (by, scope, week, limit)).fetchall()
+
+    def jobs(self, where: dict | None = None, since: str | None = None) -> int:
+        row = self._conn().execute(
+            "SELECT COALESCE(SUM(n), 0) FROM counts WHERE dim = 'jobs' AND scope = ?"
+            " AND week >= ?", (scope_of(where), since or "")).fetchone()
+        return row[0]
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM members").fetchone()[0]
+
+
+_rollups: Rollups | None = None
+_rollups_lock = threading.Lock()
+
+
+def rollups() -> Rollups:
+    """Process-wide rollups, hooked into every write made through `db`."""
+    global _rollups
+    with _rollups_lock:
+        if _rollups is None:
+            import db
+            _rollups = Rollups()
+            db.on_upsert(_rollups.on_upsert, partial=True)
+        return _rollups
+
+
+def rebuild(store: Rollups | None = None, collection=None) -> int:
+    """Recount everything from the job store (backfill after an import / reparse)."""
+    if store is None:
+        store = Rollups()
+    if collection is None:
+        import db
+        collection = db.get_jobs()
+    return store.rebuild(collection.find({}, _PROJECTION).batch_size(BATCH))
+
+
+def since_weeks(weeks: int, today: datetime.date | None = None) -> str:
+    """First week of the last `weeks` weeks, this one included."""
+    today = today or datetime.datetime.now(datetime.timezone.utc).date()
+    return week_of(today - datetime.timedelta(weeks=max(1, weeks) - 1))
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":   # python rollups.py --rebuild | skill --province Ontario --weeks 4
+    import argparse, time
+    ap = argparse.ArgumentParser(description="Job-market rollups.")
+    ap.add_argument("by", nargs="?", default="skill", help=f"week, {', '.join(DIMS)}")
+    ap.add_argument("--rebuild", action="store_true", help="recount from the job store")
+    for f in SCOPES:
+        ap.add_argument(f"--{f.replace('_', '-')}", dest=f)
+    ap.add_argument("--weeks", type=int, help="only the last N weeks of postings")
+    ap.add_argument("--top", type=int, default=20)
+    args = ap.parse_args()
+
+    store = Rollups()
+    if args.rebuild:
+        t = time.perf_counter()
+        print(f"✓ {rebuild(store)} jobs rolled up in {time.perf_counter() - t:.1f}s")
+    since = since_weeks(args.weeks) if args.weeks else None
+    where = {f: getattr(args, f) for f in SCOPES}
+    print(f"{store.jobs(where, since)} jobs" + (f" since {since}" if since else ""))
+    for value, n in store.top(args.by, where, since, args.top):
+        print(f"{n:7d}  {value or '(unknown)'}")
@@ -0,0 +1,121 @@
+# run_journal.py  ------------------------------------------------------
+"""
+Append-only journal of one `main.py` batch run (JSON lines).
+
+Every URL of the batch is written as `queued` before any scraping
+starts; each later line records a state change – `done` once the doc
+is flushed to the store, `failed` with the error and attempt count –
+and is fsynced as it happens.  Replaying the file gives the latest
+state per URL, so a run killed halfway (Chrome died, laptop slept)
+is continued with
+
+    $ python main.py --resume
+
+which picks up the newest journal in `.runs/` and only scrapes what is
+still queued or failed.  Failed URLs are retried after
+`RETRY_DELAY * 2**(attempts-1)` seconds, at most `MAX_ATTEMPTS` times.
+"""
+
+from __future__ import annotations
+import os, json, time, datetime, threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+RUN_DIR      = Path(os.getenv("RUN_DIR", ".runs"))
+MAX_ATTEMPTS = 3
+RETRY_DELAY  = 30.0        # seconds before the first retry, doubling after
+
+
+class RunJournal:
+    def __init__(self, path: Path | str,
+                 max_attempts: int = MAX_ATTEMPTS,
+                 retry_delay: float = RETRY_DELAY):
+        self.path         = Path(path)
+        self.max_attempts = max_attempts
+        self.retry_delay  = retry_delay
+        self.state: dict[str, dict] = {}          # url → latest entry
+        self._lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path, encoding="utf-8") as fh:
+                for line in fh:
+                    try:
+                        e = json.loads(line)
+                    except ValueError:             # torn last line after a crash
+                        continue
+                    self.state[e["url"]] = e
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fh = open(self.path, "a", encoding="utf-8")
+
+    # ---------- opening ----------
+    @classmethod
+    def create(cls, urls: Iterable[str], root: Path | str = RUN_DIR, **kw) -> "RunJournal":
+        """New journal for a batch, every URL recorded as queued."""
+        stamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        j = cls(Path(root) / f"run-{stamp}.jsonl", **kw)
+        j.add(urls)
+        return j
+
+    @classmethod
+    def latest(cls, root: Path | str = RUN_DIR, **kw) -> Optional["RunJournal"]:
+        runs = sorted(Path(root).glob("run-*.jsonl"))
+        return cls(runs[-1], **kw) if runs else None
+
+    # ---------- recording ----------
+    def _write(self, entries: list[dict]) -> None:
+        with self._lock:
+            for e in entries:
+                self.state[e["url"]] = e
+                self._fh.write(json.dumps(e) + "\n")
+            self._fh.flush()
+            os.fsync(self._fh.fileno())
+
+    def _entry(self, url: str, state: str, **extra) -> dict:
+        prev = self.state.get(url, {})
+        return {"url": url, "state": state, "attempts": prev.get("attempts", 0),
+                "at": time.time(), **extra}
+
+    def add(self, urls: Iterable[str]) -> None:
+        self._write([self._entry(u, "queued") for u in dict.fromkeys(urls)
+                     if u not in self.state])
+
+    def done(self, urls: Iterable[str]) -> None:
+        self._write([self._entry(u, "done", attempts=self.state[u]["attempts"] + 1)
+                     for u in urls if u in self.state and self.state[u]["state"] != "done"])
+
+    def failed(self, url: str, error) -> None:
+        attempts = self.state.get(url, {}).get("attempts", 0) + 1
+        retry_at = (time.time() + self.retry_delay * 2 ** (attempts - 1)
+                    if attempts < self.max_attempts else None)
+        self._write([self._entry(url, "failed", attempts=attempts,
+                                 error=str(error)[:500], retry_at=retry_at)])
+
+    # ---------- queries ----------
+    def ready(self, now: float | None = None) -> list[str]:
+        """URLs to scrape now: queued, or failed and due for a retry."""
+        now = now or time.time()
+        return [u for u, e in self.state.items()
+                if e["state"] == "queued"
+                or (e["state"] == "failed" and e.get("retry_at") and e["retry_at"] <= now)]
+
+    def next_retry(self) -> float | None:
+        """Earliest pending retry time, or None if nothing is left to retry."""
+        due = [e["retry_at"] for e in self.state.values()
+               if e["state"] == "failed" and e.get("retry_at")]
+        return min(due, default=None)
+
+    def counts(self) -> dict[str, int]:
+        out = {"queued": 0, "done": 0, "failed": 0}
+        for e in self.state.values():
+            out[e["state"]] += 1
+        return out
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -13,82 +13,209 @@ from __future__ import annotations
 
 # ──────────────────────────────────────────────────────────────────────
 # 1️⃣ Monkey-patch Selenium’s WebDriver BEFORE any drivers are created
+#    (applied lazily by make_driver so importing this module stays cheap;
+#    the navigation stack traces are opt-in: SCRAPER_TRACE_NAV=1)
 # ──────────────────────────────────────────────────────────────────────
-import traceback
-from selenium.webdriver.remote.webdriver import WebDriver as _WD
-from selenium.webdriver.remote.command import Command
-
-# Disable back/forward so we never return to the feed
-_WD.back    = lambda self: None
-_WD.forward = lambda self: None
-
-# Wrap execute() to log navigation commands
-_orig_execute = _WD.execute
-def _traced_execute(self, driver_command, params=None):
-    nav_cmds = {
-        Command.GET,
-        Command.GO_BACK,
-        Command.REFRESH,
-        Command.GO_FORWARD,
-    }
-    if driver_command in nav_cmds:
-        print(f"\n▶ EXECUTE {driver_command!r}  params={params!r}")
+import os, traceback
+
+_patched = False
+
+def _patch_webdriver() -> None:
+    global _patched
+    if _patched:
+        return
+    from selenium import webdriver
+    from selenium.webdriver.remote.webdriver import WebDriver as _WD
+    from selenium.webdriver.remote.command import Command
+
+    # Disable back/forward so we never return to the feed
+    _WD.back    = lambda self: None
+    _WD.forward = lambda self: None
+    webdriver.back    = lambda self: None
+    webdriver.forward = lambda self: None
+
+    _patched = True
+    if os.getenv("SCRAPER_TRACE_NAV", "") in ("", "0"):
+        return
+
+    # Wrap execute() to log navigation commands
+    _orig_execute = _WD.execute
+    def _traced_execute(self, driver_command, params=None):
+        nav_cmds = {
+            Command.GET,
+            Command.GO_BACK,
+            Command.REFRESH,
+            Command.GO_FORWARD,
+        }
+        if driver_command in nav_cmds:
+            print(f"\n▶ EXECUTE {driver_command!r}  params={params!r}")
+            traceback.print_stack(limit=5)
+        return _orig_execute(self, driver_command, params)
+    _WD.execute = _traced_execute
+
+    # Wrap get() to log every page load
+    _orig_get = _WD.get
+    def _traced_get(self, url):
+        print(f"\n▶ driver.get({url!r})")
         traceback.print_stack(limit=5)
-    return _orig_execute(self, driver_command, params)
-_WD.execute = _traced_execute
-
-# Wrap get() to log every page load
-_orig_get = _WD.get
-def _traced_get(self, url):
-    print(f"\n▶ driver.get({url!r})")
-    traceback.print_stack(limit=5)
-    return _orig_get(self, url)
-_WD.get = _traced_get
+        return _orig_get(self, url)
+    _WD.get = _traced_get
 
 # ──────────────────────────────────────────────────────────────────────
-# 2️⃣ Now all your normal imports
+# 2️⃣ Now all your normal imports (selenium / linkedin_scraper are
+#    imported inside the functions that need a browser)
 # ──────────────────────────────────────────────────────────────────────
-import os, time, datetime, random
+import time, datetime
 from pathlib import Path
-from typing import Dict, Optional
-
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
+from typing import Dict, Optional, TYPE_CHECKING
 
-from linkedin_scraper import Job as LinkedInJob, actions
+from http_fetch import fetch_job_html, parse_job_html, missing_fields
+from snapshots import save_snapshot
 from cheap_extract import cheap_extract
 from post_process import post_process, set_currency_code
-from llm_extract import extract_required_skills
-import asyncio
+from llm_extract import SkillStage, default_stage
+from metrics import span, incr
+from rate_limit import limiter
+from fingerprint import link_duplicate, fingerprints
 from dotenv import load_dotenv; load_dotenv()
 
+if TYPE_CHECKING:
+    from selenium import webdriver
 
-webdriver.back    = lambda self: None
-webdriver.forward = lambda self: None
 
 # ------------------------------------------------------------------------------
 # 1.  DRIVER FACTORY
 # ------------------------------------------------------------------------------
 
+# webdriver_manager checks the network on every install(); remember its answer
+DRIVER_PATH_CACHE = Path(os.getenv("CHROMEDRIVER_CACHE",
+                                   Path.home() / ".cache" / "job-scraper" / "chromedriver_path"))
+DRIVER_PATH_TTL   = 7 * 24 * 3600       # re-resolve weekly (Chrome auto-updates)
+
+
+def chromedriver_path(refresh: bool = False) -> str:
+    """$CHROMEDRIVER_PATH, else a cached ChromeDriverManager().install() result."""
+    if os.getenv("CHROMEDRIVER_PATH"):
+        return os.environ["CHROMEDRIVER_PATH"]
+
+    if not refresh and DRIVER_PATH_CACHE.exists():
+        cached = DRIVER_PATH_CACHE.read_text().strip()
+        fresh  = time.time() - DRIVER_PATH_CACHE.stat().st_mtime < DRIVER_PATH_TTL
+        if fresh and cached and Path(cached).exists():
+            return cached
+
+    from webdriver_manager.chrome import ChromeDriverManager
+    path = ChromeDriverManager().install()
+    DRIVER_PATH_CACHE.parent.mkdir(parents=True, exist_ok=True)
+    DRIVER_PATH_CACHE.write_text(path)
+    return path
+
+
+# lean profile: what a job page never needs (Network.setBlockedURLs patterns)
+BLOCKED_URLS = [
+    # images, video, fonts
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",
+    "*.mp4", "*.webm", "*.m3u8", "*.woff", "*.woff2", "*.ttf", "*.otf",
+    "*media.licdn.com/dms/image*", "*media.licdn.com/playlist*", "*dms.licdn.com/playlist*",
+    # analytics beacons / ads / realtime feed widgets
+    "*linkedin.com/li/track*", "*px.ads.linkedin.com*", "*linkedin.com/realtime/*",
+    "*platform.linkedin.com/litms*", "*snap.licdn.com*", "*google-analytics.com*",
+    "*googletagmanager.com*", "*doubleclick.net*", "*bat.bing.com*",
+    "*connect.facebook.net*", "*ads-twitter.com*",
+]
+LEAN_ARGS = [
+    "--disable-extensions", "--disable-background-networking", "--disable-sync",
+    "--disable-component-update", "--disable-default-apps", "--no-first-run",
+    "--mute-audio", "--blink-settings=imagesEnabled=false",
+    "--autoplay-policy=user-gesture-required",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+]
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+    "profile.default_content_setting_values.geolocation": 2,
+    "profile.default_content_setting_values.media_stream": 2,
+}
+
+
+def _env_flag(name: str) -> bool:
+    return os.getenv(name, "") not in ("", "0")
+
+
 def make_driver(headless: bool = False,
-                implicit_wait: int = 5) -> webdriver.Chrome:
-    """Return a configured Chrome WebDriver."""
+                implicit_wait: int = 5,
+                lean: bool | None = None,
+                net_stats: bool | None = None) -> webdriver.Chrome:
+    """
+    Return a configured Chrome WebDriver.
+
+    `lean` (default $SCRAPER_LEAN): block images, media, fonts and
+    trackers, skip extensions / background networking and return from
+    `get()` at DOMContentLoaded.  `net_stats` (default $SCRAPER_NET_STATS):
+    count bytes / requests / blocked requests per page load into
+    `metrics` (see `page_weight`).
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.common.exceptions import SessionNotCreatedException
+    _patch_webdriver()
+    lean      = _env_flag("SCRAPER_LEAN") if lean is None else lean
+    net_stats = _env_flag("SCRAPER_NET_STATS") if net_stats is None else net_stats
+
     opts = webdriver.ChromeOptions()
     if headless:
         opts.add_argument("--headless=new")
     opts.add_argument("--disable-gpu")
     opts.add_argument("--log-level=3")
     opts.add_experimental_option("excludeSwitches", ["enable-logging"])
+    if lean:
+        for arg in LEAN_ARGS:
+            opts.add_argument(arg)
+        opts.add_experimental_option("prefs", LEAN_PREFS)
+        opts.page_load_strategy = "eager"        # don't wait for images / iframes
+    if net_stats:
+        opts.set_capability("goog:loggingPrefs", {"performance": "ALL"})
 
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()),
-        options=opts
-    )
+    try:
+        driver = webdriver.Chrome(
+            service=Service(chromedriver_path()),
+            options=opts
+        )
+    except SessionNotCreatedException:
+        # cached driver no longer matches the installed Chrome
+        driver = webdriver.Chrome(
+            service=Service(chromedriver_path(refresh=True)),
+            options=opts
+        )
+    if lean:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    driver.net_stats = net_stats
     driver.implicitly_wait(implicit_wait)
     return driver
 
 
+def page_weight(driver) -> dict:
+    """
+    Requests, bytes and blocked requests since the last call, from the
+    performance log of a `net_stats` driver (also counted into metrics).
+    """
+    import json
+    out = {"requests": 0, "bytes": 0, "blocked": 0}
+    for entry in driver.get_log("performance"):
+        msg = json.loads(entry["message"])["message"]
+        method, params = msg.get("method"), msg.get("params", {})
+        if method == "Network.requestWillBeSent":
+            out["requests"] += 1
+        elif method == "Network.loadingFinished":
+            out["bytes"] += int(params.get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            out["blocked"] += 1
+    for k, v in out.items():
+        incr(f"browser.{k}", v)
+    return out
+
+
 # ------------------------------------------------------------------------------
 # 2.  LOGIN (once per driver session)
 # ------------------------------------------------------------------------------
@@ -101,28 +228,36 @@ def maybe_login(driver):
     if not email or not password:
         raise RuntimeError("Set LINKEDIN_EMAIL / LINKEDIN_PASSWORD env vars")
 
+    from linkedin_scraper import actions
+    limiter("browser").acquire()                # a login is a page load too
     actions.login(driver, email, password)      # library helper :contentReference[oaicite:0]{index=0}
-    time.sleep(random.uniform(2, 3.5))          # human-like pause
 
 
 # ------------------------------------------------------------------------------
 # 3.  CORE FETCH
 # ------------------------------------------------------------------------------
 
-def fetch_job(url: str,
-              driver: webdriver.Chrome,
-              logged_in: bool = True,
-              run_cheap_pass: bool = True) -> Dict:
-    """
-    Scrape one LinkedIn job posting …
+def _scrape_in_browser(url: str, driver, logged_in: bool = True) -> tuple[Dict, str]:
+    """Full Selenium scrape → (raw doc, page HTML).
+
+    `driver` may be a WebDriver or a DriverPool.
     """
+    from driver_pool import DriverPool
+    if isinstance(driver, DriverPool):
+        # only occupy a browser when the HTTP path came up short
+        with driver.driver() as d:
+            return _scrape_in_browser(url, d, logged_in)
+    if driver is None:
+        raise RuntimeError(f"no browser available to scrape {url}")
+    from linkedin_scraper import Job as LinkedInJob
 
     # ——————————— New: always navigate straight to the job URL ———————————
-    if logged_in:
-        # refresh / load the job page under your authenticated session
-        driver.get(url)
-    else:
-        driver.get(url)  # same for anonymous
+    with span("browser.get"):
+        if logged_in:
+            # refresh / load the job page under your authenticated session
+            driver.get(url)
+        else:
+            driver.get(url)  # same for anonymous
     # ————————————————————————————————————————————————————————————————
 
     #maybe_login(driver) if logged_in else None
@@ -135,49 +270,190 @@ def fetch_job(url: str,
     )
 
     # Call whichever scrape method is safest for you
-    if logged_in:
-        job.scrape_logged_in()         # uses your session cookie
+    with span("browser.scrape"):
+        if logged_in:
+            job.scrape_logged_in()         # uses your session cookie
+        else:
+            job.scrape()                   # anonymous scrape
+
+        out = job.to_dict(), driver.page_source    # already flattens → dict
+    if getattr(driver, "net_stats", False):
+        page_weight(driver)                        # everything this job pulled in
+    _report_browser(driver, out[0])
+    return out
+
+
+def _report_http(doc: Dict) -> None:
+    """Feed the anonymous HTTP limiter: an empty page slows it down."""
+    if doc.get("job_description"):
+        limiter("http").ok()
     else:
-        job.scrape()                   # anonymous scrape
+        limiter("http").backoff("empty")
 
-    doc = job.to_dict()                # already flattens → dict
-    #doc["scraped_at"] = datetime.datetime.utcnow()
 
+def _report_browser(driver, doc: Dict) -> None:
+    """Feed the account's rate limiter: walls and empty pages slow it down."""
+    where = getattr(driver, "current_url", "") or ""
+    if any(w in where for w in ("authwall", "/login", "/checkpoint")):
+        limiter("browser").backoff("authwall")
+    elif not doc.get("job_description"):
+        limiter("browser").backoff("empty")
+    else:
+        limiter("browser").ok()
+
+
+def process_raw(doc: Dict, run_cheap_pass: bool = True, now=None) -> Dict:
+    """
+    Raw `Job.to_dict()` output → extracted fields (no network, no LLM).
+    `now` is when the page was fetched ("2 days ago" is relative to it).
+    """
     # Cheap pass (regex / spaCy) BEFORE we consider tokens
-    if run_cheap_pass and "job_description" in doc:
-        doc.update(cheap_extract(doc["job_description"]))
+    if run_cheap_pass and doc.get("job_description"):
+        with span("cheap_extract"):
+            doc.update(cheap_extract(doc["job_description"]))
 
-    doc = post_process(doc)
-    set_currency_code(doc)
+    with span("post_process"):
+        doc = post_process(doc, now=now)
+        set_currency_code(doc)
+    return doc
 
-    # if 'required_skills' still missing → call LLM
-    if not doc.get("required_skills"):
-        skills = asyncio.run(extract_required_skills(doc["job_description"]))
-        if skills:
-            doc["required_skills"] = sorted(set(skills))
 
+def fetch_job(url: str,
+              driver: webdriver.Chrome,
+              logged_in: bool = True,
+              run_cheap_pass: bool = True,
+              try_http: bool = True,
+              session=None,
+              snapshot: bool = True,
+              skills_stage: SkillStage | None = None) -> Dict:
+    """
+    Scrape one LinkedIn job posting …
+
+    The public page is fetched over plain HTTP first; the browser is only
+    used when that comes back without a title, company, location or
+    description.  `driver` may be a WebDriver, a `DriverPool` (checked
+    out lazily) or None for HTTP-only runs.  The raw page is kept in the
+    snapshot store so extraction changes can be re-applied offline.
+
+    With a `skills_stage` the LLM call is handed off and its sink merges
+    the skills into the stored doc later; without one we wait for it.
+    Every stage is timed into `metrics` (see `/metrics`).
+    """
+    with span("fetch_job"):
+        return _fetch_job(url, driver, logged_in, run_cheap_pass, try_http,
+                          session, snapshot, skills_stage)
+
+
+def _fetch_job(url, driver, logged_in, run_cheap_pass, try_http,
+               session, snapshot, skills_stage) -> Dict:
+
+    doc, html, source = None, "", "http"
+    if try_http:
+        try:
+            with span("http.fetch"):
+                html = fetch_job_html(url, session=session)
+            with span("http.parse"):
+                doc  = parse_job_html(html, url)
+            _report_http(doc)
+            if missing_fields(doc):
+                doc = None
+        except Exception as e:
+            print(f"⚠️  HTTP fetch failed for {url}: {e}")
+
+    if doc is None:
+        doc, html = _scrape_in_browser(url, driver, logged_in)
+        source    = "browser"
+    incr(f"fetch.{source}")
+    #doc["scraped_at"] = datetime.datetime.utcnow()
+
+    if snapshot:
+        _snapshot(url, doc, html, source)
+
+    doc = process_raw(dict(doc), run_cheap_pass)
+    return enrich_job(doc, skills_stage)
 
+
+def _snapshot(url: str, doc: Dict, html: str, source: str) -> None:
+    try:
+        with span("snapshot"):
+            save_snapshot(url, doc, html, source)
+    except Exception as e:
+        print(f"⚠️  snapshot not saved for {url}: {e}")
+
+
+def enrich_job(doc: Dict, skills_stage: SkillStage | None = None) -> Dict:
+    """
+    Extracted doc → near-duplicate link + `required_skills` (the I/O half
+    of `fetch_job`, also the enrich stage of pipeline.py).
+    """
+    # reposts / agency copies reuse the original posting's skills
+    canonical = None
+    try:
+        with span("fingerprint"):
+            canonical = link_duplicate(doc)
+    except Exception as e:
+        print(f"⚠️  fingerprint lookup failed for {doc['linkedin_url']}: {e}")
+
+    # taxonomy coverage too low and no repost to copy from → call LLM (cache first)
+    if not doc.get("required_skills"):
+        incr("llm.fallback")
+        stage = skills_stage or default_stage()
+        fut   = stage.submit(doc["job_description"],
+                             key=doc["linkedin_url"] if skills_stage else None)
+        if fut.done():
+            incr("llm.cache_hit")
+        if skills_stage is None or fut.done():
+            with span("llm.wait"):
+                skills = fut.result()
+            if skills:
+                doc["required_skills"] = sorted(set(skills))
+
+    if canonical is None and doc.get("required_skills"):
+        fingerprints().remember_skills(doc["linkedin_url"], doc["required_skills"])
     return doc
 
 # ------------------------------------------------------------------------------
 # 4.  BATCH HELPER
 # ------------------------------------------------------------------------------
 
-def fetch_jobs_bulk(urls: list[str], headless: bool = False) -> list[Dict]:
-    """Scrape many URLs with one browser session (faster & friendlier)."""
-    driver = make_driver(headless=headless)
-    docs   = []
-    try:
-        for u in urls:
-            try:
-                docs.append(fetch_job(u, driver))
-                # Random jitter to reduce bot-detection risk
-                time.sleep(random.uniform(1.5, 3.0))
-            except Exception as e:
-                print("⚠️  Error on", u, "->", e)
-    finally:
-        driver.quit()
-    return docs
+def fetch_jobs_bulk(urls: list[str],
+                    headless: bool = False,
+                    workers: int | None = None,
+                    skip_known: bool = True,
+                    refresh_older_than: float | None = None) -> list[Dict]:
+    """
+    Scrape many URLs on a pool of warm browsers (faster & friendlier).
+
+    Jobs already in the DB are skipped unless `skip_known=False`, or
+    they were last scraped at least `refresh_older_than` seconds ago.
+    """
+    from functools import partial
+    from driver_pool import DriverPool, DEFAULT_SIZE
+
+    if skip_known:
+        from known_jobs import known_jobs
+        urls, known = known_jobs().filter(urls, older_than=refresh_older_than)
+        if known:
+            print(f"↷ skipped {len(known)} already-scraped job(s)")
+        if not urls:
+            return []
+
+    by_url: Dict[str, Dict] = {}
+    late:   Dict[str, list] = {}
+
+    stage = SkillStage(sink=late.__setitem__)
+    fetch = partial(fetch_job, skills_stage=stage)
+    with DriverPool(size=workers or DEFAULT_SIZE, headless=headless) as pool:
+        for u, doc, err in pool.map(fetch, urls, lazy=True):
+            if err:
+                print("⚠️  Error on", u, "->", err)
+            else:
+                by_url[doc["linkedin_url"]] = doc
+    stage.close()                       # wait for outstanding LLM answers
+    for url, skills in late.items():
+        if url in by_url:
+            by_url[url]["required_skills"] = skills
+    return list(by_url.values())
 
 
 # ------------------------------------------------------------------------------
@@ -186,7 +462,4 @@ def fetch_jobs_bulk(urls: list[str], headless: bool = False) -> list[Dict]:
 
 def save_raw_html(doc: Dict, out_dir: str | Path = "raw_pages"):
     """Dump the HTML snapshot for debugging / re-parsing later."""
-    out_dir = Path(out_dir)
-    out_dir.mkdir(exist_ok=True)
-    fname = out_dir / f"{doc['linkedin_url'].split('/')[-2]}.html"
-    fname.write_text(doc.get("html", ""), encoding="utf-8")
+    save_snapshot(doc["linkedin_url"], doc, doc.get("html", ""), root=out_dir)
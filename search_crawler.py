@@ -0,0 +1,274 @@
+# search_crawler.py  ---------------------------------------------------
+"""
+Harvest job URLs from keyword / location searches, page by page.
+
+    for url in crawl(SearchQuery("data scientist", "Canada")):
+        ...                                   # canonical /jobs/view/<id>/
+
+Two page sources:
+  * "http"     – the public guest endpoint behind the search page's
+                 infinite scroll (no browser; pooled session from
+                 http_fetch, backs off on 429s)
+  * "browser"  – a logged-in driver (or DriverPool); waits for the
+                 result cards with WebDriverWait instead of fixed
+                 sleeps and scrolls the list until it stops growing
+
+Results are sorted newest-first and every query keeps a cursor file
+(`.crawl_cursors/<query>.json`): an interrupted crawl resumes at the
+page it stopped on (as does one that used up `max_pages` before it
+reached the previous run's results), and a finished one remembers the
+IDs at the top of its results so the next run stops as soon as it reaches them.
+
+    $ python search_crawler.py "data scientist" --location Canada
+    $ python search_crawler.py "ml engineer" --location Toronto --queue
+"""
+
+from __future__ import annotations
+import os, re, json, hashlib, datetime, tempfile
+from pathlib import Path
+from typing import Iterator, NamedTuple, Optional
+from urllib.parse import urlencode
+
+from site_converter import search_to_view, extract_job_id
+
+
+CURSOR_DIR   = Path(os.getenv("CRAWL_CURSOR_DIR", ".crawl_cursors"))
+PAGE_SIZE    = 25          # LinkedIn paginates by 25 (guest API: 10)
+MAX_PAGES    = 40          # LinkedIn stops serving results around start=1000
+HEAD_PAGES   = 2           # pages of IDs remembered as the "already seen" fence
+STOP_OVERLAP = 0.5         # stop once this share of a page is behind the fence
+
+SEARCH_URL = "https://www.linkedin.com/jobs/search/"
+GUEST_URL  = "https://www.linkedin.com/jobs-guest/jobs/api/seeMoreJobPostings/search"
+
+
+class SearchQuery(NamedTuple):
+    keywords: str
+    location: str = ""
+    extra:    tuple = ()       # further query params, e.g. (("f_WT", "2"),)
+
+    def params(self, start: int = 0) -> dict:
+        p = {"keywords": self.keywords, "location": self.location,
+             "sortBy": "DD", **dict(self.extra)}           # newest first
+        if start:
+            p["start"] = start
+        return p
+
+    def url(self, start: int = 0, base: str = SEARCH_URL) -> str:
+        return f"{base}?{urlencode(self.params(start))}"
+
+    @property
+    def key(self) -> str:
+        slug = re.sub(r"[^a-z0-9]+", "-", f"{self.keywords} {self.location}".lower()).strip("-")
+        h    = hashlib.sha1(json.dumps(self.params(), sort_keys=True).encode()).hexdigest()
+        return f"{slug[:60]}-{h[:8]}"
+
+
+# ------------------------------------------------------------------
+# cursor
+# ------------------------------------------------------------------
+def _cursor_path(q: SearchQuery, root: Path) -> Path:
+    return Path(root) / f"{q.key}.json"
+
+
+def load_cursor(q: SearchQuery, root: Path | str = CURSOR_DIR) -> dict:
+    p = _cursor_path(q, root)
+    if p.exists():
+        return json.loads(p.read_text())
+    return {"query": q._asdict(), "next_start": None, "head": [], "pending_head": []}
+
+
+def save_cursor(q: SearchQuery, cur: dict, root: Path | str = CURSOR_DIR) -> None:
+    p = _cursor_path(q, root)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    cur["updated_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
+    fd, tmp = tempfile.mkstemp(dir=p.parent, prefix=".tmp-")
+    with os.fdopen(fd, "w") as fh:
+        json.dump(cur, fh, indent=1, default=list)
+    os.replace(tmp, p)
+
+
+# ------------------------------------------------------------------
+# page sources – each returns the job IDs on one results page
+# ------------------------------------------------------------------
+_URN  = re.compile(r'urn:li:jobPosting:(\d+)')
+_HREF = re.compile(r'href="([^"]*/jobs/view/[^"]*)"')
+
+
+def parse_search_html(html: str) -> list[str]:
+    """Job IDs on a results page / guest fragment, in page order."""
+    ids = _URN.findall(html) or [
+        jid for h in _HREF.findall(html)
+        if (view := search_to_view(h.replace("&amp;", "&"))) and (jid := extract_job_id(view))
+    ]
+    return list(dict.fromkeys(ids))
+
+
+def http_page(q: SearchQuery, start: int, session=None,
+              retries: int = 5) -> list[str]:
+    """
+    One guest-API page.  Throttled answers make the shared HTTP rate
+    limiter back off (exponentially), and the page is tried again.
+    """
+    from http_fetch import get_session, _polite_wait, _retry_after, THROTTLED, TIMEOUT
+    from rate_limit import limiter
+
+    session = session or get_session()
+    for _ in range(retries):
+        _polite_wait()
+        resp = session.get(GUEST_URL, params=q.params(start), timeout=TIMEOUT)
+        if resp.status_code in THROTTLED:
+            limiter("http").backoff(str(resp.status_code), _retry_after(resp))
+            continue
+        if resp.status_code == 400 or resp.status_code == 404:
+            return []                      # past the last page
+        resp.raise_for_status()
+        limiter("http").ok()
+        return parse_search_html(resp.text)
+    from requests import HTTPError
+    raise HTTPError(f"still throttled (HTTP {resp.status_code}) after {retries} tries",
+                    response=resp)
+
+
+CARD_SELECTOR = "[data-job-id], a.job-card-container__link, div.base-card"
+
+
+def browser_page(q: SearchQuery, start: int, driver, timeout: float = 15) -> list[str]:
+    """One logged-in results page; `driver` may be a WebDriver or a DriverPool."""
+    from driver_pool import DriverPool
+    if isinstance(driver, DriverPool):
+        with driver.driver() as d:
+            return browser_page(q, start, d, timeout)
+
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.common.exceptions import TimeoutException
+
+    driver.get(q.url(start))
+    cards = lambda d: d.find_elements(By.CSS_SELECTOR, CARD_SELECTOR)
+    try:
+        WebDriverWait(driver, timeout, poll_frequency=0.25).until(
+            lambda d: cards(d) or "No matching jobs" in d.page_source)
+    except TimeoutException:
+        return []
+
+    # the list renders lazily – scroll its last card into view until the
+    # count stops growing (each wait ends as soon as new cards appear)
+    seen = len(cards(driver))
+    while seen:
+        driver.execute_script("arguments[0].scrollIntoView()", cards(driver)[-1])
+        try:
+            WebDriverWait(driver, 1.5, poll_frequency=0.2).until(
+                lambda d: len(cards(d)) > seen)
+        except TimeoutException:
+            break
+        seen = len(cards(driver))
+
+    return parse_search_html(driver.page_source)
+
+
+# ------------------------------------------------------------------
+# the crawler
+# ------------------------------------------------------------------
+def crawl(q: SearchQuery,
+          source: str = "http",
+          driver=None,
+          max_pages: int = MAX_PAGES,
+          cursor_dir: Path | str = CURSOR_DIR,
+          session=None) -> Iterator[str]:
+    """
+    Yield canonical view URLs for `q`, newest first, skipping what the
+    previous run already covered.  The cursor is saved after every
+    fully consumed page, so stopping the generator early loses nothing
+    (the partly consumed page is fetched again on resume), and running
+    out of `max_pages` before the fence leaves the cursor in place.
+    """
+    if source == "browser" and driver is None:
+        raise ValueError("source='browser' needs a driver or DriverPool")
+
+    cur   = load_cursor(q, cursor_dir)
+    fence = set(cur["head"])
+    start = cur["next_start"] or 0
+    if start:
+        print(f"↻ resuming {q.keywords!r} at start={start}")
+    else:
+        cur["pending_head"] = []
+
+    yielded: set[str] = set()
+    done = True
+    for _ in range(max_pages):
+        ids = (browser_page(q, start, driver) if source == "browser"
+               else http_page(q, start, session))
+        if not ids:
+            break
+
+        if len(cur["pending_head"]) < HEAD_PAGES * PAGE_SIZE:
+            cur["pending_head"] += [i for i in ids if i not in cur["pending_head"]]
+        for jid in ids:
+            if jid not in fence and jid not in yielded:
+                yielded.add(jid)
+                yield f"https://www.linkedin.com/jobs/view/{jid}/"
+
+        # only advance once the consumer has taken the whole page
+        behind = sum(i in fence for i in ids)
+        start += PAGE_SIZE if source == "browser" else len(ids)
+        cur["next_start"] = start
+        save_cursor(q, cur, cursor_dir)
+
+        if behind >= STOP_OVERLAP * len(ids):
+            break                          # reached last run's results
+    else:
+        done = False
+
+    if done:
+        # end of results or fence → next run starts fresh
+        cur["head"], cur["pending_head"], cur["next_start"] = cur["pending_head"], [], None
+        save_cursor(q, cur, cursor_dir)
+    else:
+        # page budget spent before the fence: the old fence and the saved
+        # cursor stay, so the next run harvests the rest of the gap first
+        print(f"⏸ {q.keywords!r}: page budget spent, next run resumes at start={start}")
+    print(f"✓ {q.keywords!r} @ {q.location or 'anywhere'}: {len(yielded)} new job(s)")
+
+
+def crawl_many(queries: list[SearchQuery], **kw) -> Iterator[str]:
+    """`crawl` several queries, de-duplicating across them."""
+    seen: set[str] = set()
+    for q in queries:
+        for url in crawl(q, **kw):
+            if url not in seen:
+                seen.add(url)
+                yield url
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":
+    import argparse
+    ap = argparse.ArgumentParser(description="Harvest job URLs from a LinkedIn search.")
+    ap.add_argument("keywords")
+    ap.add_argument("--location", default="")
+    ap.add_argument("--pages", type=int, default=MAX_PAGES)
+    ap.add_argument("--browser", action="store_true",
+                    help="use a logged-in browser instead of the guest API")
+    ap.add_argument("--queue", action="store_true",
+                    help="push into the webhook's job queue instead of printing")
+    args = ap.parse_args()
+
+    q      = SearchQuery(args.keywords, args.location)
+    driver = None
+    if args.browser:
+        from scraper import make_driver, maybe_login
+        driver = make_driver()
+        maybe_login(driver)
+    urls = crawl(q, source="browser" if args.browser else "http",
+                 driver=driver, max_pages=args.pages)
+
+    if args.queue:
+        from job_queue import JobQueue, PRIORITY
+        flags = JobQueue().put_many(list(urls), PRIORITY["alert"])
+        print(f"✓ queued {sum(f is True for f in flags)} new URLs")
+    else:
+        for u in urls:
+            print(u)
+    if driver is not None:
+        driver.quit()
@@ -28,6 +28,15 @@ def search_to_view(url: str) -> str | None:
     return f"https://www.linkedin.com/jobs/view/{job_id}/" if job_id else None
 
 
+def extract_job_id(url: str) -> str | None:
+    """Return the numeric LinkedIn job ID of a view or search URL."""
+    m = re.search(r'/jobs/view/(?:[^/?#]*?-)?(\d+)', url)
+    if m:
+        return m.group(1)
+    view = search_to_view(url)
+    return view.rstrip("/").rsplit("/", 1)[-1] if view else None
+
+
 # CLI helper ---------------------------------------------------------------
 if __name__ == "__main__":           # allow:  python url_utils.py <search-url>
     import sys
@@ -0,0 +1,298 @@
+# skill_taxonomy.py  ---------------------------------------------------
+"""
+Skill matcher over a large taxonomy – the first answer to `required_skills`,
+before any LLM call.
+
+`data/skills.txt` lists a few thousand skills with their aliases
+("sklearn" → Scikit-learn, "GCP BigQuery" → Google BigQuery).  They are compiled
+into one FlashText automaton (a single pass over the description,
+longest term wins) and pickled to `SKILL_CACHE`.  The pickle is rebuilt
+whenever the data file changes.
+
+    m = taxonomy().match(doc["job_description"])
+    m.scores       # {"Scikit-learn": 0.85, "Google BigQuery": 0.8, "Leadership": 0.8, …}
+    m.required()   # names at or above MIN_CONFIDENCE
+    m.covered      # ≥ MIN_SKILLS confident hard skills → no LLM call needed
+
+Confidence starts at `BASE` (`AMBIGUOUS` if the skill was only seen as a
+case-sensitive `~term` such as "Go" or "R", `LONE` if no other skill
+shares its line – "Go to our careers page").  Each repeated mention adds
+`REPEAT`, up to `MAX_REPEAT`.  A skill mentioned only under a "nice to
+have / preferred / bonus" heading or line loses `OPTIONAL`.  Soft
+skills, languages and licences are reported, but they do not count
+towards coverage.
+"""
+
+from __future__ import annotations
+import os, re, gc, time, pickle, bisect, hashlib, threading
+from pathlib import Path
+from contextlib import contextmanager
+from typing import Iterable, NamedTuple, Optional
+
+from flashtext import KeywordProcessor
+
+from metrics import incr, observe
+
+SKILLS_FILE    = Path(os.getenv("SKILLS_FILE", Path(__file__).resolve().parent / "data" / "skills.txt"))
+SKILL_CACHE    = Path(os.getenv("SKILL_CACHE", ".skills_cache.pickle"))
+CACHE_FORMAT   = 1                 # bump when the pickled layout changes
+
+MIN_CONFIDENCE = 0.5               # lower scores are kept in skill_scores only
+MIN_SKILLS     = int(os.getenv("SKILL_MIN_COUNT", 3))     # hard skills needed to skip the LLM
+BASE, AMBIGUOUS, LONE   = 0.8, 0.5, 0.3
+REPEAT, MAX_REPEAT      = 0.05, 0.15
+OPTIONAL, MAX_SCORE     = 0.25, 0.99
+SOFT_CATEGORIES = {"soft skills", "spoken languages", "licenses & clearances"}
+
+IGNORE = "ignore"                  # section whose terms are matched and dropped
+
+_OPTIONAL = re.compile(r"\b(nice[- ]to[- ]have|good[- ]to[- ]have|(?:a|big|huge) plus|"
+                       r"bonus|preferred|desirable|an asset|advantageous|ideally)\b", re.I)
+_HEADING  = re.compile(r"\b(qualifications|requirements|skills|experience|responsibilities|"
+                       r"about|what you|who you|you have|you bring|you'll|we offer|"
+                       r"benefits|perks|nice|bonus|preferred|must)\b", re.I)
+_BULLET   = re.compile(r"^\s*(?:[-*•·▪●◦–—]|\d+[.)])")
+
+
+class SkillMatch(NamedTuple):
+    scores:  dict[str, float]      # canonical name → confidence, best first
+    hard:    int                   # confident skills that count towards coverage
+    covered: bool
+
+    def required(self, min_confidence: float = MIN_CONFIDENCE) -> list[str]:
+        return sorted(s for s, c in self.scores.items() if c >= min_confidence)
+
+    def scored(self) -> list[dict]:
+        """`skill_scores` as stored on the doc."""
+        return [{"skill": s, "score": c} for s, c in self.scores.items()]
+
+
+# ------------------------------------------------------------------
+# data file
+# ------------------------------------------------------------------
+class Entry(NamedTuple):
+    term:      str                 # as written, without the `~`
+    canonical: str
+    category:  str
+    exact:     bool                # `~term`: case-sensitive, ambiguous
+    line:      int
+
+
+def parse(path: Path | str = SKILLS_FILE) -> list[Entry]:
+    """Every term of the data file, in file order."""
+    out, category = [], ""
+    for no, raw in enumerate(Path(path).read_text(encoding="utf-8").splitlines(), 1):
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            category = line[1:-1].strip()
+            continue
+        terms = [t.strip() for t in line.split("|") if t.strip()]
+        canonical = terms[0].lstrip("~")
+        for t in terms:
+            out.append(Entry(t.lstrip("~"), canonical, category, t.startswith("~"), no))
+    return out
+
+
+def check(entries: list[Entry]) -> list[str]:
+    """Problems `python skill_taxonomy.py --check` reports."""
+    problems, seen, canon = [], {}, {}
+    for e in entries:
+        key = e.term.casefold()
+        if key in seen:
+            first = seen[key]
+            what = "clashes with" if first.exact != e.exact else "duplicates"
+            problems.append(f"line {e.line}: '{e.term}' ({e.canonical}) {what} "
+                            f"line {first.line} ({first.canonical})")
+            continue
+        seen[key] = e
+        if e.term == e.canonical and e.category != IGNORE:
+            if key in canon and canon[key] != e.line:
+                problems.append(f"line {e.line}: skill '{e.canonical}' is also on line {canon[key]}")
+            canon[key] = e.line
+        if len(e.term) < 2 and not e.exact:
+            problems.append(f"line {e.line}: single-letter term '{e.term}' needs a `~`")
+        if e.exact and e.term.lower() == e.term:
+            problems.append(f"line {e.line}: `~{e.term}` has no capitals to tell it apart")
+    return problems
+
+
+# ------------------------------------------------------------------
+# matcher
+# ------------------------------------------------------------------
+class SkillTaxonomy:
+    def __init__(self, entries: list[Entry]):
+        self.kp = KeywordProcessor(case_sensitive=False)
+        self.category: dict[str, str] = {}         # canonical → section
+        for e in entries:
+            if self.kp.get_keyword(e.term) is not None:
+                continue                            # first line wins (see --check)
+            if e.category == IGNORE:
+                self.kp.add_keyword(e.term, ("", None))
+                continue
+            self.kp.add_keyword(e.term, (e.canonical, e.term if e.exact else None))
+            self.category.setdefault(e.canonical, e.category)
+
+    def __len__(self) -> int:
+        return len(self.category)
+
+    # ---------- loading ----------
+    @classmethod
+    def load(cls, path: Path | str = SKILLS_FILE,
+             cache: Path | str | None = SKILL_CACHE) -> "SkillTaxonomy":
+        """Taxonomy for `path`, from the pickle when it matches the file."""
+        t0  = time.perf_counter()
+        raw = Path(path).read_bytes()
+        key = (CACHE_FORMAT, hashlib.sha256(raw).hexdigest())
+        if cache and Path(cache).exists():
+            try:
+                with open(cache, "rb") as fh, _no_gc():     # ~100k small trie dicts
+                    stored_key, tax = pickle.load(fh)
+                if stored_key == key:
+                    observe("skills.load", time.perf_counter() - t0)
+                    return tax
+            except Exception as e:                  # truncated / foreign pickle
+                print(f"⚠️  skill cache unreadable, rebuilding: {e}")
+        tax = cls(parse(path))
+        observe("skills.build", time.perf_counter() - t0)
+        if cache:
+            tmp = Path(f"{cache}.tmp")
+            try:
+                with open(tmp, "wb") as fh:
+                    pickle.dump((key, tax), fh, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmp, cache)
+            except OSError as e:
+                print(f"⚠️  skill cache not written: {e}")
+        print(f"✓ skill taxonomy: {len(tax)} skills compiled from {path}")
+        return tax
+
+    # ---------- matching ----------
+    def hits(self, text: str) -> list[tuple[str, bool, int]]:
+        """(canonical, ambiguous, offset) for every accepted mention."""
+        lowered_same = len(text.lower()) == len(text)   # spans index the lowered text
+        out = []
+        for (canonical, exact), start, end in self.kp.extract_keywords(text, span_info=True):
+            if not canonical:
+                continue                            # [ignore] phrase
+            if exact is not None and not (lowered_same and text[start:end] == exact):
+                continue                            # "go", "r" as ordinary words
+            out.append((canonical, exact is not None, start))
+        return out
+
+    def match(self, text: str | None) -> SkillMatch:
+        text = text or ""
+        line_of = _lines(text)
+        found: dict[str, list[tuple[bool, int, bool]]] = {}
+        on_line: dict[int, set[str]] = {}
+        for canonical, ambiguous, start in self.hits(text):
+            no, optional = line_of(start)
+            found.setdefault(canonical, []).append((ambiguous, no, optional))
+            on_line.setdefault(no, set()).add(canonical)
+
+        scores = {}
+        for canonical, mentions in found.items():
+            if not all(a for a, _, _ in mentions):
+                score = BASE
+            elif any(len(on_line[no]) > 1 for _, no, _ in mentions):
+                score = AMBIGUOUS               # "Python, Go, SQL": listed with others
+            else:
+                score = LONE
+            score += min(MAX_REPEAT, REPEAT * (len(mentions) - 1))
+            if all(o for _, _, o in mentions):
+                score -= OPTIONAL
+            scores[canonical] = round(min(MAX_SCORE, score), 2)
+        scores = dict(sorted(scores.items(), key=lambda kv: (-kv[1], kv[0])))
+
+        hard = sum(1 for s, c in scores.items()
+                   if c >= MIN_CONFIDENCE and self.category[s] not in SOFT_CATEGORIES)
+        covered = hard >= MIN_SKILLS
+        incr("skills.covered" if covered else "skills.uncovered")
+        return SkillMatch(scores, hard, covered)
+
+    def canonical(self, name: str) -> Optional[str]:
+        """Canonical name of a skill string, "" for ignored phrases, None if unknown."""
+        hit = self.kp.get_keyword(name.strip())
+        return hit[0] if hit else None
+
+    def canonicalize(self, names: Iterable[str]) -> list[str]:
+        """Map free-form skill names (LLM output) onto the taxonomy."""
+        out: dict[str, str] = {}
+        for name in names:
+            c = self.canonical(name)
+            if c == "":
+                continue
+            c = c or name.strip()
+            out.setdefault(c.casefold(), c)
+        return sorted(out.values())
+
+
+@contextmanager
+def _no_gc():
+    """Skip GC passes while unpickling – they dominate the load time."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _lines(text: str):
+    """offset → (line number, on a nice-to-have line or under such a heading)."""
+    starts, flags, section = [], [], False
+    pos = 0
+    for line in text.splitlines(keepends=True):
+        s = line.strip()
+        heading = (s and not _BULLET.match(s) and len(s.split()) <= 8
+                   and (s.endswith(":") or _HEADING.search(s)))
+        if heading:
+            section = bool(_OPTIONAL.search(s))
+        starts.append(pos)
+        flags.append(section or bool(_OPTIONAL.search(s)))
+        pos += len(line)
+    def at(offset: int) -> tuple[int, bool]:
+        no = bisect.bisect_right(starts, offset) - 1
+        return no, no >= 0 and flags[no]
+    return at
+
+
+# process-wide taxonomy ----------------------------------------------
+_taxonomy: SkillTaxonomy | None = None
+_taxonomy_lock = threading.Lock()
+
+
+def taxonomy() -> SkillTaxonomy:
+    """The compiled taxonomy of SKILLS_FILE, loaded once per process."""
+    global _taxonomy
+    with _taxonomy_lock:
+        if _taxonomy is None:
+            _taxonomy = SkillTaxonomy.load()
+        return _taxonomy
+
+
+def match(text: str | None) -> SkillMatch:
+    return taxonomy().match(text)
+
+
+def canonicalize(names: Iterable[str]) -> list[str]:
+    return taxonomy().canonicalize(names)
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":   # python skill_taxonomy.py --check | description.txt …
+    import sys
+    if sys.argv[1:] == ["--check"]:
+        entries  = parse()
+        problems = check(entries)
+        for p in problems:
+            print(p)
+        skills = {e.canonical for e in entries if e.category != IGNORE}
+        print(f"{len(skills)} skills, {len(entries)} terms, {len(problems)} problems")
+        sys.exit(1 if problems else 0)
+    for p in sys.argv[1:]:
+        m = match(Path(p).read_text(encoding="utf-8"))
+        print(f"\n{p}  ({m.hard} hard skills, {'covered' if m.covered else 'LLM fallback'})")
+        for s, c in m.scores.items():
+            print(f"  {c:.2f}  {s}")
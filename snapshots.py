@@ -0,0 +1,93 @@
+# snapshots.py  --------------------------------------------------------
+"""
+Content-addressed store of raw job pages.
+
+Every scrape writes the page HTML plus the un-processed `Job.to_dict()`
+output as one gzip'd JSON blob:
+
+    raw_pages/
+      objects/ab/ab12…ef.json.gz   ← blob, named by sha256 of its content
+      refs/4209878123.json         ← {"digest", "fetched_at", "source"}
+
+Identical pages share one blob; the ref always points at the latest
+fetch of a job.  `reparse.py` streams these back through the
+extraction pipeline without a browser or network.
+"""
+
+from __future__ import annotations
+import os, json, gzip, hashlib, datetime, tempfile
+from pathlib import Path
+from typing import Dict, Iterator, Optional
+
+from site_converter import extract_job_id
+
+
+SNAPSHOT_DIR = Path(os.getenv("SNAPSHOT_DIR", "raw_pages"))
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as fh:
+        fh.write(data)
+    os.replace(tmp, path)
+
+
+def _blob_path(digest: str, root: Path) -> Path:
+    return root / "objects" / digest[:2] / f"{digest}.json.gz"
+
+
+# ------------------------------------------------------------------
+# write
+# ------------------------------------------------------------------
+def save_snapshot(url: str,
+                  raw: Dict,
+                  html: str = "",
+                  source: str = "browser",
+                  root: Path | str = SNAPSHOT_DIR) -> Optional[str]:
+    """Store one page; returns its digest (None if the URL has no job ID)."""
+    job_id = extract_job_id(url)
+    if not job_id:
+        return None
+    root = Path(root)
+
+    body = json.dumps({"url": url, "source": source, "html": html, "raw": raw},
+                      sort_keys=True, default=str, ensure_ascii=False).encode()
+    digest = hashlib.sha256(body).hexdigest()
+
+    blob = _blob_path(digest, root)
+    if not blob.exists():
+        # mtime=0 keeps the gzip bytes deterministic for identical pages
+        _atomic_write(blob, gzip.compress(body, compresslevel=6, mtime=0))
+
+    ref = {"digest": digest, "source": source,
+           "fetched_at": datetime.datetime.now(datetime.timezone.utc).isoformat()}
+    _atomic_write(root / "refs" / f"{job_id}.json", json.dumps(ref).encode())
+    return digest
+
+
+# ------------------------------------------------------------------
+# read
+# ------------------------------------------------------------------
+def load_snapshot(job_id: str, root: Path | str = SNAPSHOT_DIR) -> Optional[Dict]:
+    """Return {"url", "source", "html", "raw", "fetched_at", "digest"} or None."""
+    root = Path(root)
+    ref_path = root / "refs" / f"{job_id}.json"
+    if not ref_path.exists():
+        return None
+    ref  = json.loads(ref_path.read_text())
+    snap = json.loads(gzip.decompress(_blob_path(ref["digest"], root).read_bytes()))
+    snap["fetched_at"] = datetime.datetime.fromisoformat(ref["fetched_at"])
+    snap["digest"]     = ref["digest"]
+    return snap
+
+
+def iter_job_ids(root: Path | str = SNAPSHOT_DIR) -> Iterator[str]:
+    """Yield the job ID of every stored snapshot (streams, no listing in RAM)."""
+    refs = Path(root) / "refs"
+    if not refs.is_dir():
+        return
+    with os.scandir(refs) as it:
+        for entry in it:
+            if entry.name.endswith(".json"):
+                yield entry.name[:-5]
@@ -0,0 +1,105 @@
+"""JobWriter against mongomock (no mongod needed)."""
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+mongomock = pytest.importorskip("mongomock")
+from pymongo.errors import AutoReconnect
+
+import db
+from relative_dates import as_utc
+
+URL = "https://www.linkedin.com/jobs/view/1/"
+T0  = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class Flaky:
+    """mongomock collection whose next `fail` bulk writes drop the connection."""
+
+    def __init__(self, coll):
+        self.coll, self.fail = coll, 0
+
+    def __getattr__(self, name):
+        return getattr(self.coll, name)
+
+    def bulk_write(self, ops, ordered=True):
+        if self.fail:
+            self.fail -= 1
+            raise AutoReconnect("connection reset")
+        # mongomock's own bulk_write lags pymongo's UpdateOne – replay them
+        res = [self.coll.update_one(op._filter, op._doc, upsert=op._upsert) for op in ops]
+        return SimpleNamespace(
+            upserted_count=sum(r.upserted_id is not None for r in res),
+            modified_count=sum(r.modified_count for r in res))
+
+
+@pytest.fixture
+def coll():
+    c = mongomock.MongoClient().db.jobs
+    c.create_index("linkedin_url", unique=True)
+    return Flaky(c)
+
+
+@pytest.fixture
+def heard(monkeypatch):
+    """URLs the upsert listeners were told about."""
+    urls = []
+    monkeypatch.setattr(db, "_listeners", [(lambda u, when, f: urls.append(u), True)])
+    return urls
+
+
+@pytest.fixture
+def writer(coll):
+    flushed = []
+    w = db.JobWriter(batch_size=100, flush_secs=3600, collection=coll,
+                     on_flush=lambda ok, bad: flushed.append((ok, bad)))
+    w.flushed = flushed
+    yield w
+    w.close()
+
+
+def test_writes_in_one_batch_keep_first_seen(writer, coll):
+    writer.add({"linkedin_url": URL, "job_title": "Data Analyst", "scraped_at": T0})
+    writer.add({"linkedin_url": URL, "applicant_count": 10})       # same batch → one op
+    assert writer.flush()[:2] == (1, 1)
+
+    writer.add({"linkedin_url": URL, "job_title": "Senior Data Analyst",
+                "scraped_at": T0 + datetime.timedelta(days=1)})
+    assert writer.flush().modified == 1
+
+    doc = coll.find_one({"linkedin_url": URL})
+    assert as_utc(doc["scraped_at"]) == T0
+    assert doc["job_title"] == "Senior Data Analyst" and doc["applicant_count"] == 10
+    assert [h["job_title"] for h in doc["history"]] == ["Data Analyst", "Senior Data Analyst"]
+
+
+def test_unchanged_doc_is_not_written(writer):
+    doc = {"linkedin_url": URL, "job_title": "Data Analyst"}
+    writer.add(dict(doc))
+    writer.flush()
+    writer.add(dict(doc))
+    assert writer.flush().sent == 0
+    assert writer.totals["unchanged"] == 1
+
+
+def test_failed_flush_keeps_the_batch(writer, coll):
+    coll.fail = 1
+    writer.add({"linkedin_url": URL, "job_title": "Data Analyst"})
+    with pytest.raises(AutoReconnect):
+        writer.flush()
+    assert writer.flushed == []
+
+    assert writer.flush().upserted == 1
+    assert writer.flushed == [([URL], [])]
+
+
+def test_listeners_hear_only_stored_docs(writer, coll, heard):
+    coll.fail = 1
+    writer.add({"linkedin_url": URL, "job_title": "Data Analyst"})
+    assert heard == []
+    with pytest.raises(AutoReconnect):
+        writer.flush()
+    assert heard == []
+    writer.flush()
+    assert heard == [URL]
@@ -0,0 +1,70 @@
+"""SkillStage against a local fake AsyncOpenAI (no network, no API key)."""
+import json
+from types import SimpleNamespace as NS
+
+import pytest
+from openai import APITimeoutError
+
+from llm_extract import SkillCache, SkillStage
+
+
+class FakeLLM:
+    """Stands in for AsyncOpenAI: answers (or raises) from a script."""
+
+    def __init__(self, answers):
+        self.answers, self.calls = list(answers), 0
+        self.chat = NS(completions=NS(create=self.create))
+
+    async def create(self, **kw):
+        self.calls += 1
+        a = self.answers.pop(0)
+        if isinstance(a, Exception):
+            raise a
+        return NS(choices=[NS(message=NS(content=json.dumps({"required_skills": a})))])
+
+
+class BrokenCache(SkillCache):
+    def put(self, key, skills):
+        raise OSError(28, "No space left on device")
+
+
+@pytest.fixture
+def stage_factory():
+    stages = []
+
+    def make(**kw):
+        stages.append(SkillStage(backoff=0, **kw))
+        return stages[-1]
+
+    yield make
+    for s in stages:
+        s.close()
+
+
+def test_retries_timeouts_and_coalesces_duplicates(tmp_path, stage_factory):
+    got = {}
+    llm = FakeLLM([APITimeoutError(request=None), ["python", "SQL"]])
+    stage = stage_factory(sink=got.__setitem__, llm=llm, cache=SkillCache(tmp_path))
+
+    a = stage.submit("Needs Python and SQL.", key="a")
+    b = stage.submit("needs  python and sql.", key="b")     # same normalised text
+    stage.join(timeout=10)
+
+    assert a.result() == b.result() == ["Python", "SQL"]
+    assert llm.calls == 2                                    # one timeout, one answer
+    assert set(got) == {"a", "b"}
+
+
+def test_cache_hit_skips_the_llm(tmp_path, stage_factory):
+    llm = FakeLLM([["Go"]])
+    stage = stage_factory(llm=llm, cache=SkillCache(tmp_path))
+    stage.extract("Go services.")
+
+    hit = stage.submit("Go  services.")
+    assert hit.done() and hit.result() == ["Go"]
+    assert llm.calls == 1
+
+
+def test_failed_cache_write_still_answers(tmp_path, stage_factory):
+    stage = stage_factory(llm=FakeLLM([["Go"]]), cache=BrokenCache(tmp_path))
+    assert stage.submit("Go services.").result(timeout=10) == ["Go"]
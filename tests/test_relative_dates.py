@@ -0,0 +1,25 @@
+"""parse_posted on LinkedIn's known phrasings (no dateparser needed)."""
+import datetime
+
+import pytest
+
+from relative_dates import UTC, parse_posted
+
+
+def at(iso: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(iso).replace(tzinfo=UTC)
+
+
+@pytest.mark.parametrize("phrase, now, want", [
+    ("2 days ago",            "2026-10-18T12:00", "2026-10-16T12:00"),
+    ("Reposted 3 hours ago",  "2026-10-18T12:00", "2026-10-18T09:00"),
+    ("30+ days ago",          "2026-10-18T12:00", "2026-09-18T12:00"),
+    ("Just now",              "2026-10-18T12:00", "2026-10-18T12:00"),
+    ("Oct 5",                 "2026-10-18T12:00", "2026-10-05T00:00"),
+    ("Posted on Oct 1",       "2026-10-18T12:00", "2026-10-01T00:00"),
+    ("Dec 30",                "2026-01-03T12:00", "2025-12-30T00:00"),   # previous year
+    ("Feb 29",                "2026-03-01T12:00", "2024-02-29T00:00"),   # last leap year
+    ("October 5, 2025",       "2026-10-18T12:00", "2025-10-05T00:00"),
+])
+def test_known_phrasings(phrase, now, want):
+    assert parse_posted(phrase, now=at(now)) == at(want)
@@ -0,0 +1,329 @@
+# vectors.py  ----------------------------------------------------------
+"""
+Local similar-job search over the stored descriptions (no network).
+
+Each job becomes a `DIM`-dimensional float32 vector: the signed
+feature-hashed words of its description and its skills (log term
+frequency, each part L2-normalised, skills weighted by `SKILL_WEIGHT`),
+normalised again so a dot product is the cosine similarity.  Vectors
+live in a memory-mapped matrix `VECTOR_DIR/vectors.f32`; the
+URL ↔ row map is a small SQLite table next to it, so several processes
+can append safely.  A query is one exact matrix-vector product over
+the mapped rows (`CHUNK` at a time) plus an argpartition – a few
+milliseconds for 100k jobs.
+
+    vectors().similar_to(url, k=10)          # [(url, score), …] best first
+    vectors().search("airflow dbt snowflake data engineer")
+
+`vectors()` hooks into `db.on_upsert`, so every job written through
+`db` is indexed as it is stored; `python vectors.py --rebuild` indexes
+the whole store once.
+"""
+
+from __future__ import annotations
+import os, re, math, zlib, sqlite3, threading
+from pathlib import Path
+from functools import lru_cache
+from typing import Iterable, Optional, TYPE_CHECKING
+
+from job_queue import _Immediate
+from metrics import incr, span
+
+if TYPE_CHECKING:                   # numpy is imported on first use
+    import numpy as np
+
+VECTOR_DIR   = Path(os.getenv("VECTOR_DIR", ".vectors"))
+DIM          = int(os.getenv("VECTOR_DIM", 256))
+SKILL_WEIGHT = 0.5                 # skills vs. description words
+GROW         = 4096                # rows added to the matrix file at a time
+CHUNK        = 65536               # rows scored per matrix-vector product
+BATCH        = 1000                # docs embedded per batch by --rebuild
+
+_WORD = re.compile(r"[a-z0-9]+(?:[+#][+#]?)?")          # keeps c++, c#
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being but by can
+could do does for from has have having he her here his how i if in into is it
+its just may more most must no not of on one or our out over own same she
+should so some such than that the their them then there these they this those
+through to too under up very was we were what when where which while who will
+with would you your yours we'll you'll we're you're us
+""".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ids (
+    url TEXT    PRIMARY KEY,
+    row INTEGER NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+# ------------------------------------------------------------------
+# embedding
+# ------------------------------------------------------------------
+@lru_cache(maxsize=1 << 17)
+def _slot(feature: str) -> int:
+    """Hash bucket (low bits) with the sign in bit 31: ±(bucket + 1)."""
+    h = zlib.crc32(feature.encode())
+    return (h % DIM + 1) * (-1 if h >> 31 else 1)
+
+
+def _features(text: str) -> dict[int, float]:
+    counts: dict[str, int] = {}
+    for w in _WORD.findall(text.lower()):
+        if w not in STOPWORDS and not w.isdigit():
+            counts[w] = counts.get(w, 0) + 1
+    out: dict[int, float] = {}
+    for w, n in counts.items():
+        s = _slot(w)
+        out[s] = out.get(s, 0.0) + 1.0 + math.log(n)
+    return out
+
+
+def _skill_features(skills: Iterable[str]) -> dict[int, float]:
+    out: dict[int, float] = {}
+    for name in {s.casefold() for s in skills}:
+        s = _slot("skill:" + name)
+        out[s] = out.get(s, 0.0) + 1.0
+    return out
+
+
+def _dense(rows: list[dict[int, float]]) -> np.ndarray:
+    """Signed sparse rows → L2-normalised float32 matrix."""
+    import numpy as np
+    idx = [(i, abs(s) - 1, w if s > 0 else -w)
+           for i, row in enumerate(rows) for s, w in row.items()]
+    m = np.zeros((len(rows), DIM), dtype=np.float32)
+    if idx:
+        r, c, v = (np.array(x) for x in zip(*idx))
+        np.add.at(m, (r, c), v.astype(np.float32))
+    norm = np.linalg.norm(m, axis=1, keepdims=True)
+    return np.divide(m, norm, out=m, where=norm > 0)
+
+
+def doc_skills(doc: dict) -> list[str]:
+    """`required_skills`, else the taxonomy's confident `skill_scores`."""
+    if doc.get("required_skills"):
+        return list(doc["required_skills"])
+    from skill_taxonomy import MIN_CONFIDENCE
+    return [s["skill"] for s in doc.get("skill_scores") or ()
+            if s.get("score", 0) >= MIN_CONFIDENCE]
+
+
+def embed_batch(texts: list[str], skills: list[list[str]]) -> np.ndarray:
+    """(n, DIM) float32 unit vectors; all-zero rows for empty input."""
+    with span("vectors.embed"):
+        words = _dense([_features(t or "") for t in texts])
+        tags  = _dense([_skill_features(s or ()) for s in skills])
+        import numpy as np
+        m    = words + SKILL_WEIGHT * tags
+        norm = np.linalg.norm(m, axis=1, keepdims=True)
+        return np.divide(m, norm, out=m, where=norm > 0)
+
+
+def embed(text: str, skills: Iterable[str] = ()) -> np.ndarray:
+    return embed_batch([text], [list(skills)])[0]
+
+
+# ------------------------------------------------------------------
+# index
+# ------------------------------------------------------------------
+class VectorIndex:
+    """Memory-mapped (rows × DIM) float32 matrix + SQLite URL ↔ row map."""
+
+    def __init__(self, root: Path | str = VECTOR_DIR):
+        self.root   = Path(root)
+        self.dim    = DIM
+        self.path   = self.root / "vectors.f32"
+        self._local = threading.local()
+        self._lock  = threading.Lock()
+        self._urls: list[Optional[str]] = []        # row → url (reader cache)
+        self._rows: dict[str, int] = {}
+        self._mat   = None
+        self.root.mkdir(parents=True, exist_ok=True)
+        with _Immediate(self._conn()) as c:
+            c.execute("INSERT OR IGNORE INTO meta VALUES ('dim', ?)", (str(DIM),))
+            stored = int(c.execute("SELECT value FROM meta WHERE key = 'dim'").fetchone()[0])
+        if stored != DIM:
+            raise ValueError(f"{self.root} holds {stored}-d vectors, not {DIM}-d "
+                             f"(set VECTOR_DIM or --rebuild into a new VECTOR_DIR)")
+        self.path.touch()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.root / "ids.sqlite3", timeout=30,
+                                   isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    # ---------- writing ----------
+    def _assign(self, urls: list[str]) -> list[int]:
+        """Row per URL (new URLs get the next free rows); grows the file."""
+        with _Immediate(self._conn()) as c:
+            rows = []
+            top  = c.execute("SELECT COALESCE(MAX(row), -1) FROM ids").fetchone()[0]
+            for u in urls:
+                hit = c.execute("SELECT row FROM ids WHERE url = ?", (u,)).fetchone()
+                if hit is None:
+                    top += 1
+                    c.execute("INSERT INTO ids (url, row) VALUES (?, ?)", (u, top))
+                    hit = (top,)
+                rows.append(hit[0])
+            need = (top + 1) * self.dim * 4
+            if self.path.stat().st_size < need:              # grow before anyone writes
+                with open(self.path, "r+b") as fh:
+                    fh.truncate(-(-need // (GROW * self.dim * 4)) * GROW * self.dim * 4)
+        return rows
+
+    def add_vectors(self, urls: list[str], vecs: np.ndarray) -> None:
+        import numpy as np
+        if not urls:
+            return
+        rows = self._assign(urls)
+        mat  = np.memmap(self.path, dtype=np.float32, mode="r+").reshape(-1, self.dim)
+        mat[np.array(rows)] = vecs
+        mat.flush()
+        del mat
+        incr("vectors.indexed", len(urls))
+
+    def add(self, docs: list[dict]) -> int:
+        """Embed and store docs that carry a description; returns how many."""
+        docs = [d for d in docs if d.get("linkedin_url") and d.get("job_description")]
+        if docs:
+            vecs = embed_batch([d["job_description"] for d in docs],
+                               [doc_skills(d) for d in docs])
+            self.add_vectors([d["linkedin_url"] for d in docs], vecs)
+        return len(docs)
+
+    def on_upsert(self, url: str, when, fields: dict) -> None:
+        """`db.on_upsert` listener: (re-)index the written doc."""
+        self.add([{**fields, "linkedin_url": url}])
+
+    # ---------- reading ----------
+    def _refresh(self):
+        """Pick up rows other writers (or this one) appended; returns the matrix."""
+        import numpy as np
+        with self._lock:
+            known = len(self._urls)
+            for url, row in self._conn().execute(
+                    "SELECT url, row FROM ids WHERE row >= ? ORDER BY row", (known,)):
+                self._urls.extend([None] * (row + 1 - len(self._urls)))
+                self._urls[row], self._rows[url] = url, row
+            n = len(self._urls)
+            if self._mat is None or self._mat.shape[0] < n:
+                size = self.path.stat().st_size // (self.dim * 4)
+                self._mat = (np.memmap(self.path, dtype=np.float32, mode="r",
+                                       shape=(size, self.dim)) if size else
+                             np.zeros((0, self.dim), dtype=np.float32))
+            return self._mat[:n], self._urls
+
+    def vector(self, url: str) -> Optional[np.ndarray]:
+        import numpy as np
+        mat, _ = self._refresh()
+        row = self._rows.get(url)
+        return None if row is None else np.asarray(mat[row])
+
+    def search(self, query, k: int = 10,
+               exclude: Iterable[str] = ()) -> list[tuple[str, float]]:
+        """Top-k (url, cosine) for a vector or free text, best first."""
+        import numpy as np
+        q = embed(query, _query_skills(query)) if isinstance(query, str) else query
+        with span("vectors.search"):
+            mat, urls = self._refresh()
+            n = mat.shape[0]
+            if n == 0 or not q.any():
+                return []
+            scores = np.empty(n, dtype=np.float32)
+            for s in range(0, n, CHUNK):
+                np.dot(mat[s:s + CHUNK], q, out=scores[s:s + CHUNK])
+            for u in exclude:
+                if u in self._rows and self._rows[u] < n:
+                    scores[self._rows[u]] = -np.inf
+            k   = min(k, n)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top], kind="stable")]
+            return [(urls[i], round(float(scores[i]), 4)) for i in top
+                    if urls[i] is not None and scores[i] > 0]
+
+    def similar_to(self, url: str, k: int = 10) -> Optional[list[tuple[str, float]]]:
+        """Jobs most like a stored one (itself excluded); None if not indexed."""
+        q = self.vector(url)
+        if q is None or not q.any():
+            return None
+        return self.search(q, k, exclude=[url])
+
+    def __len__(self) -> int:
+        return self._conn().execute("SELECT COUNT(*) FROM ids").fetchone()[0]
+
+
+def _query_skills(text: str) -> list[str]:
+    from skill_taxonomy import match
+    return match(text).required()
+
+
+_index: VectorIndex | None = None
+_index_lock = threading.Lock()
+
+
+def vectors() -> VectorIndex:
+    """Process-wide index, hooked into every upsert made through `db`."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            import db
+            _index = VectorIndex()
+            db.on_upsert(_index.on_upsert)
+        return _index
+
+
+def rebuild(index: VectorIndex | None = None, collection=None) -> int:
+    """Index every stored job that has a description (batched)."""
+    if index is None:
+        index = vectors()
+    if collection is None:
+        import db
+        collection = db.get_jobs()
+    # no filter: LocalJobs can't query inside the doc – add() skips docs
+    # without a description
+    cur = collection.find({}, {"_id": 0, "linkedin_url": 1, "job_description": 1,
+                               "required_skills": 1, "skill_scores": 1})
+    done, batch = 0, []
+    for d in cur.batch_size(BATCH):
+        batch.append(d)
+        if len(batch) >= BATCH:
+            done += index.add(batch)
+            batch = []
+            print(f"… {done} indexed")
+    return done + index.add(batch)
+
+
+# CLI helper ---------------------------------------------------------------
+if __name__ == "__main__":   # python vectors.py --rebuild | --similar URL | "query text"
+    import argparse, time
+    ap = argparse.ArgumentParser(description="Similar-job search over the local vector index.")
+    ap.add_argument("query", nargs="*", help="free-text query")
+    ap.add_argument("--similar", metavar="URL", help="jobs similar to this stored job")
+    ap.add_argument("--rebuild", action="store_true", help="index every stored job")
+    ap.add_argument("-k", type=int, default=10)
+    args = ap.parse_args()
+
+    idx = VectorIndex()
+    if args.rebuild:
+        t = time.perf_counter()
+        print(f"✓ {rebuild(idx)} jobs indexed in {time.perf_counter() - t:.1f}s")
+    if args.similar or args.query:
+        t = time.perf_counter()
+        hits = (idx.similar_to(args.similar, args.k) if args.similar
+                else idx.search(" ".join(args.query), args.k))
+        ms = (time.perf_counter() - t) * 1e3
+        if hits is None:
+            print(f"not indexed: {args.similar}")
+        for url, score in hits or ():
+            print(f"{score:.3f}  {url}")
+        print(f"({len(idx)} jobs, {ms:.1f} ms)")
@@ -0,0 +1,163 @@
+# webhook_async.py  ----------------------------------------------------
+"""
+asyncio front-end for the webhook server (aiohttp).
+
+Same endpoints and queue as `webhook_server.py`, but the HTTP side is
+a single event loop that never blocks: queue writes run on the default
+executor and every scrape runs on a dedicated thread pool, so bursty
+imports from the extension are answered right away.
+
+    $ python webhook_async.py            # serves on :8000
+
+    POST /webhook         {"url": ..., "source": "click"}
+    POST /webhook/batch   {"urls": [...], "source": "bulk"}  → job IDs
+    GET  /jobs/<job_id>   state, attempts, queue position, ETA
+    GET  /status          popup metrics (ETA from measured scrape times)
+    GET  /similar         ?url= | ?job_id= | ?q=  → most similar stored jobs
+    GET  /stats           ?by=skill&province=Ontario&weeks=4 → rolled-up counts
+    GET  /metrics         per-stage timings / counters (Prometheus text)
+"""
+
+from __future__ import annotations
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from aiohttp import web
+
+import webhook_server as core
+from metrics import metrics
+
+
+async def _in_thread(fn, *args):
+    return await asyncio.get_running_loop().run_in_executor(None, partial(fn, *args))
+
+
+async def _body(request: web.Request) -> dict:
+    try:
+        body = await request.json()
+    except ValueError:
+        raise web.HTTPBadRequest(text='{"status": "bad_json"}',
+                                 content_type="application/json")
+    return body if isinstance(body, dict) else {}
+
+
+# ------------------------------------------------------------------
+# handlers
+# ------------------------------------------------------------------
+async def inbound(request: web.Request) -> web.Response:
+    body = await _body(request)
+    out  = await _in_thread(core.enqueue, body.get("url", ""),
+                            body.get("source", "click"), bool(body.get("refresh")))
+    return web.json_response(out, status=400 if out["status"] == "bad_url" else 200)
+
+
+async def inbound_batch(request: web.Request) -> web.Response:
+    body = await _body(request)
+    try:
+        return web.json_response(await _in_thread(core.enqueue_batch, body))
+    except ValueError as e:
+        return web.json_response({"status": "bad_request", "error": str(e)}, status=400)
+
+
+async def job(request: web.Request) -> web.Response:
+    row = await _in_thread(core.job_status, request.match_info["job_id"])
+    if row is None:
+        return web.json_response({"status": "unknown"}, status=404)
+    return web.json_response(row)
+
+
+async def status(request: web.Request) -> web.Response:
+    return web.json_response(await _in_thread(core.status_payload))
+
+
+async def similar(request: web.Request) -> web.Response:
+    out, code = await _in_thread(core.similar_payload, request.query)
+    return web.json_response(out, status=code)
+
+
+async def stats(request: web.Request) -> web.Response:
+    out, code = await _in_thread(core.stats_payload, request.query)
+    return web.json_response(out, status=code)
+
+
+async def metrics_endpoint(request: web.Request) -> web.Response:
+    if request.query.get("format") == "json":
+        return web.json_response(metrics.snapshot())
+    return web.Response(text=metrics.render_prometheus(),
+                        content_type="text/plain", charset="utf-8")
+
+
+async def index(request: web.Request) -> web.Response:
+    return web.Response(text="<h3>Job-tracker webhook running ✔️ (async)</h3>",
+                        content_type="text/html")
+
+
+# ------------------------------------------------------------------
+# scrape loops – one per browser, each scrape on the executor
+# ------------------------------------------------------------------
+def _step(name: str) -> None:
+    """Lease (waiting up to 1s) and run one job; runs on a scrape thread."""
+    lease = core.task_q.get(name, timeout=1.0)
+    if lease is not None:
+        core.run_lease(lease)
+
+
+async def _scrape_loop(name: str, executor: ThreadPoolExecutor) -> None:
+    loop = asyncio.get_running_loop()
+    while True:
+        try:
+            await loop.run_in_executor(executor, _step, name)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"❌ {name}: {e}")
+            await asyncio.sleep(1)
+
+
+async def _start(app: web.Application) -> None:
+    await _in_thread(core.start_services)
+    if core.PIPELINE not in ("", "0"):        # staged pipeline instead of scrape loops
+        await _in_thread(core.start_pipeline)
+        app["executor"], app["loops"] = None, []
+        return
+    executor = ThreadPoolExecutor(max_workers=core.WORKERS, thread_name_prefix="scrape")
+    app["executor"] = executor
+    app["loops"] = [asyncio.create_task(_scrape_loop(f"scrape-{i}", executor))
+                    for i in range(core.WORKERS)]
+
+
+async def _stop(app: web.Application) -> None:
+    for t in app["loops"]:
+        t.cancel()
+    await asyncio.gather(*app["loops"], return_exceptions=True)
+    # let in-flight scrapes finish (failed leases are nacked; stored ones are
+    # acked when writer.close() flushes the last batch)
+    if app["executor"] is None:
+        await _in_thread(core.stop_pipeline)
+    else:
+        await _in_thread(app["executor"].shutdown, True)
+    await _in_thread(core.skills.close)
+    await _in_thread(core.writer.close)
+    await _in_thread(core.pool.close)
+
+
+def make_app() -> web.Application:
+    app = web.Application(client_max_size=8 * 1024 ** 2)   # big batch imports
+    app.add_routes([
+        web.post("/webhook",        inbound),
+        web.post("/webhook/batch",  inbound_batch),
+        web.get("/jobs/{job_id}",   job),
+        web.get("/status",          status),
+        web.get("/similar",         similar),
+        web.get("/stats",           stats),
+        web.get("/metrics",         metrics_endpoint),
+        web.get("/",                index),
+    ])
+    app.on_startup.append(_start)
+    app.on_cleanup.append(_stop)
+    return app
+
+
+if __name__ == "__main__":
+    web.run_app(make_app(), host="0.0.0.0", port=8000)
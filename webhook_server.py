@@ -1,108 +1,394 @@
 # webhook_server.py
-import queue, threading, datetime, time, traceback, functools
+"""
+Webhook server for the browser extension (Flask, worker threads).
+
+The queue / scrape / stats helpers below are shared with the asyncio
+front-end in `webhook_async.py`, which serves the same endpoints.
+"""
+import os, threading, datetime, time, traceback, functools
+from collections import deque
 from flask import Flask, request, jsonify
-from selenium.webdriver.chrome.webdriver import WebDriver as _Chrome
 
-from scraper import fetch_job, make_driver, maybe_login
-from site_converter import search_to_view
-from db import upsert_job
+from scraper import fetch_job
+from driver_pool import DriverPool, DEFAULT_SIZE
+from llm_extract import SkillStage
+from pipeline import JobPipeline
+from site_converter import search_to_view, extract_job_id
+from db import JobWriter
+from job_queue import JobQueue, PRIORITY
+from known_jobs import known_jobs
+from fingerprint import fingerprints
+from vectors import vectors
+from rollups import rollups, since_weeks, week_of, SCOPES
+from metrics import metrics
 
 app = Flask(__name__)
 
 # ──────────────────────────────────────────────────
-# ❶ In‐memory stats
+# ❶ Stats – counts live in the queue DB, only "running" is in memory
 # ──────────────────────────────────────────────────
 stats = {
-    "pending":    0,
-    "completed":  0,
-    "failed":     0,
-    "current":    None,
-    "start_time": None,
+    "running":    {},      # worker name → {"title", "company", "start_time"}
+    "durations":  deque(maxlen=50),   # seconds per successful scrape (rolling)
 }
+stats_lock = threading.Lock()
+
+DEFAULT_SCRAPE_SECS = 5          # ETA guess until the first scrape is measured
 
 # monkey‐patch omitted for brevity…
 
-driver = make_driver(headless=False)
-maybe_login(driver)
+# a scraped job's lease is only acked once the writer has stored its doc
+_unstored: dict = {}                 # linkedin_url → lease, until its doc is flushed
+_unstored_lock = threading.Lock()
 
-task_q: queue.Queue[str] = queue.Queue()
+def _flushed(written, failed):
+    """JobWriter.on_flush: ack stored jobs, nack the ones the DB rejected."""
+    with _unstored_lock:
+        done = [_unstored.pop(u) for u in written if u in _unstored]
+        bad  = [_unstored.pop(u) for u in failed if u in _unstored]
+    for lease in done:
+        if not task_q.ack(lease):
+            print("⚠️  lease lost before ack:", lease.url)
+    for lease in bad:
+        task_q.nack(lease, "db write error")
 
-def scrape_and_store(job_url: str):
-    # dequeue → run
-    stats["pending"] = max(0, stats["pending"] - 1)
-    stats["start_time"] = datetime.datetime.utcnow()
-    stats["current"]    = {"title": None, "company": None}
+def _store(lease, doc: dict):
+    """Hand `doc` to the writer; the lease stays held until it is flushed."""
+    with _unstored_lock:
+        _unstored[doc["linkedin_url"]] = lease
+    writer.add(doc)
 
-    try:
-        doc = fetch_job(job_url, driver)
-        stats["current"] = {
-          "title":   doc.get("job_title",   "—"),
-          "company": doc.get("company",     "—")
+WORKERS = DEFAULT_SIZE
+pool    = DriverPool(size=WORKERS, headless=False)    # warmed by start_workers()
+writer  = JobWriter(batch_size=50, flush_secs=2.0, on_flush=_flushed)
+skills  = SkillStage(sink=lambda url, found:
+                     writer.add_fields(url, {"required_skills": found}))
+
+# durable: survives restarts, dedupes by job ID, retries crashed leases
+task_q = JobQueue()
+
+# WEBHOOK_PIPELINE=1 (or a "fetch=4,parse=2" spec): leases run through the
+# staged pipeline instead of one scrape per worker thread
+PIPELINE = os.getenv("WEBHOOK_PIPELINE", "")
+pipe     = None
+_feeder  = None
+_pipe_stop = threading.Event()
+
+def scrape_and_store(lease):
+    """Scrape + queue one job for the writer; raises so the worker can nack it."""
+    job_url = lease.url
+    me = threading.current_thread().name
+    t0 = time.monotonic()
+    with stats_lock:
+        stats["running"][me] = {
+            "title": None, "company": None,
+            "start_time": datetime.datetime.utcnow(),
         }
-        upsert_job(doc)
-        stats["completed"] += 1
 
-    except Exception:
-        stats["failed"] += 1
+    try:
+        doc = fetch_job(job_url, pool,     # browser only if HTTP falls short
+                        skills_stage=skills)
+        with stats_lock:
+            stats["running"][me].update(
+                title   = doc.get("job_title",   "—"),
+                company = doc.get("company",     "—"),
+            )
+        _store(lease, doc)
+        with stats_lock:
+            stats["durations"].append(time.monotonic() - t0)
 
     finally:
-        stats["current"]    = None
-        stats["start_time"] = None
+        with stats_lock:
+            stats["running"].pop(me, None)
+
+def run_lease(lease) -> bool:
+    """
+    Scrape one leased job; True once its doc is queued for the writer
+    (acked when that batch is stored), False if it was nacked.
+    """
+    task_q.hold(lease)                  # renewed until it is acked / nacked
+    try:
+        scrape_and_store(lease)
+    except Exception as e:
+        print("❌ error on", lease.url, "→", e)
+        task_q.nack(lease, f"{type(e).__name__}: {e}")
+        return False
+    return True
 
 def worker():
+    me = threading.current_thread().name
     while True:
-        url = task_q.get()
-        try:
-            scrape_and_store(url)
-        except Exception as e:
-            print("❌ error on", url, "→", e)
-        task_q.task_done()
+        run_lease(task_q.get(me))
 
-threading.Thread(target=worker, daemon=True).start()
+# ---------- staged pipeline (WEBHOOK_PIPELINE) ----------
+def _pipe_store(lease, doc: dict):
+    with stats_lock:
+        if lease.job_id in stats["running"]:
+            stats["running"][lease.job_id].update(
+                title   = doc.get("job_title", "—"),
+                company = doc.get("company",   "—"),
+            )
+    _store(lease, doc)
 
-@app.post("/webhook")
-def inbound():
-    raw     = request.get_json(force=True).get("url","")
+def _pipe_done(lease, doc, err):
+    """nack a failed lease once it has left the pipeline (stored ones are acked on flush)."""
+    with stats_lock:
+        run = stats["running"].pop(lease.job_id, None)
+        if err is None and run:
+            stats["durations"].append(
+                (datetime.datetime.utcnow() - run["start_time"]).total_seconds())
+    if err is not None:
+        print("❌ error on", lease.url, "→", err)
+        task_q.nack(lease, f"{type(err).__name__}: {err}")
+
+def pipeline_feeder():
+    """Lease jobs into the pipeline; blocks while its fetch queue is full."""
+    while not _pipe_stop.is_set():
+        lease = task_q.get("pipeline", timeout=1.0)
+        if lease is None:
+            continue
+        task_q.hold(lease)              # renewed until it is acked / nacked
+        with stats_lock:
+            stats["running"][lease.job_id] = {
+                "title": None, "company": None,
+                "start_time": datetime.datetime.utcnow(),
+            }
+        pipe.submit(lease, lease.url)
+
+def start_pipeline():
+    """Start the stages and the feeder thread (WEBHOOK_PIPELINE mode)."""
+    global pipe, _feeder
+    spec = None if PIPELINE.strip() in ("1", "on", "true") else PIPELINE
+    pipe = JobPipeline(pool, store=_pipe_store, done=_pipe_done,
+                       skills_stage=skills, workers=spec).start()
+    _feeder = threading.Thread(target=pipeline_feeder, name="pipe-feeder", daemon=True)
+    _feeder.start()
+
+def stop_pipeline():
+    """Stop leasing, then let every job in flight finish (ack / nack)."""
+    _pipe_stop.set()
+    if _feeder is not None:
+        _feeder.join()
+    if pipe is not None:
+        pipe.close()
+
+_workers_started = threading.Event()
+
+def start_workers():
+    """Warm the browsers in the background and start the worker threads."""
+    if _workers_started.is_set():
+        return
+    _workers_started.set()
+    start_services()
+    if PIPELINE not in ("", "0"):
+        start_pipeline()
+        return
+    for i in range(WORKERS):
+        threading.Thread(target=worker, name=f"worker-{i}", daemon=True).start()
+
+def start_services():
+    """Recover the queue, start the LLM stage, warm browsers + job indexes."""
+    task_q.recover()                    # jobs a crashed run left "leased"
+    skills.start()
+    vectors()                           # index every doc the writer stores
+    rollups()                           # … and count it into the /stats rollups
+    threading.Thread(target=pool.start, name="pool-warmup", daemon=True).start()
+    threading.Thread(target=known_jobs().load, name="known-jobs", daemon=True).start()
+    threading.Thread(target=fingerprints().load, name="fingerprints", daemon=True).start()
+
+# ──────────────────────────────────────────────────
+# ❷ Shared request logic (Flask + async front-ends)
+# ──────────────────────────────────────────────────
+def _triage(raw: str, refresh: bool) -> dict:
+    """Canonicalise one raw URL and check it against the known-jobs index."""
     job_url = raw if "/jobs/view/" in raw else search_to_view(raw)
-    if not job_url:
-        return jsonify({"status":"bad_url"}), 400
-    stats["pending"] += 1
-    task_q.put(job_url)
-    return jsonify({"status":"queued","job_url":job_url})
+    job_id  = extract_job_id(job_url) if job_url else None
+    if not job_id:
+        return {"status": "bad_url", "url": raw}
+    # already in Mongo → nothing to do, unless the caller asks for a refresh
+    try:
+        known = not refresh and job_url in known_jobs()
+    except Exception as e:              # DB down → just queue it
+        print(f"⚠️  known-jobs lookup failed: {e}")
+        known = False
+    return {"status": "known" if known else None,
+            "job_url": job_url, "job_id": job_id}
 
-@app.get("/status")
-def status():
-    """Return live queue metrics for the popup."""
+def enqueue_many(raws: list[str], source: str = "click",
+                 refresh: bool = False) -> list[dict]:
+    """Queue raw URLs (one DB transaction) → [{"status", "job_url", "job_id"}]."""
+    jobs  = [_triage(r, refresh) for r in raws]
+    todo  = [j for j in jobs if j["status"] is None]
+    # extension clicks jump ahead of alert / bulk imports
+    priority = PRIORITY.get(source, PRIORITY["click"])
+    flags = task_q.put_many([j["job_url"] for j in todo], priority,
+                            requeue_done=refresh)
+    for j, added in zip(todo, flags):
+        j["status"] = "queued" if added else "duplicate"
+    return jobs
+
+def enqueue(raw: str, source: str = "click", refresh: bool = False) -> dict:
+    return enqueue_many([raw], source, refresh)[0]
+
+def enqueue_batch(body: dict) -> dict:
+    """
+    `{"urls": [...], "source": "bulk"}` → per-URL results + summary.
+    Raises ValueError (→ 400) unless the body is an object whose "urls"
+    is a list of strings.
+    """
+    urls = body.get("urls") if isinstance(body, dict) else None
+    if not isinstance(urls, list) or not all(isinstance(u, str) for u in urls):
+        raise ValueError('"urls" must be a list of strings')
+    jobs = enqueue_many(urls, body.get("source", "bulk"), bool(body.get("refresh")))
+    summary = {}
+    for j in jobs:
+        summary[j["status"]] = summary.get(j["status"], 0) + 1
+    return {"summary": summary, "jobs": jobs}
+
+def avg_scrape_secs() -> float:
+    with stats_lock:
+        d = list(stats["durations"])
+    return sum(d) / len(d) if d else DEFAULT_SCRAPE_SECS
+
+def job_status(job_id: str) -> dict | None:
+    row = task_q.status(job_id)
+    if row is None:
+        return None
+    if "ahead" in row:
+        row["eta_s"] = int(avg_scrape_secs() * (row["ahead"] + 1) / WORKERS)
+    return row
+
+def similar_payload(args) -> tuple[dict, int]:
+    """`?url=` / `?job_id=` (a stored job) or `?q=` (free text), `&k=10`."""
+    try:
+        k = max(1, min(int(args.get("k", 10)), 100))
+    except ValueError:
+        return {"status": "bad_request", "error": "k must be an integer"}, 400
+    url = args.get("url") or (args.get("job_id") and
+                              f"https://www.linkedin.com/jobs/view/{args['job_id']}/")
+    if url:
+        url  = url if "/jobs/view/" in url else search_to_view(url)
+        hits = vectors().similar_to(url, k) if url else None
+        if hits is None:
+            return {"status": "unknown", "url": url}, 404
+    elif args.get("q"):
+        hits = vectors().search(args["q"], k)
+    else:
+        return {"status": "bad_request", "error": "pass url, job_id or q"}, 400
+    return {"similar": [{"url": u, "job_id": extract_job_id(u), "score": s}
+                        for u, s in hits]}, 200
+
+def stats_payload(args) -> tuple[dict, int]:
+    """`?by=skill&province=Ontario&weeks=4&top=20` → counts from the rollups."""
+    by    = args.get("by", "skill")
+    where = {f: args.get(f) for f in SCOPES}
+    try:
+        top   = max(1, min(int(args.get("top", 20)), 500))
+        weeks = int(args["weeks"]) if args.get("weeks") else None
+    except ValueError:
+        return {"status": "bad_request", "error": "top and weeks must be integers"}, 400
+    try:
+        since = since_weeks(weeks) if weeks else None
+        if since is None and args.get("since"):
+            since = week_of(args["since"])
+            if not since:
+                raise ValueError("since must be a date (YYYY-MM-DD)")
+        rows = rollups().top(by, where, since, top)
+        jobs = rollups().jobs(where, since)
+    except ValueError as e:
+        return {"status": "bad_request", "error": str(e)}, 400
+    key = "week" if by == "week" else "value"
+    return {"by": by, "filter": {k: v for k, v in where.items() if v},
+            "since": since, "jobs": jobs,
+            "counts": [{key: v, "count": n} for v, n in rows]}, 200
+
+def status_payload() -> dict:
+    """Live queue metrics for the popup."""
     now = datetime.datetime.utcnow()
 
-    # ---------- elapsed for current job ----------
-    if stats["start_time"]:
-        elapsed_s = int((now - stats["start_time"]).total_seconds())
-        elapsed    = f"{elapsed_s}s"
-        running    = 1
+    with stats_lock:
+        running  = list(stats["running"].values())
+    counts  = task_q.counts()
+    pending = counts["queued"]
+
+    # ---------- elapsed for the longest-running job ----------
+    if running:
+        oldest    = min(running, key=lambda r: r["start_time"])
+        elapsed_s = int((now - oldest["start_time"]).total_seconds())
+        elapsed   = f"{elapsed_s}s"
+        current   = {"title": oldest["title"], "company": oldest["company"]}
     else:
         elapsed = "0s"
-        running = 0
+        current = None
 
-    # ---------- rough ETA (very simple) ----------
-    done_jobs = stats["completed"] or 1            # avoid divide-by-0
-    avg_secs  = 5                                  # you can refine later
-    eta_s     = avg_secs * stats["pending"]
+    # ---------- ETA from the rolling average of measured scrapes ----------
+    avg_secs  = avg_scrape_secs()
+    eta_s     = int(avg_secs * pending / WORKERS)
     eta       = f"{eta_s}s"
 
-    return jsonify({
-        "pending":   stats["pending"],
-        "running":   running,
-        "completed": stats["completed"],
-        "failed":    stats["failed"],
-        "current":   stats["current"],
+    return {
+        "pending":   pending,
+        "running":   len(running),
+        "completed": counts["done"],
+        "failed":    counts["failed"],
+        "current":   current,
         "elapsed":   elapsed,
-        "eta":       eta
-    })
+        "eta":       eta,
+        "avg_scrape_s": round(avg_secs, 1),
+        **({"pipeline": pipe.depth()} if pipe is not None else {}),
+    }
+
+@app.before_request
+def _ensure_workers():
+    start_workers()
+
+@app.post("/webhook")
+def inbound():
+    body = request.get_json(force=True)
+    out  = enqueue(body.get("url",""), body.get("source", "click"),
+                   bool(body.get("refresh")))
+    return jsonify(out), 400 if out["status"] == "bad_url" else 200
+
+@app.post("/webhook/batch")
+def inbound_batch():
+    try:
+        return jsonify(enqueue_batch(request.get_json(force=True)))
+    except ValueError as e:
+        return jsonify({"status": "bad_request", "error": str(e)}), 400
+
+@app.get("/jobs/<job_id>")
+def job(job_id):
+    row = job_status(job_id)
+    return (jsonify(row), 200) if row else (jsonify({"status": "unknown"}), 404)
+
+@app.get("/status")
+def status():
+    """Return live queue metrics for the popup."""
+    return jsonify(status_payload())
+
+@app.get("/similar")
+def similar():
+    """Stored jobs most like `?url=` / `?job_id=` or the text in `?q=`."""
+    out, code = similar_payload(request.args)
+    return jsonify(out), code
+
+@app.get("/stats")
+def stats_endpoint():
+    """Rolled-up counts by skill / city / province / seniority / workplace / week."""
+    out, code = stats_payload(request.args)
+    return jsonify(out), code
+
+@app.get("/metrics")
+def metrics_endpoint():
+    """Prometheus text; `?format=json` for the raw snapshot."""
+    if request.args.get("format") == "json":
+        return jsonify(metrics.snapshot())
+    return metrics.render_prometheus(), 200, {"Content-Type": "text/plain; version=0.0.4"}
 
 @app.get("/")
 def index():
     return "<h3>Job-tracker webhook running ✔️</h3>"
 
 if __name__ == "__main__":
+    start_workers()
     app.run(host="0.0.0.0", port=8000)